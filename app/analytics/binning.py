@@ -0,0 +1,121 @@
+"""Letter-grade binning for any number of bands.
+
+Authors:
+- John Christian Linaban
+
+LetterBins turns config["thresholds"]["grade_letters"] (any letters, any
+number of cutoffs, e.g. A/A-/B+/... schemes) into sorted cutoffs. Grades are
+rounded to the nearest integer, as calculate_distribution always did, and
+placed with np.searchsorted: band 0 is below the lowest cutoff (the '-D'
+label), band i is the i-th lowest letter. Counting is a single np.bincount,
+and the grouped variant offsets bands by section code so every section's
+distribution comes from one bincount as well. Missing (NaN) grades are not
+counted.
+"""
+
+import bisect
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+BELOW_LABEL = '-D'
+
+
+@dataclass(frozen=True)
+class LetterBins:
+    letters: Tuple[str, ...]  # ascending by cutoff
+    cutoffs: Tuple[float, ...]  # ascending
+    key_order: Tuple[str, ...]  # thresholds order followed by below_label, for result dicts
+    below_label: str = BELOW_LABEL
+
+    @classmethod
+    def from_thresholds(cls, thresholds: Dict[str, float], below_label: str = BELOW_LABEL) -> "LetterBins":
+        ordered = sorted(thresholds.items(), key=lambda kv: kv[1])
+        return cls(
+            letters=tuple(k for k, _ in ordered),
+            cutoffs=tuple(float(v) for _, v in ordered),
+            key_order=tuple(thresholds.keys()) + (below_label,),
+            below_label=below_label,
+        )
+
+    @property
+    def n_bands(self) -> int:
+        return len(self.letters) + 1
+
+    @property
+    def labels(self) -> Tuple[str, ...]:
+        """Band labels by band index (0 = below the lowest cutoff)."""
+        return (self.below_label,) + self.letters
+
+    def bands(self, grades: Any) -> np.ndarray:
+        """Band index per grade (same shape); NaN grades get -1."""
+        grades = np.asarray(grades, dtype=float)
+        out = np.searchsorted(np.asarray(self.cutoffs), np.round(grades), side="right")
+        return np.where(np.isnan(grades), -1, out)
+
+    def letter_for(self, grade: float) -> str:
+        """Scalar lookup for incremental callers (bisect, no NumPy round trip)."""
+        return self.labels[bisect.bisect_right(self.cutoffs, round(grade))]
+
+    def assign(self, grades: Any, missing_label: str = "") -> np.ndarray:
+        """Per-student letter column; missing grades get missing_label."""
+        bands = self.bands(grades)
+        labels = np.array(self.labels + (missing_label,))
+        return labels[bands]  # -1 picks missing_label
+
+    def _as_dict(self, counts: np.ndarray) -> Dict[str, int]:
+        by_label = dict(zip(self.labels, (int(c) for c in counts)))
+        return {label: by_label[label] for label in self.key_order}
+
+    def counts_matrix(self, grades: Any) -> List[Dict[str, int]]:
+        """One distribution per column of an N x K grade matrix, from one bincount."""
+        grades = np.asarray(grades, dtype=float)
+        if grades.ndim == 1:
+            grades = grades[:, None]
+        k = grades.shape[1]
+        bands = self.bands(grades)
+        flat = (bands + np.arange(k) * self.n_bands)[bands >= 0]
+        counts = np.bincount(flat, minlength=self.n_bands * k).reshape(k, self.n_bands)
+        return [self._as_dict(row) for row in counts]
+
+    def counts(self, grades: Any) -> Dict[str, int]:
+        return self.counts_matrix(np.asarray(grades, dtype=float).ravel())[0]
+
+    def grouped_counts(self, grades: Any, codes: Any, n_groups: int) -> np.ndarray:
+        """n_groups x n_bands count matrix (columns follow self.labels) in one bincount."""
+        bands = self.bands(np.asarray(grades, dtype=float).ravel())
+        codes = np.asarray(codes, dtype=np.int64)
+        keep = bands >= 0
+        flat = codes[keep] * self.n_bands + bands[keep]
+        return np.bincount(flat, minlength=n_groups * self.n_bands).reshape(n_groups, self.n_bands)
+
+
+def letter_distribution(grades: Any, thresholds: Dict[str, float]) -> Dict[str, int]:
+    return LetterBins.from_thresholds(thresholds).counts(grades)
+
+
+def assign_letters(grades: Any, thresholds: Dict[str, float], missing_label: str = "") -> np.ndarray:
+    return LetterBins.from_thresholds(thresholds).assign(grades, missing_label)
+
+
+def section_distributions(
+    sections_data: Dict[str, List[Dict[str, Any]]],
+    thresholds: Dict[str, float],
+    key: str = "weighted_grade",
+) -> Dict[str, Dict[str, int]]:
+    """calculate_distribution for every section from one grouped bincount."""
+    bins = LetterBins.from_thresholds(thresholds)
+    names = list(sections_data.keys())
+    grades = np.array([s.get(key) for studs in sections_data.values() for s in studs], dtype=float)
+    codes = np.repeat(np.arange(len(names)), [len(studs) for studs in sections_data.values()])
+    table = bins.grouped_counts(grades, codes, len(names))
+    return {name: bins._as_dict(row) for name, row in zip(names, table)}
+
+
+def with_letters(
+    students: Sequence[Dict[str, Any]], thresholds: Dict[str, float], key: str = "letter"
+) -> List[Dict[str, Any]]:
+    """Copies of students with a letter column added (empty for missing grades)."""
+    letters = assign_letters([s.get("weighted_grade") for s in students], thresholds)
+    return [dict(s, **{key: str(letter)}) for s, letter in zip(students, letters)]
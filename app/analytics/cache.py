@@ -0,0 +1,63 @@
+"""Versioned LRU memoization for analytics results.
+
+Authors:
+- John Christian Linaban
+
+Entries are keyed on (function name, roster version, section, params). The
+roster version comes from app.core and is bumped by every load, insert, edit
+and delete, so a changed roster never serves a stale result; entries from an
+older version are dropped the first time a newer version is seen. Revisiting
+an unchanged view costs one dictionary lookup.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core import get_roster_version
+
+DEFAULT_MAXSIZE = 128
+
+
+class AnalyticsCache:
+    """Bounded LRU of analytics results with hit/miss counters."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        self._version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(
+        self,
+        func_name: str,
+        compute: Callable[[], Any],
+        section: Optional[str] = None,
+        params: Tuple[Hashable, ...] = (),
+    ) -> Any:
+        version = get_roster_version()
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+        key = (func_name, version, section, params)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        value = compute()
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
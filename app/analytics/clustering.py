@@ -0,0 +1,226 @@
+"""Performance-profile clustering with mini-batch k-means.
+
+Authors:
+- John Christian Linaban
+
+Students are clustered on their score profile (quizzes, midterm, final,
+attendance), not just the weighted grade, so groups such as "strong quizzes,
+weak exams" or "low attendance, decent scores" fall out for targeted
+interventions.
+
+Each column is standardized (z-scores; a missing score takes the column mean,
+so it sits at 0) before clustering, so attendance and exams weigh the same.
+Centroids are reported back in score units.
+
+Fitting is mini-batch k-means (Sculley, 2010):
+- k-means++ seeding (D^2 sampling) on a random sample of at most
+  INIT_SAMPLE rows, or plain random rows with init="random". The best of
+  n_init seedings by sample inertia is kept.
+- Each step draws batch_size rows, assigns them with one distance matrix
+  (|x|^2 - 2 x.c + |c|^2) and moves every centre toward the mean of its
+  batch members with per-centre rate 1 / (rows seen so far).
+- Stops after max_iter batches or when no centre moves more than tol.
+A final pass in chunks of ASSIGN_CHUNK rows labels every student and sums the
+inertia, so memory stays at O(chunk x k) for millions of rows. Everything
+draws from one np.random.default_rng(seed), so a seed always gives the same
+clusters.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.analytics.columnar import QUIZ_KEYS, SCORE_KEYS, build_columns
+
+PROFILE_KEYS = SCORE_KEYS
+CLUSTER_INITS = ("k-means++", "random")
+DEFAULT_K = 4
+DEFAULT_BATCH = 1024
+DEFAULT_MAX_ITER = 100
+DEFAULT_SEED = 2024
+DEFAULT_N_INIT = 3
+INIT_SAMPLE = 10_000
+ASSIGN_CHUNK = 65_536
+
+
+@dataclass
+class ClusterResult:
+    keys: List[str]
+    centroids: np.ndarray  # k x d, score units, in keys order
+    labels: np.ndarray  # N cluster index per student
+    sizes: np.ndarray  # k students per cluster
+    grade_means: np.ndarray  # k mean weighted_grade (NaN when not available)
+    inertia: float  # sum of squared distances in standardized units
+    n_iter: int
+    mean: np.ndarray  # d column means used for standardizing
+    scale: np.ndarray  # d column standard deviations (1 where constant)
+
+    @property
+    def k(self) -> int:
+        return int(self.centroids.shape[0])
+
+    def profile(self, j: int, spread: float = 0.5) -> str:
+        """Short description of centroid j: components spread SDs above/below the average."""
+        z = (self.centroids[j] - self.mean) / self.scale
+        parts = []
+        for label, idx in _profile_groups(self.keys).items():
+            value = float(z[idx].mean())
+            if value >= spread:
+                parts.append(f"{label} ▲")
+            elif value <= -spread:
+                parts.append(f"{label} ▼")
+        return " ".join(parts) if parts else "average"
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """One row per cluster, largest first: size, share, centroid scores, mean grade and profile."""
+        total = max(int(self.sizes.sum()), 1)
+        order = np.argsort(-self.sizes, kind="stable")
+        return [
+            {
+                "cluster": int(j) + 1,
+                "size": int(self.sizes[j]),
+                "share": float(self.sizes[j]) / total * 100.0,
+                "centroid": dict(zip(self.keys, self.centroids[j].tolist())),
+                "weighted_grade": float(self.grade_means[j]),
+                "profile": self.profile(int(j)),
+            }
+            for j in order
+        ]
+
+
+def _profile_groups(keys: Sequence[str]) -> Dict[str, List[int]]:
+    # Quizzes and exams are judged as blocks; any other key stands alone
+    groups: Dict[str, List[int]] = {}
+    for i, key in enumerate(keys):
+        label = "quiz" if key in QUIZ_KEYS else "exam" if key in ("midterm", "final") else key.replace("_percent", "")[:6]
+        groups.setdefault(label, []).append(i)
+    return groups
+
+
+def _sq_distances(X: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    d = (X * X).sum(axis=1)[:, None] - 2.0 * X @ centers.T + (centers * centers).sum(axis=1)[None, :]
+    return np.maximum(d, 0.0)
+
+
+def _kmeans_pp(X: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    centers = np.empty((k, X.shape[1]))
+    centers[0] = X[rng.integers(X.shape[0])]
+    closest = _sq_distances(X, centers[:1])[:, 0]
+    for j in range(1, k):
+        total = closest.sum()
+        # All remaining rows coincide with a centre: any row will do
+        idx = rng.choice(X.shape[0], p=closest / total) if total > 0 else rng.integers(X.shape[0])
+        centers[j] = X[idx]
+        closest = np.minimum(closest, _sq_distances(X, centers[j:j + 1])[:, 0])
+    return centers
+
+
+def _assign(X: np.ndarray, centers: np.ndarray) -> Tuple[np.ndarray, float]:
+    labels = np.empty(X.shape[0], dtype=np.int64)
+    inertia = 0.0
+    for start in range(0, X.shape[0], ASSIGN_CHUNK):
+        d = _sq_distances(X[start:start + ASSIGN_CHUNK], centers)
+        best = d.argmin(axis=1)
+        labels[start:start + ASSIGN_CHUNK] = best
+        inertia += float(d[np.arange(best.size), best].sum())
+    return labels, inertia
+
+
+def cluster_students(
+    students: List[Dict[str, Any]],
+    k: int = DEFAULT_K,
+    keys: Sequence[str] = PROFILE_KEYS,
+    batch_size: int = DEFAULT_BATCH,
+    max_iter: int = DEFAULT_MAX_ITER,
+    seed: int = DEFAULT_SEED,
+    init: str = "k-means++",
+    tol: float = 1e-4,
+    n_init: int = DEFAULT_N_INIT,
+    observed: Optional[Sequence[Dict[str, Any]]] = None,
+) -> ClusterResult:
+    """Mini-batch k-means over the standardized score profiles of students.
+
+    observed holds the rows as read, before compute_weighted_grades zero-filled
+    missing midterm/final/attendance; it must line up with students, which
+    still supply weighted_grade (default: students themselves).
+    """
+    if init not in CLUSTER_INITS:
+        raise ValueError(f"Unknown init '{init}'. Expected one of: {', '.join(CLUSTER_INITS)}")
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    keys = list(keys)
+    rows = list(observed) if observed is not None else students
+    if len(rows) != len(students):
+        raise ValueError("observed rows must line up with students")
+    raw = build_columns(rows, numeric_keys=keys, text_keys=()).matrix(keys)
+    n = raw.shape[0]
+    k = min(int(k), n) if n else 0
+    with np.errstate(invalid="ignore"):
+        mean = np.nan_to_num(np.nanmean(raw, axis=0), nan=0.0) if n else np.zeros(len(keys))
+        scale = np.nan_to_num(np.nanstd(raw, axis=0), nan=0.0) if n else np.ones(len(keys))
+    scale = np.where(scale > 0, scale, 1.0)
+    X = np.nan_to_num((raw - mean) / scale, nan=0.0)
+    if not k:
+        empty = np.zeros((0, len(keys)))
+        return ClusterResult(keys, empty, np.zeros(n, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                             np.zeros(0), 0.0, 0, mean, scale)
+
+    rng = np.random.default_rng(seed)
+    sample = X if n <= INIT_SAMPLE else X[rng.choice(n, INIT_SAMPLE, replace=False)]
+    # Keep the best of n_init seedings, judged by inertia on the sample
+    centers, best = None, np.inf
+    for _ in range(max(int(n_init), 1)):
+        candidate = _kmeans_pp(sample, k, rng) if init == "k-means++" else sample[rng.choice(sample.shape[0], k, replace=False)].copy()
+        score = _assign(sample, candidate)[1]
+        if score < best:
+            centers, best = candidate, score
+
+    seen = np.zeros(k)
+    batch = min(int(batch_size), n)
+    n_iter = 0
+    for n_iter in range(1, int(max_iter) + 1):
+        rows = X if batch == n else X[rng.integers(0, n, size=batch)]
+        labels = _sq_distances(rows, centers).argmin(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=rows[:, j], minlength=k) for j in range(X.shape[1])], axis=1)
+        hit = counts > 0
+        seen += counts
+        # Per-centre learning rate 1/seen, applied to the whole batch at once
+        step = np.zeros_like(centers)
+        step[hit] = (sums[hit] - counts[hit, None] * centers[hit]) / seen[hit, None]
+        centers += step
+        if np.sqrt((step * step).sum(axis=1)).max() <= tol:
+            break
+
+    labels, inertia = _assign(X, centers)
+    sizes = np.bincount(labels, minlength=k)
+    grades = build_columns(students, numeric_keys=("weighted_grade",), text_keys=()).numeric["weighted_grade"]
+    present = ~np.isnan(grades)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grade_means = (np.bincount(labels[present], weights=grades[present], minlength=k)
+                       / np.bincount(labels[present], minlength=k))
+    return ClusterResult(
+        keys=keys,
+        centroids=centers * scale + mean,
+        labels=labels,
+        sizes=sizes,
+        grade_means=grade_means,
+        inertia=inertia,
+        n_iter=n_iter,
+        mean=mean,
+        scale=scale,
+    )
+
+
+def clustering_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """k / batch_size / max_iter / seed / init / n_init from config's optional analytics.clustering block."""
+    cfg = config.get("analytics", {}).get("clustering", {})
+    return {
+        "k": int(cfg.get("k", DEFAULT_K)),
+        "batch_size": int(cfg.get("batch_size", DEFAULT_BATCH)),
+        "max_iter": int(cfg.get("max_iter", DEFAULT_MAX_ITER)),
+        "seed": int(cfg.get("seed", DEFAULT_SEED)),
+        "init": str(cfg.get("init", "k-means++")),
+        "n_init": int(cfg.get("n_init", DEFAULT_N_INIT)),
+    }
@@ -0,0 +1,240 @@
+"""Multi-term cohort comparison with a per-file summary cache.
+
+Authors:
+- John Christian Linaban
+
+Each term file (one roster CSV per term) is reduced to a small TermSummary:
+course average, at-risk rate, hardest quiz and letter distribution, plus the
+same figures per section. Summaries are computed with the existing stats
+functions, in a ProcessPoolExecutor when several files need work, and stored
+in a JSON cache keyed by the file's absolute path. A cached entry is reused
+while the file's size and modification time and the grading settings
+(weights, thresholds, columns) are unchanged, so trend views only re-read
+terms that actually changed.
+
+Alongside each summary the cache keeps a QuantileSketch of the term's
+weighted grades. load_cohort merges them in term order into Cohort.sketch,
+which answers course-wide percentiles and the IQR outlier fences across all
+terms without holding every term's rows at once; find_cohort_outliers then
+streams the term files chunk by chunk against those fences.
+"""
+
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core import group_students_by_section, iter_csv_chunks
+from app.analytics.insights import find_outliers, get_quiz_averages
+from app.analytics.sketch import QuantileSketch
+from app.analytics.stats import calculate_percentiles, compute_weighted_grades, get_average_grade
+from app.analytics.summary import summarize
+
+CACHE_FILENAME = "cohort_cache.json"
+COHORT_PERCENTILES = (10, 25, 50, 75, 90)
+SKETCH_SEED = 0  # fixed so a term's cached sketch is reproducible
+
+
+@dataclass
+class TermSummary:
+    term: str
+    path: str
+    students: int
+    average: float
+    at_risk: int
+    at_risk_rate: float  # percent of students
+    hardest_quiz: str
+    lowest_quiz_avg: float
+    distribution: Dict[str, int] = field(default_factory=dict)
+    section_sizes: Dict[str, int] = field(default_factory=dict)
+    section_averages: Dict[str, float] = field(default_factory=dict)
+    section_at_risk_rates: Dict[str, float] = field(default_factory=dict)
+    section_hardest: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Cohort:
+    terms: List[TermSummary]
+    cached: int = 0  # summaries reused from the cache
+    computed: int = 0  # summaries recomputed from the raw file
+    sketch: Optional[QuantileSketch] = field(default=None, repr=False, compare=False)  # every term's grades
+
+    def percentiles(self, percentiles: Sequence[int] = COHORT_PERCENTILES) -> Dict[int, Optional[float]]:
+        """Course-wide weighted-grade percentiles across all terms, from the merged sketch."""
+        return calculate_percentiles([], percentiles, sketch=self.sketch or QuantileSketch())
+
+    @property
+    def sections(self) -> List[str]:
+        """Every section seen in any term, sorted."""
+        return sorted({name for t in self.terms for name in t.section_averages})
+
+    def section_trend(self, metric: str = "section_averages") -> Dict[str, Dict[str, float]]:
+        """section -> {term: value} for a per-section TermSummary field (missing terms omitted)."""
+        return {
+            name: {t.term: getattr(t, metric)[name] for t in self.terms if name in getattr(t, metric)}
+            for name in self.sections
+        }
+
+
+def term_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def expand_term_paths(patterns: Sequence[str]) -> List[str]:
+    """Glob each pattern (sorted) and drop duplicates, keeping first-seen order."""
+    paths: List[str] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or ([pattern] if os.path.isfile(pattern) else [])
+        for path in matches:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def settings_fingerprint(config: Dict[str, Any]) -> str:
+    """Hash of the config sections that change a term's summary."""
+    relevant = {
+        "grade_weights": config.get("grade_weights"),
+        "thresholds": config.get("thresholds"),
+        "columns": config.get("columns"),
+    }
+    return hashlib.sha1(json.dumps(relevant, sort_keys=True).encode()).hexdigest()
+
+
+def _summarize_term_with_sketch(path: str, config: Dict[str, Any]) -> Tuple[TermSummary, Dict[str, Any]]:
+    """Read one term file into its TermSummary and the (serialized) sketch of its weighted grades."""
+    students: List[Dict[str, Any]] = []
+    sketch = QuantileSketch(seed=SKETCH_SEED)
+    for chunk in iter_csv_chunks(path, config):
+        graded = compute_weighted_grades(chunk, config["grade_weights"])
+        sketch.update(s.get("weighted_grade") for s in graded)
+        students.extend(graded)
+    cutoff = float(config["thresholds"]["at_risk_cutoff"])
+    course = summarize(students, config)
+    n = course.total_students
+
+    sizes: Dict[str, int] = {}
+    averages: Dict[str, float] = {}
+    at_risk_rates: Dict[str, float] = {}
+    hardest: Dict[str, str] = {}
+    for name, studs in group_students_by_section(students).items():
+        flagged = sum(1 for s in studs if s.get("weighted_grade") is not None and s["weighted_grade"] < cutoff)
+        sizes[name] = len(studs)
+        averages[name] = round(get_average_grade(studs), 2)
+        at_risk_rates[name] = round(flagged / len(studs) * 100, 2)
+        hardest[name] = get_quiz_averages(studs)[2]
+
+    summary = TermSummary(
+        term=term_name(path),
+        path=path,
+        students=n,
+        average=round(course.average_grade, 2),
+        at_risk=len(course.at_risk),
+        at_risk_rate=round(len(course.at_risk) / n * 100, 2) if n else 0.0,
+        hardest_quiz=course.hardest_quiz,
+        lowest_quiz_avg=round(course.lowest_quiz_avg, 2),
+        distribution=course.distribution,
+        section_sizes=sizes,
+        section_averages=averages,
+        section_at_risk_rates=at_risk_rates,
+        section_hardest=hardest,
+    )
+    return summary, sketch.to_dict()
+
+
+def summarize_term(path: str, config: Dict[str, Any]) -> TermSummary:
+    """Read one term file and reduce it to a TermSummary."""
+    return _summarize_term_with_sketch(path, config)[0]
+
+
+def _file_stamp(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _load_cache(cache_path: Optional[str]) -> Dict[str, Any]:
+    if not cache_path or not os.path.isfile(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}  # unreadable cache: start over
+
+
+def _save_cache(cache_path: Optional[str], entries: Dict[str, Any]) -> None:
+    if not cache_path:
+        return
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump(entries, f)
+
+
+def load_cohort(
+    paths: Sequence[str],
+    config: Dict[str, Any],
+    cache_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> Cohort:
+    """Summaries for every term file in paths order, reusing cached ones where still valid."""
+    fingerprint = settings_fingerprint(config)
+    entries = _load_cache(cache_path)
+    summaries: Dict[str, TermSummary] = {}
+    sketches: Dict[str, Dict[str, Any]] = {}
+    stale: List[str] = []
+    for path in paths:
+        key = os.path.abspath(path)
+        entry = entries.get(key)
+        if (
+            entry and "sketch" in entry
+            and entry.get("fingerprint") == fingerprint and entry.get("stamp") == _file_stamp(path)
+        ):
+            summaries[path] = TermSummary(**dict(entry["summary"], path=path))
+            sketches[path] = entry["sketch"]
+        else:
+            stale.append(path)
+
+    if len(stale) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=min(len(stale), max_workers or os.cpu_count() or 1)) as pool:
+            computed = list(pool.map(_summarize_term_with_sketch, stale, [config] * len(stale)))
+    else:
+        computed = [_summarize_term_with_sketch(path, config) for path in stale]
+
+    for path, (summary, sketch) in zip(stale, computed):
+        summaries[path] = summary
+        sketches[path] = sketch
+        entries[os.path.abspath(path)] = {
+            "fingerprint": fingerprint, "stamp": _file_stamp(path), "summary": asdict(summary), "sketch": sketch,
+        }
+    if stale:
+        _save_cache(cache_path, entries)
+
+    # Same per-file-then-merge scheme as sketch_csv_files, but the parts come from the cache
+    merged = QuantileSketch(seed=SKETCH_SEED)
+    for path in paths:
+        merged.merge(QuantileSketch.from_dict(sketches[path], seed=SKETCH_SEED))
+    return Cohort(
+        terms=[summaries[p] for p in paths], cached=len(paths) - len(stale), computed=len(stale), sketch=merged,
+    )
+
+
+def find_cohort_outliers(
+    cohort: Cohort, config: Dict[str, Any], chunk_size: int = 50_000
+) -> Dict[str, List[Dict[str, Any]]]:
+    """term -> students outside the cohort-wide IQR fences, streaming each term file one chunk at a time."""
+    outliers: Dict[str, List[Dict[str, Any]]] = {}
+    for term in cohort.terms:
+        found: List[Dict[str, Any]] = []
+        for chunk in iter_csv_chunks(term.path, config, chunk_size):
+            graded = compute_weighted_grades(chunk, config["grade_weights"])
+            found.extend(find_outliers(graded, sketch=cohort.sketch))
+        outliers[term.term] = found
+    return outliers
+
+
+def cohort_cache_path(config: Dict[str, Any]) -> str:
+    paths = config.get("file_paths", {})
+    return paths.get("cohort_cache") or os.path.join(paths.get("output_dir", "output/"), CACHE_FILENAME)
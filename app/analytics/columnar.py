@@ -0,0 +1,74 @@
+"""Columnar (struct-of-arrays) view of the roster for vectorized analytics.
+
+Authors:
+- John Christian Linaban
+
+The CLI and showcase keep students as a list of dicts. Vectorized engines
+convert that list once into one NumPy array per column:
+- build_columns(students): numeric columns as float arrays (None -> NaN),
+  text columns as string arrays, plus integer section codes.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+QUIZ_KEYS = ("quiz1", "quiz2", "quiz3", "quiz4", "quiz5")
+SCORE_KEYS = QUIZ_KEYS + ("midterm", "final", "attendance_percent")
+NUMERIC_KEYS = SCORE_KEYS + ("weighted_grade",)
+TEXT_KEYS = ("student_id", "last_name", "first_name", "section")
+
+
+@dataclass
+class RosterColumns:
+    """One array per column; row i of every array is the same student."""
+
+    numeric: Dict[str, np.ndarray]
+    text: Dict[str, np.ndarray]
+    section_names: List[str]
+    section_codes: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.section_codes.shape[0])
+
+    def column(self, key: str) -> np.ndarray:
+        if key in self.numeric:
+            return self.numeric[key]
+        return self.text[key]
+
+    def matrix(self, keys: Sequence[str]) -> np.ndarray:
+        """Stack numeric columns into an N x K float matrix."""
+        if not keys:
+            return np.zeros((len(self), 0), dtype=float)
+        return np.column_stack([self.numeric[k] for k in keys])
+
+
+def _numeric_column(students: List[Dict[str, Any]], key: str) -> np.ndarray:
+    # dtype=float maps None to NaN; anything non-numeric also becomes NaN
+    try:
+        return np.array([s.get(key) for s in students], dtype=float)
+    except (TypeError, ValueError):
+        out = np.full(len(students), np.nan)
+        for i, s in enumerate(students):
+            val = s.get(key)
+            if isinstance(val, (int, float)):
+                out[i] = float(val)
+        return out
+
+
+def build_columns(
+    students: List[Dict[str, Any]],
+    numeric_keys: Sequence[str] = NUMERIC_KEYS,
+    text_keys: Sequence[str] = TEXT_KEYS,
+) -> RosterColumns:
+    numeric = {k: _numeric_column(students, k) for k in numeric_keys}
+    text = {k: np.array([str(s.get(k) or "") for s in students], dtype=str) for k in text_keys}
+    # Section codes follow first-appearance order, same as group_students_by_section
+    lookup: Dict[str, int] = {}
+    codes = np.fromiter(
+        (lookup.setdefault(s.get("section") or "", len(lookup)) for s in students),
+        dtype=np.int64,
+        count=len(students),
+    )
+    return RosterColumns(numeric=numeric, text=text, section_names=list(lookup), section_codes=codes)
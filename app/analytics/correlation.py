@@ -0,0 +1,184 @@
+"""Pearson and Spearman correlation matrices across every score column.
+
+Authors:
+- John Christian Linaban
+
+Missing scores are handled pairwise: each cell (i, j) uses only the rows where
+both columns are present. With X the zero-filled score matrix and M its
+presence mask, the pairwise counts, sums and cross-products are the matrix
+products M'M, X'M and X'X, so the whole K x K matrix comes from a handful of
+BLAS calls instead of K^2 masked loops. The per-section variant builds the
+same sums for every section at once with one bincount over the section codes
+per column pair, so memory stays O(N x K) however uneven the sections are.
+
+Spearman ranks each column once (average ranks for ties, over that column's
+present values, within each section) from one lexsort on (section, value),
+and then applies the pairwise Pearson above. With no missing
+scores this is the exact Spearman coefficient; with gaps it is the usual
+fast approximation, since the pair is not re-ranked on its common rows.
+
+Graded rows carry 0 for a missing midterm, final or attendance, which would
+pass for a real score here; callers holding the rows as read pass them as
+observed so those gaps stay NaN (weighted_grade still comes from the graded
+rows).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.analytics.columnar import NUMERIC_KEYS, build_columns
+
+CORRELATION_KEYS = NUMERIC_KEYS
+METHODS = ("pearson", "spearman")
+
+
+@dataclass
+class CorrelationMatrix:
+    keys: List[str]
+    values: np.ndarray  # K x K, NaN where fewer than 2 shared rows or zero variance
+    counts: np.ndarray  # K x K pairwise non-missing row counts
+    method: str
+
+
+def _rank_columns(X: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """1-based ranks of the present values of every column within each group; ties share their average rank."""
+    ranked = np.full(X.shape, np.nan)
+    for k in range(X.shape[1]):
+        rows = np.flatnonzero(~np.isnan(X[:, k]))
+        if not rows.size:
+            continue
+        order = rows[np.lexsort((X[rows, k], codes[rows]))]
+        v, c = X[order, k], codes[order]
+        pos = np.arange(order.size)
+        new_group = np.r_[True, c[1:] != c[:-1]]
+        new_run = new_group | np.r_[True, v[1:] != v[:-1]]
+        group_start = np.maximum.accumulate(np.where(new_group, pos, 0))
+        run_start = np.maximum.accumulate(np.where(new_run, pos, 0))
+        # Last position of each run, spread back over its members
+        run_ids = np.cumsum(new_run) - 1
+        run_end = np.r_[pos[new_run][1:] - 1, order.size - 1][run_ids]
+        ranked[order, k] = (run_start + run_end) / 2.0 - group_start + 1.0
+    return ranked
+
+
+def _pearson_from_sums(n, sx, sxx, sxy):
+    sy = np.swapaxes(sx, -1, -2)
+    syy = np.swapaxes(sxx, -1, -2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+    r[(n < 2) | ~np.isfinite(r)] = np.nan
+    return np.clip(r, -1.0, 1.0), n.astype(np.int64)
+
+
+def _pairwise_pearson(X: np.ndarray):
+    """Pairwise-complete Pearson for X of shape (n, K)."""
+    M = (~np.isnan(X)).astype(float)
+    col_n = M.sum(axis=0)
+    col_sum = np.nansum(X, axis=0)
+    center = np.divide(col_sum, col_n, out=np.zeros_like(col_sum), where=col_n > 0)
+    # Centering first keeps the one-pass formulas below numerically stable
+    Z = np.where(M > 0, X - center, 0.0)
+    n = M.T @ M                     # shared rows per pair
+    sx = Z.T @ M                    # sum of x_i over rows where x_j is also present
+    sxx = (Z * Z).T @ M
+    sxy = Z.T @ Z
+    return _pearson_from_sums(n, sx, sxx, sxy)
+
+
+def _grouped_pearson(X: np.ndarray, codes: np.ndarray, n_groups: int):
+    """Pairwise-complete Pearson per group: G x K x K from (N, K) and N group codes."""
+    K = X.shape[1]
+    M = (~np.isnan(X)).astype(float)
+    filled = np.where(M > 0, X, 0.0)
+    col_n = np.stack([np.bincount(codes, weights=M[:, k], minlength=n_groups) for k in range(K)], axis=1)
+    col_sum = np.stack([np.bincount(codes, weights=filled[:, k], minlength=n_groups) for k in range(K)], axis=1)
+    center = np.divide(col_sum, col_n, out=np.zeros_like(col_sum), where=col_n > 0)
+    Z = np.where(M > 0, X - center[codes], 0.0)
+    ZZ = Z * Z
+
+    def sums(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.bincount(codes, weights=a * b, minlength=n_groups)
+
+    n = np.empty((n_groups, K, K))
+    sx = np.empty_like(n)
+    sxx = np.empty_like(n)
+    sxy = np.empty_like(n)
+    for i in range(K):
+        for j in range(K):
+            sx[:, i, j] = sums(Z[:, i], M[:, j])
+            sxx[:, i, j] = sums(ZZ[:, i], M[:, j])
+            if j >= i:
+                n[:, i, j] = n[:, j, i] = sums(M[:, i], M[:, j])
+                sxy[:, i, j] = sxy[:, j, i] = sums(Z[:, i], Z[:, j])
+    return _pearson_from_sums(n, sx, sxx, sxy)
+
+
+def _score_matrix(
+    students: List[Dict[str, Any]], keys: List[str], observed: Optional[Sequence[Dict[str, Any]]]
+) -> np.ndarray:
+    """N x K scores, from the observed rows when given, with weighted_grade from students."""
+    if observed is None:
+        return build_columns(students, numeric_keys=keys, text_keys=()).matrix(keys)
+    observed = list(observed)
+    if len(observed) != len(students):
+        raise ValueError("observed rows must line up with students")
+    X = build_columns(observed, numeric_keys=keys, text_keys=()).matrix(keys)
+    if "weighted_grade" in keys:
+        grades = build_columns(students, numeric_keys=("weighted_grade",), text_keys=())
+        X[:, keys.index("weighted_grade")] = grades.numeric["weighted_grade"]
+    return X
+
+
+def _check_method(method: str) -> None:
+    if method not in METHODS:
+        raise ValueError(f"Unknown correlation method '{method}'. Expected one of: {', '.join(METHODS)}")
+
+
+def correlation_matrix(
+    students: List[Dict[str, Any]],
+    keys: Sequence[str] = CORRELATION_KEYS,
+    method: str = "pearson",
+    observed: Optional[Sequence[Dict[str, Any]]] = None,
+) -> CorrelationMatrix:
+    """Course-wide K x K correlation matrix over the given score columns.
+
+    observed holds the rows as read, lined up with students (default: students).
+    """
+    keys = list(keys)
+    _check_method(method)
+    X = _score_matrix(students, keys, observed)
+    if method == "spearman":
+        X = _rank_columns(X, np.zeros(X.shape[0], dtype=np.int64))
+    values, counts = _pairwise_pearson(X)
+    return CorrelationMatrix(keys, values, counts, method)
+
+
+def section_correlation_matrices(
+    sections_data: Dict[str, List[Dict[str, Any]]],
+    keys: Sequence[str] = CORRELATION_KEYS,
+    method: str = "pearson",
+    observed: Optional[Dict[str, Sequence[Dict[str, Any]]]] = None,
+) -> Dict[str, CorrelationMatrix]:
+    """One matrix per section, computed together from grouped S x K x K sums.
+
+    observed maps each section to its rows as read, lined up with sections_data.
+    """
+    _check_method(method)
+    keys = list(keys)
+    names = list(sections_data.keys())
+    if not names:
+        return {}
+    sizes = [len(studs) for studs in sections_data.values()]
+    rows = [s for studs in sections_data.values() for s in studs]
+    raw = None if observed is None else [o for name in names for o in observed.get(name, [])]
+    X = _score_matrix(rows, keys, raw)
+    codes = np.repeat(np.arange(len(names)), sizes)
+    if method == "spearman":
+        X = _rank_columns(X, codes)
+    values, counts = _grouped_pearson(X, codes, len(names))
+    return {name: CorrelationMatrix(keys, values[i], counts[i], method) for i, name in enumerate(names)}
@@ -0,0 +1,121 @@
+"""Vectorized grade curves: every method in one call, without touching the roster.
+
+Authors:
+- John Christian Linaban
+
+Unlike stats.apply_grade_curve, these functions take a grade array and return
+new arrays; student dicts are never modified and nothing is printed. Missing
+grades stay NaN, and curved grades are clipped to 0-100 and rounded to 2
+decimals.
+
+Methods:
+- flat: add `points`.
+- normalize: shift so the highest grade becomes `target_max` (never lowers grades).
+- sqrt: 10 * sqrt(grade), the classic square-root curve.
+- zscore: rescale to `target_mean` / `target_sd` (population SD).
+- percentile: shift so the `percentile`-th grade (nearest rank) lands on
+  `target` (never lowers grades).
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.analytics.numpy_stats import letter_counts_matrix, percentiles_numpy
+
+CURVE_METHODS = ("flat", "normalize", "sqrt", "zscore", "percentile")
+DEFAULT_CURVE_PARAMS: Dict[str, Dict[str, float]] = {
+    "flat": {"points": 5.0},
+    "normalize": {"target_max": 100.0},
+    "sqrt": {},
+    "zscore": {"target_mean": 75.0, "target_sd": 10.0},
+    "percentile": {"percentile": 50, "target": 75.0},
+}
+
+
+def _finish(curved: np.ndarray) -> np.ndarray:
+    return np.round(np.clip(curved, 0.0, 100.0), 2)
+
+
+def curve_grades(grades: np.ndarray, method: str, **params: float) -> np.ndarray:
+    """Curved copy of grades for one method; parameters default to DEFAULT_CURVE_PARAMS."""
+    if method not in CURVE_METHODS:
+        raise ValueError(f"Unknown curve method '{method}'. Expected one of: {', '.join(CURVE_METHODS)}")
+    p = dict(DEFAULT_CURVE_PARAMS[method], **params)
+    grades = np.asarray(grades, dtype=float)
+    valid = grades[~np.isnan(grades)]
+    if valid.size == 0:
+        return grades.copy()
+
+    if method == "flat":
+        return _finish(grades + float(p["points"]))
+    if method == "normalize":
+        return _finish(grades + max(0.0, float(p["target_max"]) - float(valid.max())))
+    if method == "sqrt":
+        return _finish(10.0 * np.sqrt(np.clip(grades, 0.0, None)))
+    if method == "zscore":
+        sd = float(valid.std())
+        if sd == 0:
+            return _finish(np.where(np.isnan(grades), np.nan, float(p["target_mean"])))
+        z = (grades - float(valid.mean())) / sd
+        return _finish(float(p["target_mean"]) + z * float(p["target_sd"]))
+    anchor = percentiles_numpy(valid, [int(p["percentile"])])[int(p["percentile"])]
+    return _finish(grades + max(0.0, float(p["target"]) - anchor))
+
+
+def curve_matrix(
+    grades: np.ndarray,
+    methods: Sequence[str] = CURVE_METHODS,
+    params: Optional[Dict[str, Dict[str, float]]] = None,
+) -> np.ndarray:
+    """N x K matrix with one curved column per method."""
+    params = params or {}
+    grades = np.asarray(grades, dtype=float)
+    if not methods:
+        return np.zeros((grades.size, 0))
+    return np.column_stack([curve_grades(grades, m, **params.get(m, {})) for m in methods])
+
+
+@dataclass
+class CurveImpact:
+    methods: List[str]  # "original" first, then each curve method
+    curved: np.ndarray  # N x (1 + methods) grades, original in column 0
+    averages: Dict[str, float] = field(default_factory=dict)
+    distributions: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    at_risk: Dict[str, int] = field(default_factory=dict)
+    raised: Dict[str, int] = field(default_factory=dict)
+
+
+def curve_impact(
+    grades: np.ndarray,
+    thresholds: Dict[str, int],
+    at_risk_cutoff: float,
+    methods: Sequence[str] = CURVE_METHODS,
+    params: Optional[Dict[str, Dict[str, float]]] = None,
+) -> CurveImpact:
+    """Distribution, average, at-risk and raised counts for the original grades and every curve."""
+    grades = np.asarray(grades, dtype=float)
+    names = ["original"] + list(methods)
+    matrix = np.column_stack([grades, curve_matrix(grades, methods, params)])
+    present = ~np.isnan(matrix)
+    filled = np.where(present, matrix, 0.0)
+    counts = present.sum(axis=0)
+    averages = np.divide(filled.sum(axis=0), counts, out=np.zeros(len(names)), where=counts > 0)
+    with np.errstate(invalid="ignore"):
+        at_risk = (matrix < float(at_risk_cutoff)).sum(axis=0)
+        raised = (matrix > grades[:, None]).sum(axis=0)
+    return CurveImpact(
+        methods=names,
+        curved=matrix,
+        averages={n: float(averages[k]) for k, n in enumerate(names)},
+        distributions=dict(zip(names, letter_counts_matrix(matrix, thresholds))),
+        at_risk={n: int(at_risk[k]) for k, n in enumerate(names)},
+        raised={n: int(raised[k]) for k, n in enumerate(names)},
+    )
+
+
+def curve_params_from_config(config: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """DEFAULT_CURVE_PARAMS overridden by config's optional "curves" block."""
+    overrides = config.get("curves", {})
+    return {m: dict(DEFAULT_CURVE_PARAMS[m], **overrides.get(m, {})) for m in CURVE_METHODS}
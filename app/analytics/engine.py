@@ -0,0 +1,49 @@
+"""Engine switch between the pure-Python and NumPy insight implementations.
+
+Authors:
+- John Christian Linaban
+
+get_engine("numpy") or get_engine(config) returns a namespace exposing the
+insight functions under their insights.py names, so call sites stay the same
+whichever engine is selected. config.json selects it with
+{"analytics": {"engine": "python" | "numpy"}}.
+"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, Union
+
+from app.analytics import insights, numpy_insights
+
+ENGINES = ("python", "numpy")
+DEFAULT_ENGINE = "python"
+
+_FUNCTIONS = (
+    "find_outliers",
+    "track_midterm_to_final_improvement",
+    "correlate_attendance_and_grades",
+    "get_at_risk_students",
+    "compare_sections",
+    "find_hardest_topic",
+    "get_quiz_averages",
+    "get_sections_quiz_averages",
+)
+
+
+def engine_name(config: Dict[str, Any]) -> str:
+    name = str(config.get("analytics", {}).get("engine", DEFAULT_ENGINE)).lower()
+    return name if name in ENGINES else DEFAULT_ENGINE
+
+
+def get_engine(selector: Union[str, Dict[str, Any], None] = None) -> SimpleNamespace:
+    """Return the insight functions for an engine name or a loaded config."""
+    if isinstance(selector, dict):
+        name = engine_name(selector)
+    else:
+        name = (selector or DEFAULT_ENGINE).lower()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown analytics engine '{name}'. Expected one of: {', '.join(ENGINES)}")
+    if name == "numpy":
+        funcs = {f: getattr(numpy_insights, f"{f}_numpy") for f in _FUNCTIONS}
+    else:
+        funcs = {f: getattr(insights, f) for f in _FUNCTIONS}
+    return SimpleNamespace(name=name, **funcs)
@@ -0,0 +1,210 @@
+"""A small, safe filter language compiled to vectorized boolean masks.
+
+Authors:
+- John Christian Linaban
+
+    final < midterm - 10 and attendance_percent < 75 and section startswith "BSIT 3"
+
+The text is parsed with ast (Python expression syntax) and every node is
+checked against an allowlist; nothing is ever passed to eval. Allowed:
+- column names and number / string literals
+- + - * / on numbers, unary minus
+- == != < <= > >= (chains like 60 <= final < 75 work), in / not in with a
+  list of literals, is None / is not None for missing values
+- and, or, not
+- startswith, endswith and contains on text, written infix
+  (section startswith "BSIT 3") or as a call (section.startswith("BSIT 3"))
+
+Every name must be a known column, and operand kinds are checked up front
+(no arithmetic on text, no comparing text to numbers), so a bad filter fails
+before any data is touched. The result is a query.Expr tree: evaluated on
+column arrays it gives one boolean mask for the whole roster, and passed to
+scan().filter() it is pushed into the CSV reader.
+
+Missing numbers are NaN, so any comparison with them is false; use
+"final is None" to select them.
+"""
+
+import ast
+import io
+import tokenize
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.analytics.columnar import RosterColumns
+from app.analytics.query import BinaryExpr, Col, Expr, Lit
+
+MAX_FILTER_LENGTH = 500
+MAX_FILTER_NODES = 200
+STRING_OPS = ("startswith", "endswith", "contains")
+
+_COMPARE_OPS = {ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">="}
+_ARITH_OPS = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/"}
+
+
+def _rewrite_infix(text: str) -> str:
+    """Turn `col startswith "x"` into `col.startswith("x")` so ast can parse it."""
+    try:
+        tokens = [t for t in tokenize.generate_tokens(io.StringIO(text).readline)
+                  if t.type not in (tokenize.NEWLINE, tokenize.NL, tokenize.ENDMARKER)]
+    except (tokenize.TokenError, IndentationError) as e:
+        raise ValueError(f"Could not read filter: {e}") from None
+    out: List[Tuple[int, str]] = []
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        infix = (
+            tok.type == tokenize.NAME and tok.string in STRING_OPS and out
+            and out[-1][1] != "." and i + 1 < len(tokens) and tokens[i + 1].type == tokenize.STRING
+        )
+        if infix:
+            out += [(tokenize.OP, "."), (tokenize.NAME, tok.string), (tokenize.OP, "("),
+                    (tokenize.STRING, tokens[i + 1].string), (tokenize.OP, ")")]
+            i += 2
+            continue
+        out.append((tok.type, tok.string))
+        i += 1
+    return tokenize.untokenize(out)
+
+
+class _Compiler:
+    """Walks the allowlisted ast and returns (Expr, kind) with kind "num", "str" or "bool".
+
+    Errors quote the offending fragment rather than a character offset: the
+    infix rewrite respaces the text, so offsets would not match the input.
+    """
+
+    def __init__(self, schema: Dict[str, str]) -> None:
+        self.schema = schema
+
+    def compile(self, node: ast.AST) -> Tuple[Expr, str]:
+        method = getattr(self, f"visit_{type(node).__name__}", None)
+        if method is None:
+            raise ValueError(f"'{ast.unparse(node)}' is not allowed in a filter")
+        return method(node)
+
+    def expect(self, node: ast.AST, kind: str) -> Expr:
+        expr, got = self.compile(node)
+        if got != kind:
+            wanted = {"num": "a number", "str": "text", "bool": "a condition"}[kind]
+            raise ValueError(f"'{ast.unparse(node)}' must be {wanted}")
+        return expr
+
+    def visit_Name(self, node: ast.Name) -> Tuple[Expr, str]:
+        if node.id not in self.schema:
+            raise ValueError(f"Unknown column '{node.id}'. Available: {', '.join(self.schema)}")
+        return Col(node.id), self.schema[node.id]
+
+    def visit_Constant(self, node: ast.Constant) -> Tuple[Expr, str]:
+        value = node.value
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError(f"Literal {value!r} is not allowed; use numbers or quoted text")
+        return Lit(value), "str" if isinstance(value, str) else "num"
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> Tuple[Expr, str]:
+        if isinstance(node.op, ast.Not):
+            return ~self.expect(node.operand, "bool"), "bool"
+        if isinstance(node.op, ast.USub):
+            return -self.expect(node.operand, "num"), "num"
+        if isinstance(node.op, ast.UAdd):
+            return self.expect(node.operand, "num"), "num"
+        raise ValueError("Only not, - and + are allowed as unary operators")
+
+    def visit_BinOp(self, node: ast.BinOp) -> Tuple[Expr, str]:
+        op = _ARITH_OPS.get(type(node.op))
+        if op is None:
+            raise ValueError("Only + - * / are allowed in arithmetic")
+        left, right = self.expect(node.left, "num"), self.expect(node.right, "num")
+        return BinaryExpr(op, left, right), "num"
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> Tuple[Expr, str]:
+        parts = [self.expect(v, "bool") for v in node.values]
+        expr = parts[0]
+        for part in parts[1:]:
+            expr = expr & part if isinstance(node.op, ast.And) else expr | part
+        return expr, "bool"
+
+    def visit_Compare(self, node: ast.Compare) -> Tuple[Expr, str]:
+        # a < b < c is (a < b) and (b < c), as in Python
+        terms: List[Expr] = []
+        left_node = node.left
+        left, left_kind = self.compile(left_node)
+        for op, right_node in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.Is, ast.IsNot)):
+                if not (isinstance(right_node, ast.Constant) and right_node.value is None):
+                    raise ValueError("'is' only works with None (e.g. final is None)")
+                terms.append(left.is_null() if isinstance(op, ast.Is) else left.is_not_null())
+                continue
+            if isinstance(op, (ast.In, ast.NotIn)):
+                if not isinstance(right_node, (ast.List, ast.Tuple, ast.Set)):
+                    raise ValueError("'in' needs a list of values, e.g. section in [\"BSIT 2-1\", \"BSIT 2-2\"]")
+                values = [self.compile(v) for v in right_node.elts]
+                if any(not isinstance(e, Lit) or kind != left_kind for e, kind in values):
+                    raise ValueError(f"'in' list must hold {'numbers' if left_kind == 'num' else 'quoted text'}")
+                member = left.isin(e.value for e, _ in values)  # type: ignore[attr-defined]
+                terms.append(member if isinstance(op, ast.In) else ~member)
+                continue
+            right, right_kind = self.compile(right_node)
+            if left_kind == "bool" or left_kind != right_kind:
+                raise ValueError(f"Cannot compare {ast.unparse(left_node)} with {ast.unparse(right_node)}")
+            terms.append(BinaryExpr(_COMPARE_OPS[type(op)], left, right))
+            left_node, left, left_kind = right_node, right, right_kind
+        expr = terms[0]
+        for term in terms[1:]:
+            expr = expr & term
+        return expr, "bool"
+
+    def visit_Call(self, node: ast.Call) -> Tuple[Expr, str]:
+        func = node.func
+        if not (isinstance(func, ast.Attribute) and func.attr in STRING_OPS):
+            raise ValueError(f"Only {', '.join(STRING_OPS)} can be called")
+        if node.keywords or len(node.args) != 1 or not isinstance(node.args[0], ast.Constant) or not isinstance(node.args[0].value, str):
+            raise ValueError(f"{func.attr} takes one quoted text, e.g. section {func.attr} \"BSIT\"")
+        operand = self.expect(func.value, "str")
+        return getattr(operand, func.attr)(node.args[0].value), "bool"
+
+
+def parse_filter(text: str, schema: Dict[str, str]) -> Expr:
+    """Compile a filter into an Expr; schema maps column names to "num" or "str".
+
+    Raises ValueError with a readable message for anything outside the language.
+    """
+    text = text.strip()
+    if not text:
+        raise ValueError("Filter is empty")
+    if len(text) > MAX_FILTER_LENGTH:
+        raise ValueError(f"Filter is longer than {MAX_FILTER_LENGTH} characters")
+    try:
+        tree = ast.parse(_rewrite_infix(text), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Could not parse filter: {e.msg}") from None
+    if sum(1 for _ in ast.walk(tree)) > MAX_FILTER_NODES:
+        raise ValueError(f"Filter has more than {MAX_FILTER_NODES} parts")
+    expr, kind = _Compiler(schema).compile(tree.body)
+    if kind != "bool":
+        raise ValueError("Filter must be a condition, e.g. final < 60")
+    return expr
+
+
+def columns_schema(cols: RosterColumns) -> Dict[str, str]:
+    """Column kinds of a RosterColumns view, for parse_filter."""
+    return {**{k: "str" for k in cols.text}, **{k: "num" for k in cols.numeric}}
+
+
+def filter_mask(text: str, cols: RosterColumns) -> np.ndarray:
+    """Boolean mask over the rows of cols for a filter expression."""
+    expr = parse_filter(text, columns_schema(cols))
+    mask = expr.evaluate({**cols.text, **cols.numeric})
+    return np.broadcast_to(np.asarray(mask, dtype=bool), (len(cols),))
+
+
+def filter_indices(text: str, cols: RosterColumns) -> np.ndarray:
+    """Row indices matching a filter, in roster order."""
+    return np.flatnonzero(filter_mask(text, cols))
+
+
+def referenced_columns(text: str, schema: Dict[str, str]) -> Sequence[str]:
+    """Columns a filter reads, in schema order."""
+    used = parse_filter(text, schema).columns()
+    return [name for name in schema if name in used]
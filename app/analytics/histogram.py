@@ -0,0 +1,90 @@
+"""Pre-binned histograms shared by the plots and the terminal views.
+
+Authors:
+- John Christian Linaban
+
+compute_histogram() bins one score column with np.histogram (same default
+edges as plt.hist: `bins` equal-width bins over the data's min..max).
+The renderers then draw the counts as bars, so a plot of 1M rows costs the
+same as one of 1k once the counts exist.
+
+HistogramService memoizes the counts per (column, section, bins) in an
+AnalyticsCache, which already drops every entry when the roster version
+changes. On a miss, get_many() bins all requested keys from one columnar pass.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.analytics.cache import AnalyticsCache
+from app.analytics.columnar import build_columns
+
+DEFAULT_BINS = 10
+
+
+@dataclass(frozen=True)
+class Histogram:
+    key: str
+    counts: np.ndarray  # per-bin counts
+    edges: np.ndarray  # len(counts) + 1 bin edges
+    missing: int = 0  # values left out (None/NaN)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def widths(self) -> np.ndarray:
+        return np.diff(self.edges)
+
+
+def compute_histogram(
+    values: Any, key: str = "", bins: int = DEFAULT_BINS, value_range: Optional[Tuple[float, float]] = None
+) -> Histogram:
+    values = np.asarray(values, dtype=float)
+    present = values[~np.isnan(values)]
+    counts, edges = np.histogram(present, bins=bins, range=value_range)
+    return Histogram(key=key, counts=counts, edges=edges, missing=int(values.size - present.size))
+
+
+def histograms_for(
+    students: List[Dict[str, Any]], keys: Sequence[str], bins: int = DEFAULT_BINS
+) -> Dict[str, Histogram]:
+    """One histogram per key from a single columnar conversion."""
+    cols = build_columns(students, numeric_keys=list(keys), text_keys=())
+    return {key: compute_histogram(cols.numeric[key], key, bins) for key in keys}
+
+
+class HistogramService:
+    """Cached histograms keyed by (column, section, bins) and the roster version."""
+
+    def __init__(self, cache: Optional[AnalyticsCache] = None) -> None:
+        self.cache = cache if cache is not None else AnalyticsCache()
+
+    def get(
+        self, students: List[Dict[str, Any]], key: str, bins: int = DEFAULT_BINS, section: Optional[str] = None
+    ) -> Histogram:
+        return self.get_many(students, [key], bins, section)[key]
+
+    def get_many(
+        self,
+        students: List[Dict[str, Any]],
+        keys: Sequence[str],
+        bins: int = DEFAULT_BINS,
+        section: Optional[str] = None,
+    ) -> Dict[str, Histogram]:
+        """Histograms for several keys; students must be the rows of `section` (None = whole roster)."""
+        batch: Dict[str, Histogram] = {}
+
+        def compute(key: str) -> Histogram:
+            # The first miss bins every requested key from one columnar pass
+            if not batch:
+                batch.update(histograms_for(students, keys, bins))
+            return batch[key]
+
+        return {
+            key: self.cache.get_or_compute("histogram", lambda k=key: compute(k), section=section, params=(key, bins))
+            for key in keys
+        }
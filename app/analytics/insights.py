@@ -6,13 +6,18 @@ Authors:
 - John Miles Varca
 """
 
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from rich.console import Console
-from app.analytics.stats import calculate_percentile
+from app.analytics.stats import calculate_percentiles
 
-def find_outliers(students: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    Q1 = calculate_percentile(students, 25)
-    Q3 = calculate_percentile(students, 75)
+if TYPE_CHECKING:
+    from app.analytics.sketch import QuantileSketch
+
+def find_outliers(students: List[Dict[str, Any]], sketch: Optional["QuantileSketch"] = None) -> List[Dict[str, Any]]:
+    # With a sketch the fences come from the whole stream; students can be just one chunk
+    quartiles = calculate_percentiles(students, [25, 75], sketch=sketch)
+    Q1 = quartiles[25]
+    Q3 = quartiles[75]
     if Q1 is None or Q3 is None:
         return []
     IQR = Q3 - Q1
@@ -27,12 +32,16 @@ def find_outliers(students: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 
 
 
-def track_midterm_to_final_improvement(students: List[Dict[str, Any]]) -> Dict[str, Any]:
-    students_with_both = [
-        s for s in students
-        if s.get('midterm') is not None and s.get('final') is not None
-    ]
-    if not students_with_both:
+def _improvement_result(
+    total_students: int,
+    n_improved: int,
+    n_same: int,
+    n_declined: int,
+    sum_improvement: float,
+    sum_decline: float,
+) -> Dict[str, Any]:
+    """Build the improvement result dict from counts and sums (shared by all engines)."""
+    if total_students == 0:
         return {
             'total_students': 0,
             'counts': {'improved': 0, 'same': 0, 'declined': 0, 'declined_or_same': 0},
@@ -41,27 +50,21 @@ def track_midterm_to_final_improvement(students: List[Dict[str, Any]]) -> Dict[s
             'avg_decline': 0.0,
             'suggestions': [],
         }
-    improved = [s for s in students_with_both if s['final'] > s['midterm']]
-    declined_or_same = [s for s in students_with_both if s['final'] <= s['midterm']]
-    same = [s for s in students_with_both if s['final'] == s['midterm']]
-    declined = [s for s in students_with_both if s['final'] < s['midterm']]
-    total_students = len(students_with_both)
-    improved_pct = (len(improved) / total_students) * 100
-    same_pct = (len(same) / total_students) * 100
-    declined_pct = (len(declined) / total_students) * 100
-    declined_or_same_pct = (len(declined_or_same) / total_students) * 100
-    improvements = [s['final'] - s['midterm'] for s in improved]
-    avg_improvement = sum(improvements) / len(improvements) if improvements else 0.0
-    declines = [s['midterm'] - s['final'] for s in declined]
-    avg_decline = sum(declines) / len(declines) if declines else 0.0
+    n_declined_or_same = n_declined + n_same
+    improved_pct = (n_improved / total_students) * 100
+    same_pct = (n_same / total_students) * 100
+    declined_pct = (n_declined / total_students) * 100
+    declined_or_same_pct = (n_declined_or_same / total_students) * 100
+    avg_improvement = sum_improvement / n_improved if n_improved else 0.0
+    avg_decline = sum_decline / n_declined if n_declined else 0.0
     suggestions: List[str] = []
     if declined_or_same_pct >= 30:
         suggestions.append(
             f"The {declined_or_same_pct:.0f}% who didn't improve may need different strategies for cumulative exams."
         )
-    if len(declined) > 0:
+    if n_declined > 0:
         suggestions.append(
-            f"Provide additional resources or remediation for {len(declined)} students who declined."
+            f"Provide additional resources or remediation for {n_declined} students who declined."
         )
     if improved_pct < 50:
         suggestions.append("Less than half improved—review final exam prep and study sessions.")
@@ -70,10 +73,10 @@ def track_midterm_to_final_improvement(students: List[Dict[str, Any]]) -> Dict[s
     return {
         'total_students': total_students,
         'counts': {
-            'improved': len(improved),
-            'same': len(same),
-            'declined': len(declined),
-            'declined_or_same': len(declined_or_same),
+            'improved': n_improved,
+            'same': n_same,
+            'declined': n_declined,
+            'declined_or_same': n_declined_or_same,
         },
         'percentages': {
             'improved': improved_pct,
@@ -86,16 +89,26 @@ def track_midterm_to_final_improvement(students: List[Dict[str, Any]]) -> Dict[s
         'suggestions': suggestions,
     }
 
-def correlate_attendance_and_grades(students: List[Dict[str, Any]], threshold: float = 80.0) -> Dict[str, Any]:
-    low_attendance = [
-        s for s in students
-        if s.get('attendance_percent') is not None and s['attendance_percent'] < threshold
-    ]
-    high_attendance = [
+
+def track_midterm_to_final_improvement(students: List[Dict[str, Any]]) -> Dict[str, Any]:
+    students_with_both = [
         s for s in students
-        if s.get('attendance_percent') is not None and s['attendance_percent'] >= threshold
+        if s.get('midterm') is not None and s.get('final') is not None
     ]
-    if not low_attendance and not high_attendance:
+    improved = [s for s in students_with_both if s['final'] > s['midterm']]
+    same = [s for s in students_with_both if s['final'] == s['midterm']]
+    declined = [s for s in students_with_both if s['final'] < s['midterm']]
+    improvements = [s['final'] - s['midterm'] for s in improved]
+    declines = [s['midterm'] - s['final'] for s in declined]
+    return _improvement_result(
+        len(students_with_both), len(improved), len(same), len(declined), sum(improvements), sum(declines)
+    )
+
+def _attendance_result(
+    threshold: float, low_count: int, high_count: int, low_avg_grade: float, high_avg_grade: float
+) -> Dict[str, Any]:
+    """Build the attendance correlation result dict (shared by all engines)."""
+    if not low_count and not high_count:
         return {
             'threshold': threshold,
             'low_count': 0,
@@ -106,17 +119,9 @@ def correlate_attendance_and_grades(students: List[Dict[str, Any]], threshold: f
             'insights': [],
             'suggestions': [],
         }
-    low_avg_grade = 0.0
-    high_avg_grade = 0.0
-    if low_attendance:
-        low_grades = [s.get('weighted_grade', 0) for s in low_attendance if s.get('weighted_grade') is not None]
-        low_avg_grade = sum(low_grades) / len(low_grades) if low_grades else 0.0
-    if high_attendance:
-        high_grades = [s.get('weighted_grade', 0) for s in high_attendance if s.get('weighted_grade') is not None]
-        high_avg_grade = sum(high_grades) / len(high_grades) if high_grades else 0.0
     insights: List[str] = []
     suggestions: List[str] = []
-    if low_attendance and high_attendance:
+    if low_count and high_count:
         qualifier = "significantly worse" if low_avg_grade < high_avg_grade else "similarly"
         insights.append(
             f"Low-attendance students (avg {low_avg_grade:.1f}%) performed {qualifier} vs high-attendance students (avg {high_avg_grade:.1f}%)."
@@ -128,7 +133,7 @@ def correlate_attendance_and_grades(students: List[Dict[str, Any]], threshold: f
             suggestions.append("Moderate correlation between attendance and grades.")
         else:
             insights.append("Correlation appears weak (small grade gap).")
-    elif low_attendance:
+    elif low_count:
         insights.append(f"Low-attendance group avg grade: {low_avg_grade:.1f}%.")
         suggestions.append("All students have low attendance—focus on improving attendance rates.")
     else:
@@ -136,8 +141,8 @@ def correlate_attendance_and_grades(students: List[Dict[str, Any]], threshold: f
         insights.append(f"All students meet attendance threshold (≥{threshold:.0f}%).")
     return {
         'threshold': threshold,
-        'low_count': len(low_attendance),
-        'high_count': len(high_attendance),
+        'low_count': low_count,
+        'high_count': high_count,
         'low_avg_grade': low_avg_grade,
         'high_avg_grade': high_avg_grade,
         'grade_difference': high_avg_grade - low_avg_grade,
@@ -145,6 +150,26 @@ def correlate_attendance_and_grades(students: List[Dict[str, Any]], threshold: f
         'suggestions': suggestions,
     }
 
+
+def correlate_attendance_and_grades(students: List[Dict[str, Any]], threshold: float = 80.0) -> Dict[str, Any]:
+    low_attendance = [
+        s for s in students
+        if s.get('attendance_percent') is not None and s['attendance_percent'] < threshold
+    ]
+    high_attendance = [
+        s for s in students
+        if s.get('attendance_percent') is not None and s['attendance_percent'] >= threshold
+    ]
+    low_avg_grade = 0.0
+    high_avg_grade = 0.0
+    if low_attendance:
+        low_grades = [s.get('weighted_grade', 0) for s in low_attendance if s.get('weighted_grade') is not None]
+        low_avg_grade = sum(low_grades) / len(low_grades) if low_grades else 0.0
+    if high_attendance:
+        high_grades = [s.get('weighted_grade', 0) for s in high_attendance if s.get('weighted_grade') is not None]
+        high_avg_grade = sum(high_grades) / len(high_grades) if high_grades else 0.0
+    return _attendance_result(threshold, len(low_attendance), len(high_attendance), low_avg_grade, high_avg_grade)
+
 def get_at_risk_students(students: List[Dict[str, Any]], cutoff: float) -> List[Dict[str, Any]]:
     """Return students whose weighted_grade is below the given cutoff."""
     at_risk: List[Dict[str, Any]] = []
@@ -179,30 +204,50 @@ def compare_sections(sections_data: Dict[str, List[Dict[str, Any]]]) -> Dict[str
             scores = [student.get(quiz_key) for student in students if student.get(quiz_key) is not None]
             section_averages[quiz_key] = (sum(scores) / len(scores)) if scores else 0.0
         average_scores[section_name] = section_averages
-    insights: List[str] = []
     lowest_per_quiz: Dict[str, Dict[str, Any]] = {}
     if len(sections_data) > 1:
         for quiz_key in sorted_quiz_keys:
             lowest_section = min(average_scores, key=lambda s: average_scores[s][quiz_key]) if average_scores else ""
             lowest_avg = average_scores[lowest_section][quiz_key] if lowest_section else 0.0
             lowest_per_quiz[quiz_key] = {"section": lowest_section, "avg": lowest_avg}
-            comparison_parts = [
-                f"{section}: {average_scores[section][quiz_key]:.0f}%"
-                for section in sorted(average_scores.keys())
-            ]
-            insight_str = ", ".join(comparison_parts)
-            pretty_quiz = quiz_key.replace('_', ' ').title()
-            insights.append(f"{pretty_quiz} — {insight_str}.")
-            insights.append(f"Lowest average for {pretty_quiz}: {lowest_section} ({lowest_avg:.0f}%).")
     return {
         'average_scores': average_scores,
         'quiz_keys': sorted_quiz_keys,
         'lowest_per_quiz': lowest_per_quiz,
-        'insights': insights,
+        'insights': _comparison_insights(average_scores, sorted_quiz_keys, lowest_per_quiz),
     }
 
+
+def _comparison_insights(
+    average_scores: Dict[str, Dict[str, float]],
+    quiz_keys: List[str],
+    lowest_per_quiz: Dict[str, Dict[str, Any]],
+) -> List[str]:
+    """Text lines for compare_sections; empty unless more than one section was compared."""
+    insights: List[str] = []
+    for quiz_key in quiz_keys:
+        if quiz_key not in lowest_per_quiz:
+            continue
+        lowest_section = lowest_per_quiz[quiz_key]["section"]
+        lowest_avg = lowest_per_quiz[quiz_key]["avg"]
+        comparison_parts = [
+            f"{section}: {average_scores[section][quiz_key]:.0f}%"
+            for section in sorted(average_scores.keys())
+        ]
+        insight_str = ", ".join(comparison_parts)
+        pretty_quiz = quiz_key.replace('_', ' ').title()
+        insights.append(f"{pretty_quiz} — {insight_str}.")
+        insights.append(f"Lowest average for {pretty_quiz}: {lowest_section} ({lowest_avg:.0f}%).")
+    return insights
+
 def find_hardest_topic(students: List[Dict[str, Any]]) -> Dict[str, Any]:
     quiz_averages, quiz_counts, hardest, lowest = get_quiz_averages(students)
+    return _hardest_topic_result(quiz_averages, quiz_counts, hardest, lowest)
+
+
+def _hardest_topic_result(
+    quiz_averages: Dict[str, float], quiz_counts: Dict[str, int], hardest: str, lowest: float
+) -> Dict[str, Any]:
     if not quiz_averages:
         return {
             'quiz_averages': {},
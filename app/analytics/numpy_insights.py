@@ -0,0 +1,189 @@
+"""NumPy implementations of the insights in insights.py.
+
+Authors:
+- John Christian Linaban
+
+Each *_numpy function takes the same arguments and returns the same result
+dict (or list) as its pure-Python counterpart. Work happens on score columns
+with boolean masks; the *_from_columns kernels are shared with summary.py so
+callers holding a RosterColumns can skip the dict-to-array conversion.
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.analytics.columnar import RosterColumns, build_columns
+from app.analytics.insights import (
+    _attendance_result,
+    _comparison_insights,
+    _hardest_topic_result,
+    _improvement_result,
+)
+from app.analytics.numpy_stats import percentiles_numpy
+
+if TYPE_CHECKING:
+    from app.analytics.sketch import QuantileSketch
+
+
+def _quiz_keys(students: List[Dict[str, Any]], case_insensitive: bool = True) -> List[str]:
+    # First-appearance order, like the dicts insights.py builds; min() ties depend on it
+    keys = dict.fromkeys(k for s in students for k in s)
+    if case_insensitive:
+        return [k for k in keys if k.lower().startswith('quiz')]
+    return [k for k in keys if k.startswith('quiz')]
+
+
+def quiz_stats_from_columns(cols: RosterColumns, quiz_keys: Sequence[str]) -> List[Any]:
+    quiz_averages: Dict[str, float] = {}
+    quiz_counts: Dict[str, int] = {}
+    for key in quiz_keys:
+        col = cols.numeric[key]
+        present = ~np.isnan(col)
+        count = int(present.sum())
+        if count:
+            quiz_averages[key] = float(col[present].sum() / count)
+            quiz_counts[key] = count
+    if quiz_averages:
+        hardest = min(quiz_averages, key=quiz_averages.get)
+        return [quiz_averages, quiz_counts, hardest, quiz_averages[hardest]]
+    return [quiz_averages, quiz_counts, "", 0.0]
+
+
+def improvement_from_columns(midterm: np.ndarray, final: np.ndarray) -> Dict[str, Any]:
+    both = ~np.isnan(midterm) & ~np.isnan(final)
+    diff = final[both] - midterm[both]
+    improved = diff > 0
+    declined = diff < 0
+    return _improvement_result(
+        int(diff.size),
+        int(improved.sum()),
+        int((diff == 0).sum()),
+        int(declined.sum()),
+        float(diff[improved].sum()),
+        float(-diff[declined].sum()),
+    )
+
+
+def attendance_from_columns(attendance: np.ndarray, grades: np.ndarray, threshold: float) -> Dict[str, Any]:
+    has_att = ~np.isnan(attendance)
+    low = has_att & (attendance < threshold)
+    high = has_att & (attendance >= threshold)
+    has_grade = ~np.isnan(grades)
+    low_grades = grades[low & has_grade]
+    high_grades = grades[high & has_grade]
+    low_avg = float(low_grades.mean()) if low_grades.size else 0.0
+    high_avg = float(high_grades.mean()) if high_grades.size else 0.0
+    return _attendance_result(threshold, int(low.sum()), int(high.sum()), low_avg, high_avg)
+
+
+def outlier_mask(grades: np.ndarray, quartiles: Optional[Dict[int, Optional[float]]] = None) -> np.ndarray:
+    """Rows outside the course-wide 1.5 x IQR fences (nearest-rank quartiles)."""
+    if quartiles is None:
+        quartiles = percentiles_numpy(grades, (25, 75))
+    q1, q3 = quartiles[25], quartiles[75]
+    if q1 is None or q3 is None:
+        return np.zeros(grades.shape, dtype=bool)
+    iqr = q3 - q1
+    with np.errstate(invalid="ignore"):
+        return (grades < q1 - 1.5 * iqr) | (grades > q3 + 1.5 * iqr)
+
+
+def find_outliers_numpy(students: List[Dict[str, Any]], sketch: Optional["QuantileSketch"] = None) -> List[Dict[str, Any]]:
+    cols = build_columns(students, numeric_keys=("weighted_grade",), text_keys=())
+    quartiles = sketch.percentiles((25, 75)) if sketch is not None else None
+    return [students[i] for i in np.flatnonzero(outlier_mask(cols.numeric["weighted_grade"], quartiles))]
+
+
+def track_midterm_to_final_improvement_numpy(students: List[Dict[str, Any]]) -> Dict[str, Any]:
+    cols = build_columns(students, numeric_keys=("midterm", "final"), text_keys=())
+    return improvement_from_columns(cols.numeric["midterm"], cols.numeric["final"])
+
+
+def correlate_attendance_and_grades_numpy(students: List[Dict[str, Any]], threshold: float = 80.0) -> Dict[str, Any]:
+    cols = build_columns(students, numeric_keys=("attendance_percent", "weighted_grade"), text_keys=())
+    return attendance_from_columns(cols.numeric["attendance_percent"], cols.numeric["weighted_grade"], threshold)
+
+
+def get_at_risk_students_numpy(students: List[Dict[str, Any]], cutoff: float) -> List[Dict[str, Any]]:
+    try:
+        cutoff_value = float(cutoff)
+    except (TypeError, ValueError):
+        return []
+    grades = build_columns(students, numeric_keys=("weighted_grade",), text_keys=()).numeric["weighted_grade"]
+    with np.errstate(invalid="ignore"):
+        return [students[i] for i in np.flatnonzero(grades < cutoff_value)]
+
+
+def get_quiz_averages_numpy(students: List[Dict[str, Any]]) -> List[Any]:
+    quiz_keys = _quiz_keys(students)
+    cols = build_columns(students, numeric_keys=quiz_keys, text_keys=())
+    return quiz_stats_from_columns(cols, quiz_keys)
+
+
+def find_hardest_topic_numpy(students: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return _hardest_topic_result(*get_quiz_averages_numpy(students))
+
+
+def grouped_means(
+    cols: RosterColumns,
+    keys: Sequence[str],
+    codes: Optional[np.ndarray] = None,
+    n_groups: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Groups x keys matrices of means and non-missing counts (missing groups average 0.0).
+
+    One weighted bincount per column; cost is O(N x K) regardless of the
+    number of groups.
+    """
+    if codes is None:
+        codes = cols.section_codes
+    if n_groups is None:
+        n_groups = len(cols.section_names)
+    sums = np.zeros((n_groups, len(keys)), dtype=float)
+    counts = np.zeros((n_groups, len(keys)), dtype=np.int64)
+    for j, key in enumerate(keys):
+        col = cols.numeric[key]
+        present = ~np.isnan(col)
+        group = codes[present]
+        counts[:, j] = np.bincount(group, minlength=n_groups)
+        sums[:, j] = np.bincount(group, weights=col[present], minlength=n_groups)
+    means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+    return means, counts
+
+
+def _section_quiz_matrix(sections_data: Dict[str, List[Dict[str, Any]]]) -> Tuple[List[str], List[str], np.ndarray]:
+    # Group codes follow sections_data order so argmin ties resolve like min() over the dict
+    names = list(sections_data.keys())
+    rows = [s for studs in sections_data.values() for s in studs]
+    quiz_keys = sorted(_quiz_keys(rows, case_insensitive=False))
+    cols = build_columns(rows, numeric_keys=quiz_keys, text_keys=())
+    codes = np.repeat(np.arange(len(names)), [len(studs) for studs in sections_data.values()])
+    means, _ = grouped_means(cols, quiz_keys, codes=codes, n_groups=len(names))
+    return names, quiz_keys, means
+
+
+def get_sections_quiz_averages_numpy(sections_data: Dict[str, List[Dict[str, Any]]]) -> List[Any]:
+    names, quiz_keys, means = _section_quiz_matrix(sections_data)
+    avg_by_section: Dict[str, Dict[str, float]] = {
+        name: dict(zip(quiz_keys, row)) for name, row in zip(names, means.tolist())
+    }
+    lowest: Dict[str, Dict[str, Any]] = {}
+    if names:
+        # Lowest section per quiz straight from the sections x quizzes matrix
+        lowest_idx = np.argmin(means, axis=0)
+        for j, quiz in enumerate(quiz_keys):
+            i = int(lowest_idx[j])
+            lowest[quiz] = {"section": names[i], "avg": float(means[i, j])}
+    return [avg_by_section, quiz_keys, lowest]
+
+
+def compare_sections_numpy(sections_data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    average_scores, quiz_keys, lowest = get_sections_quiz_averages_numpy(sections_data)
+    lowest_per_quiz = lowest if len(sections_data) > 1 else {}
+    return {
+        'average_scores': average_scores,
+        'quiz_keys': quiz_keys,
+        'lowest_per_quiz': lowest_per_quiz,
+        'insights': _comparison_insights(average_scores, quiz_keys, lowest_per_quiz),
+    }
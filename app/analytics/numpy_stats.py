@@ -4,8 +4,11 @@ Authors:
 - John Christian Linaban
 """
 
+import math
 import numpy as np
-from typing import Any, Dict, List, Sequence
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.analytics.binning import LetterBins
 
 def convert_to_numpy(students: List[Dict[str, Any]], score_keys: List[str]) -> np.ndarray:
     n_cols = len(score_keys)
@@ -75,3 +78,105 @@ def compute_weighted_grades_numpy(
         s["weighted_grade"] = float(g)
         out.append(s)
     return out
+
+
+def assign_letters_numpy(grades: np.ndarray, thresholds: Dict[str, int], below_label: str = "-D") -> np.ndarray:
+    """Vectorized letter per grade, using the same rounding rule as calculate_distribution."""
+    return LetterBins.from_thresholds(thresholds, below_label).assign(grades, missing_label=below_label)
+
+
+def letter_counts_matrix(grades: np.ndarray, thresholds: Dict[str, int]) -> List[Dict[str, int]]:
+    """calculate_distribution for every column of an N x K grade matrix in one bincount.
+
+    NaN grades are not counted.
+    """
+    return LetterBins.from_thresholds(thresholds).counts_matrix(grades)
+
+
+def nearest_rank_indices(n: int, percentiles: Sequence[int]) -> List[int]:
+    """Sorted-array positions for each percentile, using calculate_percentile's nearest-rank rule."""
+    out: List[int] = []
+    for pct in percentiles:
+        p = max(0, min(100, int(pct)))
+        if p == 0:
+            out.append(0)
+        elif p == 100:
+            out.append(n - 1)
+        else:
+            out.append(max(0, min(math.ceil((p / 100) * n) - 1, n - 1)))
+    return out
+
+
+def percentiles_numpy(values: np.ndarray, percentiles: Sequence[int]) -> Dict[int, Optional[float]]:
+    """Nearest-rank percentiles of non-NaN values from one multi-kth np.partition."""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {int(p): None for p in percentiles}
+    idx = nearest_rank_indices(values.size, percentiles)
+    part = np.partition(values, sorted(set(idx)))
+    return {int(p): float(part[i]) for p, i in zip(percentiles, idx)}
+
+
+def select_n_indices(grades: np.ndarray, student_ids: np.ndarray, n: int, largest: bool = True) -> np.ndarray:
+    """Row indices of the n highest (or lowest) grades in rank order.
+
+    np.argpartition finds the cutoff grade in O(N); only rows at or past the
+    cutoff (including every tie on it) are sorted, by grade then student_id.
+    Missing grades count as 0, like stats.get_top_n_students.
+    """
+    grades = np.nan_to_num(np.asarray(grades, dtype=float), nan=0.0)
+    total = grades.size
+    n = min(int(n), total)
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    key = -grades if largest else grades
+    if n < total:
+        cutoff = key[np.argpartition(key, n - 1)[n - 1]]
+        candidates = np.flatnonzero(key <= cutoff)
+    else:
+        candidates = np.arange(total)
+    order = np.lexsort((student_ids[candidates], key[candidates]))
+    return candidates[order[:n]]
+
+
+def grouped_percentiles(
+    values: np.ndarray, codes: np.ndarray, n_groups: int, percentiles: Sequence[int]
+) -> np.ndarray:
+    """Groups x percentiles matrix of nearest-rank percentiles (NaN for empty groups).
+
+    One lexsort orders every group at once; each answer is then a direct index
+    at group_start + nearest-rank offset.
+    """
+    values = np.asarray(values, dtype=float)
+    codes = np.asarray(codes)
+    keep = ~np.isnan(values)
+    values, codes = values[keep], codes[keep]
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    p = np.clip(np.asarray([int(x) for x in percentiles], dtype=float), 0, 100)
+    n = counts[:, None].astype(float)
+    offsets = np.ceil(p[None, :] / 100 * n) - 1
+    offsets = np.where(p[None, :] == 100, n - 1, offsets)
+    offsets = np.clip(offsets, 0, np.maximum(n - 1, 0)).astype(np.int64)
+    out = np.full((n_groups, len(p)), np.nan)
+    has_rows = counts > 0
+    out[has_rows] = sorted_values[starts[has_rows, None] + offsets[has_rows]]
+    return out
+
+
+def section_percentiles_numpy(
+    sections_data: Dict[str, List[Dict[str, Any]]], percentiles: Sequence[int], key: str = "weighted_grade"
+) -> Dict[str, Dict[int, Optional[float]]]:
+    """Percentile table for every section in one grouped pass."""
+    names = list(sections_data.keys())
+    values = np.array([s.get(key) for studs in sections_data.values() for s in studs], dtype=float)
+    codes = np.repeat(np.arange(len(names)), [len(studs) for studs in sections_data.values()])
+    table = grouped_percentiles(values, codes, len(names), percentiles)
+    return {
+        name: {int(p): (None if np.isnan(v) else float(v)) for p, v in zip(percentiles, row)}
+        for name, row in zip(names, table)
+    }
@@ -0,0 +1,141 @@
+"""Grouped outlier detection per section on any score column.
+
+Authors:
+- John Christian Linaban
+
+Methods (threshold defaults in DEFAULT_THRESHOLDS):
+- iqr: outside Q1 - k*IQR .. Q3 + k*IQR with nearest-rank quartiles, as in
+  find_outliers. Score = distance past the fence in IQRs.
+- zscore: |x - mean| / sd > t (population SD). Score = z.
+- mad: modified z-score 0.6745 * |x - median| / MAD > t (Iglewicz-Hoaglin).
+  Score = modified z.
+
+Every section's fences come from grouped statistics over the whole column:
+one lexsort (numpy_stats.grouped_percentiles) for quartiles and medians, or
+bincount sums for mean and SD. The flagged rows are then selected with a
+single mask comparison, so the cost does not grow with the number of
+sections. Missing values are never flagged; pass the rows as read (observed)
+when students went through compute_weighted_grades, which turns a missing
+midterm, final or attendance into 0. Sections with zero spread (SD or MAD
+of 0) flag nothing under zscore/mad.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.analytics.columnar import build_columns
+from app.analytics.numpy_stats import grouped_percentiles
+
+OUTLIER_METHODS = ("iqr", "zscore", "mad")
+DEFAULT_THRESHOLDS = {"iqr": 1.5, "zscore": 3.0, "mad": 3.5}
+_MAD_SCALE = 0.6745
+
+
+@dataclass
+class OutlierResult:
+    key: str
+    method: str
+    threshold: float
+    indices: np.ndarray  # flagged row indices into the students list
+    sections: List[str]  # section of each flagged row
+    reasons: List[str]  # "above" / "below" for each flagged row
+    scores: np.ndarray  # method score for each flagged row (see module docstring)
+    fences: Dict[str, Tuple[float, float]] = field(default_factory=dict)  # section -> (low, high)
+
+    def __len__(self) -> int:
+        return int(self.indices.size)
+
+    def rows(self, students: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Flagged students as dicts with outlier_* columns added (copies)."""
+        out = []
+        for i, sec, reason, score in zip(self.indices, self.sections, self.reasons, self.scores):
+            low, high = self.fences[sec]
+            out.append(dict(
+                students[i],
+                outlier_value=students[i].get(self.key),
+                outlier_reason=reason,
+                outlier_score=round(float(score), 2),
+                outlier_fence=round(high if reason == "above" else low, 2),
+            ))
+        return out
+
+
+def _group_fences(
+    values: np.ndarray, codes: np.ndarray, n_groups: int, method: str, threshold: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Per-group (low fence, high fence, centre, scale); NaN fences flag nothing."""
+    present = ~np.isnan(values)
+    if method == "iqr":
+        q = grouped_percentiles(values, codes, n_groups, (25, 75))
+        iqr = q[:, 1] - q[:, 0]
+        return q[:, 0] - threshold * iqr, q[:, 1] + threshold * iqr, q[:, 0], iqr
+    if method == "zscore":
+        counts = np.bincount(codes[present], minlength=n_groups)
+        sums = np.bincount(codes[present], weights=values[present], minlength=n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = sums / counts
+            dev = values - mean[codes]
+            var = np.bincount(codes[present], weights=dev[present] ** 2, minlength=n_groups) / counts
+        sd = np.sqrt(var)
+        sd = np.where(sd > 0, sd, np.nan)
+        return mean - threshold * sd, mean + threshold * sd, mean, sd
+    median = grouped_percentiles(values, codes, n_groups, (50,))[:, 0]
+    mad = grouped_percentiles(np.abs(values - median[codes]), codes, n_groups, (50,))[:, 0]
+    mad = np.where(mad > 0, mad, np.nan)
+    half_width = threshold * mad / _MAD_SCALE
+    return median - half_width, median + half_width, median, mad
+
+
+def grouped_outliers(
+    students: List[Dict[str, Any]],
+    key: str = "weighted_grade",
+    method: str = "iqr",
+    threshold: Optional[float] = None,
+    group_key: str = "section",
+    observed: Optional[Sequence[Dict[str, Any]]] = None,
+) -> OutlierResult:
+    """Outliers of `key` within each `group_key` group, flagged rows in roster order.
+
+    observed holds the rows as read, lined up with students; score columns are
+    taken from it so zero-filled gaps stay missing, while weighted_grade still
+    comes from students (default: students themselves).
+    """
+    if method not in OUTLIER_METHODS:
+        raise ValueError(f"Unknown outlier method '{method}'. Expected one of: {', '.join(OUTLIER_METHODS)}")
+    threshold = float(DEFAULT_THRESHOLDS[method] if threshold is None else threshold)
+    rows = list(observed) if observed is not None else students
+    if len(rows) != len(students):
+        raise ValueError("observed rows must line up with students")
+    if key == "weighted_grade":
+        rows = students
+    cols = build_columns(students, numeric_keys=(), text_keys=(group_key,))
+    values = build_columns(rows, numeric_keys=(key,), text_keys=()).numeric[key]
+    names, codes = np.unique(cols.text[group_key].astype(str), return_inverse=True)
+    codes = codes.astype(np.int64)
+    low, high, centre, scale = _group_fences(values, codes, len(names), method, threshold)
+
+    with np.errstate(invalid="ignore"):
+        below = values < low[codes]
+        above = values > high[codes]
+    flagged = np.flatnonzero(below | above)
+    v, c = values[flagged], codes[flagged]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if method == "iqr":
+            scores = np.where(above[flagged], v - high[c], low[c] - v) / np.where(scale[c] > 0, scale[c], np.nan)
+        elif method == "zscore":
+            scores = np.abs(v - centre[c]) / scale[c]
+        else:
+            scores = _MAD_SCALE * np.abs(v - centre[c]) / scale[c]
+
+    return OutlierResult(
+        key=key,
+        method=method,
+        threshold=threshold,
+        indices=flagged,
+        sections=[str(names[i]) for i in c],
+        reasons=["above" if a else "below" for a in above[flagged]],
+        scores=scores,
+        fences={str(name): (float(low[g]), float(high[g])) for g, name in enumerate(names)},
+    )
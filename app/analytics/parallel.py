@@ -0,0 +1,214 @@
+"""Parallel per-section analytics over a shared-memory score matrix.
+
+Authors:
+- John Christian Linaban
+
+run_section_analytics() lays the roster out as one float64 matrix with rows
+grouped by section (scores, weighted grade, plus integer ranks of any text
+sort keys and of student_id for tie-breaking) and places it in a
+multiprocessing.shared_memory block. Sections are split into chunks of
+similar row counts, and each ProcessPoolExecutor worker attaches to the block
+by name, so the roster is never pickled per task. Workers send back only row
+indices and small aggregates, which the parent maps to student dicts.
+
+Available analytics (any subset):
+- "sort": stable sort per key in sort_by, same order as core.sort_students.
+- "top_bottom": top and bottom n, same as get_top_n_students/get_bottom_n_students.
+- "distribution": letter counts, same as calculate_distribution.
+- "hardest_topic": [quiz_averages, quiz_counts, hardest_quiz, lowest], same as get_quiz_averages.
+
+Small inputs (fewer than min_rows rows, a single section or max_workers=1)
+run the same kernel serially, since process start-up would cost more than the
+work itself. Results always come back in sections_data order.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.analytics.binning import LetterBins
+from app.analytics.columnar import QUIZ_KEYS, TEXT_KEYS
+from app.analytics.numpy_stats import select_n_indices
+
+SECTION_ANALYTICS = ("sort", "top_bottom", "distribution", "hardest_topic")
+PARALLEL_MIN_ROWS = 20_000
+
+
+def _text_ranks(values: List[str]) -> np.ndarray:
+    # Equal strings share a rank; rank order is string order
+    _, inverse = np.unique(np.array(values, dtype=str), return_inverse=True)
+    return inverse.astype(float)
+
+
+def _build_matrix(
+    sections_data: Dict[str, List[Dict[str, Any]]], sort_by: Dict[str, bool]
+) -> Tuple[np.ndarray, Dict[str, int], List[Tuple[int, int]]]:
+    rows = [s for studs in sections_data.values() for s in studs]
+    keys = ["weighted_grade"] + list(QUIZ_KEYS) + [k for k in sort_by if k not in TEXT_KEYS and k != "weighted_grade"]
+    colmap = {k: i for i, k in enumerate(keys)}
+    data = np.empty((len(rows), len(keys) + 1 + len([k for k in sort_by if k in TEXT_KEYS])), dtype=np.float64)
+    for key, j in colmap.items():
+        data[:, j] = np.array([s.get(key) for s in rows], dtype=float)
+    colmap["_id_rank"] = len(keys)
+    data[:, len(keys)] = _text_ranks([str(s.get("student_id", "")) for s in rows])
+    j = len(keys) + 1
+    for key in sort_by:
+        if key in TEXT_KEYS:
+            colmap[key] = j
+            data[:, j] = _text_ranks([str(s.get(key) or "") for s in rows])
+            j += 1
+    bounds = []
+    start = 0
+    for studs in sections_data.values():
+        bounds.append((start, start + len(studs)))
+        start += len(studs)
+    return data, colmap, bounds
+
+
+def _section_kernel(
+    block: np.ndarray,
+    colmap: Dict[str, int],
+    analytics: Sequence[str],
+    sort_by: Dict[str, bool],
+    n: int,
+    bins: LetterBins,
+) -> Dict[str, Any]:
+    """Analytics for one section's rows; index results are local to the block."""
+    out: Dict[str, Any] = {}
+    grades = block[:, colmap["weighted_grade"]]
+    if "sort" in analytics:
+        out["sort"] = {}
+        for key, reverse in sort_by.items():
+            col = np.nan_to_num(block[:, colmap[key]], nan=0.0)
+            out["sort"][key] = np.argsort(-col if reverse else col, kind="stable")
+    if "top_bottom" in analytics:
+        ids = block[:, colmap["_id_rank"]]
+        out["top"] = select_n_indices(grades, ids, n, largest=True)
+        out["bottom"] = select_n_indices(grades, ids, n, largest=False)
+    if "distribution" in analytics:
+        out["distribution"] = bins.counts(grades)
+    if "hardest_topic" in analytics:
+        averages: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        for key in QUIZ_KEYS:
+            col = block[:, colmap[key]]
+            present = ~np.isnan(col)
+            count = int(present.sum())
+            if count:
+                averages[key] = float(col[present].sum() / count)
+                counts[key] = count
+        if averages:
+            hardest = min(averages, key=averages.get)
+            out["hardest_topic"] = [averages, counts, hardest, averages[hardest]]
+        else:
+            out["hardest_topic"] = [averages, counts, "", 0.0]
+    return out
+
+
+def _run_chunk(
+    shm_name: str,
+    shape: Tuple[int, int],
+    bounds: List[Tuple[int, int]],
+    colmap: Dict[str, int],
+    analytics: Sequence[str],
+    sort_by: Dict[str, bool],
+    n: int,
+    thresholds: Dict[str, int],
+) -> List[Dict[str, Any]]:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        data = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        bins = LetterBins.from_thresholds(thresholds)
+        results = [_section_kernel(data[s:e], colmap, analytics, sort_by, n, bins) for s, e in bounds]
+        del data  # release the buffer view before closing
+    finally:
+        shm.close()
+    return results
+
+
+def _chunk_bounds(bounds: List[Tuple[int, int]], n_chunks: int) -> List[List[Tuple[int, int]]]:
+    # Consecutive sections grouped so each chunk holds about the same number of rows
+    total = bounds[-1][1] if bounds else 0
+    target = max(1, total // max(1, n_chunks))
+    chunks: List[List[Tuple[int, int]]] = [[]]
+    size = 0
+    for s, e in bounds:
+        if size >= target and chunks[-1]:
+            chunks.append([])
+            size = 0
+        chunks[-1].append((s, e))
+        size += e - s
+    return chunks
+
+
+def run_section_analytics(
+    sections_data: Dict[str, List[Dict[str, Any]]],
+    thresholds: Dict[str, int],
+    analytics: Sequence[str] = SECTION_ANALYTICS,
+    sort_by: Optional[Dict[str, bool]] = None,
+    n: int = 3,
+    max_workers: Optional[int] = None,
+    min_rows: int = PARALLEL_MIN_ROWS,
+) -> Dict[str, Dict[str, Any]]:
+    """Run the selected analytics for every section, in parallel when the roster is large.
+
+    sort_by maps a key to reverse (default {"weighted_grade": True}). Each
+    section's result dict holds "sort" ({key: sorted students}), "top" and
+    "bottom" (student lists), "distribution" and "hardest_topic", for the
+    analytics requested.
+    """
+    unknown = set(analytics) - set(SECTION_ANALYTICS)
+    if unknown:
+        raise ValueError(f"Unknown section analytics: {', '.join(sorted(unknown))}")
+    sort_by = dict(sort_by) if sort_by else {"weighted_grade": True}
+    names = list(sections_data.keys())
+    if not names:
+        return {}
+    data, colmap, bounds = _build_matrix(sections_data, sort_by)
+
+    workers = max_workers or os.cpu_count() or 1
+    if len(data) < min_rows or len(names) < 2 or workers <= 1:
+        bins = LetterBins.from_thresholds(thresholds)
+        raw = [_section_kernel(data[s:e], colmap, analytics, sort_by, n, bins) for s, e in bounds]
+    else:
+        chunks = _chunk_bounds(bounds, workers * 4)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+        try:
+            shared = np.ndarray(data.shape, dtype=np.float64, buffer=shm.buf)
+            shared[:] = data
+            del shared
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                futures = [
+                    pool.submit(_run_chunk, shm.name, data.shape, chunk, colmap, list(analytics), sort_by, n, thresholds)
+                    for chunk in chunks
+                ]
+                raw = [res for f in futures for res in f.result()]
+        finally:
+            shm.close()
+            shm.unlink()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, studs, res in zip(names, sections_data.values(), raw):
+        section: Dict[str, Any] = {}
+        if "sort" in res:
+            section["sort"] = {key: [studs[i] for i in idx] for key, idx in res["sort"].items()}
+        if "top" in res:
+            section["top"] = [studs[i] for i in res["top"]]
+            section["bottom"] = [studs[i] for i in res["bottom"]]
+        for key in ("distribution", "hardest_topic"):
+            if key in res:
+                section[key] = res[key]
+        results[name] = section
+    return results
+
+
+def parallel_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """max_workers / min_rows from config's optional analytics.parallel block."""
+    cfg = config.get("analytics", {}).get("parallel", {})
+    return {
+        "max_workers": cfg.get("max_workers"),
+        "min_rows": int(cfg.get("min_rows", PARALLEL_MIN_ROWS)),
+    }
@@ -0,0 +1,111 @@
+"""Final exam planner: the final score each student needs for every letter.
+
+Authors:
+- John Christian Linaban
+
+The weighted grade is linear in the final exam score:
+
+    grade = pre_final + w_final * final
+
+where pre_final is the quiz average, midterm and attendance part of
+compute_weighted_grades (missing values as 0). So the score needed for a
+letter threshold T is (T - pre_final) / w_final, rounded up to 2 decimals.
+Evaluated as one N x L broadcast over all students and letters.
+
+Each cell gets a status:
+- secured: T is reached even with a final of 0.
+- needed: a final between 0 and final_max reaches T.
+- impossible: even a perfect final (final_max) falls short.
+
+Any final already recorded in the roster is ignored, since it is the unknown
+being solved for.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from app.analytics.scenarios import COMPONENTS, component_matrix
+
+SECURED, NEEDED, IMPOSSIBLE = 0, 1, 2
+STATUS_LABELS = {SECURED: "secured", NEEDED: "needed", IMPOSSIBLE: "impossible"}
+PLAN_ID_KEYS = ("student_id", "last_name", "first_name", "section")
+_FINAL = COMPONENTS.index("final")
+
+
+@dataclass
+class FinalPlan:
+    letters: List[str]  # highest threshold first
+    thresholds: np.ndarray  # L letter cutoffs, same order as letters
+    pre_final: np.ndarray  # N weighted grade before the final
+    required: np.ndarray  # N x L final score needed (<= 0 secured, > final_max impossible)
+    status: np.ndarray  # N x L SECURED / NEEDED / IMPOSSIBLE codes
+    final_weight: float
+    final_max: float = 100.0
+
+    def cell(self, i: int, j: int) -> Union[float, str]:
+        """Required score for student i and letter j, or its status label."""
+        code = int(self.status[i, j])
+        return float(self.required[i, j]) if code == NEEDED else STATUS_LABELS[code]
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Per letter: how many students have it secured, within reach or out of reach."""
+        return {
+            letter: {label: int((self.status[:, j] == code).sum()) for code, label in STATUS_LABELS.items()}
+            for j, letter in enumerate(self.letters)
+        }
+
+    def rows(self, students: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One export row per student: identity, pre-final grade and final_for_<letter> columns."""
+        pre = np.round(self.pre_final, 2).tolist()
+        required = self.required.tolist()
+        status = self.status.tolist()
+        cols = [f"final_for_{letter}" for letter in self.letters]
+        out = []
+        for i, s in enumerate(students):
+            row = {k: s.get(k) for k in PLAN_ID_KEYS}
+            row["pre_final_grade"] = pre[i]
+            for j, col in enumerate(cols):
+                code = status[i][j]
+                row[col] = required[i][j] if code == NEEDED else STATUS_LABELS[code]
+            out.append(row)
+        return out
+
+
+def plan_final_scores(
+    students: List[Dict[str, Any]],
+    weights: Dict[str, float],
+    thresholds: Dict[str, float],
+    final_max: float = 100.0,
+    letters: Optional[List[str]] = None,
+) -> FinalPlan:
+    """Final score needed for every student (rows) and letter threshold (columns).
+
+    letters restricts the plan to those letters (default: every configured one).
+    """
+    chosen = sorted(letters if letters is not None else thresholds, key=lambda l: -float(thresholds[l]))
+    T = np.array([float(thresholds[l]) for l in chosen], dtype=float)
+    w = np.array([float(weights.get(c, 0.0)) for c in COMPONENTS], dtype=float)
+    w_final = w[_FINAL]
+    w[_FINAL] = 0.0
+    pre_final = component_matrix(students) @ w
+
+    gap = T[None, :] - pre_final[:, None]
+    if w_final > 0:
+        # Round up so pre_final + w_final * required always reaches T; the
+        # small epsilon keeps float noise (e.g. 80.0000001) from adding a cent
+        required = np.ceil(gap / w_final * 100 - 1e-6) / 100
+    else:
+        # The final carries no weight: the letter is either already in hand or out of reach
+        required = np.where(gap <= 0, 0.0, np.inf)
+    status = np.where(required <= 0, SECURED, np.where(required > final_max, IMPOSSIBLE, NEEDED)).astype(np.int8)
+    return FinalPlan(
+        letters=chosen,
+        thresholds=T,
+        pre_final=pre_final,
+        required=required,
+        status=status,
+        final_weight=float(w_final),
+        final_max=float(final_max),
+    )
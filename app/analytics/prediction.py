@@ -0,0 +1,186 @@
+"""Least-squares prediction of the final exam from quizzes, midterm and attendance.
+
+Authors:
+- John Christian Linaban
+
+fit_final_model() fits final ~ quiz1..quiz5 + midterm + attendance + 1 for
+every section at once. Rows without a recorded final are left out of the
+fit. A missing feature is filled with its section mean, or the course mean
+if the section has none.
+
+np.linalg.lstsq has no batch dimension, so the per-section fits are done as
+stacked normal equations. The features are centred on the section means, the
+G x F x F Gram matrices and G x F cross products are built with one bincount
+per feature pair, and all G systems are solved by one broadcast
+np.linalg.pinv. pinv gives the same minimum-norm answer as lstsq when a
+section is rank deficient. The course-wide model is a plain np.linalg.lstsq.
+Sections with fewer than min_rows training rows use the course-wide model.
+
+predict() scores every student with one row-wise product against the
+coefficients of their section. CLI callers cache the fitted model in the
+AnalyticsCache, so it is refit only when the roster version changes.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.analytics.columnar import QUIZ_KEYS, build_columns
+
+FEATURE_KEYS = tuple(QUIZ_KEYS) + ("midterm", "attendance_percent")
+TARGET_KEY = "final"
+COURSE = "All sections"
+MIN_SECTION_ROWS = 2 * (len(FEATURE_KEYS) + 1)
+
+
+@dataclass
+class FinalModel:
+    sections: List[str]  # fitted sections, then COURSE as the last row
+    coef: np.ndarray  # (G + 1) x F slopes in FEATURE_KEYS order
+    intercept: np.ndarray  # G + 1
+    n_train: np.ndarray  # G + 1 rows with a recorded final
+    r2: np.ndarray  # G + 1 in-sample R^2 (NaN with no spread in the final)
+    rmse: np.ndarray  # G + 1 in-sample root mean squared error
+    pooled: np.ndarray  # G + 1 True where the course-wide model stands in
+    feature_means: np.ndarray  # (G + 1) x F fill values for missing features
+
+    def quality(self) -> List[Dict[str, Any]]:
+        """One row per section (and the course) with n, R^2, RMSE and which model it uses."""
+        last = len(self.sections) - 1
+        return [
+            {
+                "section": name,
+                "n": int(self.n_train[g]),
+                "r2": float(self.r2[g]),
+                "rmse": float(self.rmse[g]),
+                "model": "course" if g == last else "course-wide" if self.pooled[g] else "section",
+                "midterm_coef": float(self.coef[g, FEATURE_KEYS.index("midterm")]),
+            }
+            for g, name in enumerate(self.sections)
+        ]
+
+    def _design(self, rows: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        cols = build_columns(list(rows), numeric_keys=FEATURE_KEYS, text_keys=())
+        index = {name: g for g, name in enumerate(self.sections[:-1])}
+        # Sections the model has not seen fall back to the course-wide row
+        groups = np.array([index.get(name, len(self.sections) - 1) for name in cols.section_names], dtype=np.int64)
+        g = groups[cols.section_codes] if len(cols) else np.zeros(0, dtype=np.int64)
+        X = cols.matrix(FEATURE_KEYS)
+        return np.where(np.isnan(X), self.feature_means[g], X), g
+
+    def predict(self, rows: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Predicted final for every row, clipped to 0..100."""
+        X, g = self._design(rows)
+        return np.clip(np.einsum("ij,ij->i", X, self.coef[g]) + self.intercept[g], 0.0, 100.0)
+
+
+def _group_means(X: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """G x F means of the present values, NaN where a group has none."""
+    present = ~np.isnan(X)
+    filled = np.where(present, X, 0.0)
+    sums = np.stack([np.bincount(codes, weights=filled[:, j], minlength=n_groups) for j in range(X.shape[1])], axis=1)
+    counts = np.stack([np.bincount(codes, weights=present[:, j], minlength=n_groups) for j in range(X.shape[1])], axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def fit_final_model(
+    students: List[Dict[str, Any]],
+    observed: Optional[Sequence[Dict[str, Any]]] = None,
+    min_rows: int = MIN_SECTION_ROWS,
+) -> FinalModel:
+    """Per-section least-squares fits of the final exam on FEATURE_KEYS.
+
+    observed holds the rows as read; compute_weighted_grades turns a missing
+    final into 0, which would otherwise be fitted as a real score (default:
+    students themselves).
+    """
+    rows = list(observed) if observed is not None else students
+    cols = build_columns(rows, numeric_keys=FEATURE_KEYS + (TARGET_KEY,), text_keys=())
+    G, F = len(cols.section_names), len(FEATURE_KEYS)
+    codes = cols.section_codes
+    X = cols.matrix(FEATURE_KEYS)
+    y = cols.numeric[TARGET_KEY]
+
+    # Fill values: section means, then course means, then 0
+    course_means = np.nan_to_num(_group_means(X, np.zeros(len(cols), dtype=np.int64), 1)[0], nan=0.0)
+    means = _group_means(X, codes, G)
+    means = np.vstack([np.where(np.isnan(means), course_means, means), course_means])
+    X = np.where(np.isnan(X), means[codes], X)
+
+    train = ~np.isnan(y)
+    Xt, yt, ct = X[train], y[train], codes[train]
+    n = np.bincount(ct, minlength=G)
+
+    # Course-wide model
+    course_coef, course_intercept = np.zeros(F), float(yt.mean()) if yt.size else 0.0
+    if yt.size:
+        solution = np.linalg.lstsq(np.column_stack([Xt, np.ones(yt.size)]), yt, rcond=None)[0]
+        course_coef, course_intercept = solution[:F], float(solution[F])
+
+    # Every section at once: centred normal equations, one batched pinv
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xbar = np.stack([np.bincount(ct, weights=Xt[:, j], minlength=G) for j in range(F)], axis=1) / n[:, None]
+        ybar = np.bincount(ct, weights=yt, minlength=G) / n
+    Xc = Xt - xbar[ct]
+    yc = yt - ybar[ct]
+    gram = np.empty((G, F, F))
+    for j in range(F):
+        for k in range(j, F):
+            gram[:, j, k] = gram[:, k, j] = np.bincount(ct, weights=Xc[:, j] * Xc[:, k], minlength=G)
+    cross = np.stack([np.bincount(ct, weights=Xc[:, j] * yc, minlength=G) for j in range(F)], axis=1)
+    coef = (np.linalg.pinv(gram) @ cross[:, :, None])[:, :, 0]
+    intercept = ybar - np.einsum("gf,gf->g", xbar, coef)
+
+    pooled = n < max(int(min_rows), 1)
+    coef = np.vstack([np.where(pooled[:, None], course_coef, coef), course_coef])
+    intercept = np.r_[np.where(pooled, course_intercept, intercept), course_intercept]
+
+    # In-sample fit quality per section and for the course
+    fitted = np.einsum("ij,ij->i", Xt, coef[ct]) + intercept[ct]
+    course_fitted = Xt @ course_coef + course_intercept
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sse = np.r_[np.bincount(ct, weights=(yt - fitted) ** 2, minlength=G), ((yt - course_fitted) ** 2).sum()]
+        sst = np.r_[np.bincount(ct, weights=yc ** 2, minlength=G), ((yt - yt.mean()) ** 2).sum() if yt.size else 0.0]
+        counts = np.r_[n, yt.size]
+        r2 = np.where(sst > 0, 1.0 - sse / sst, np.nan)
+        rmse = np.sqrt(sse / counts)
+    return FinalModel(
+        sections=list(cols.section_names) + [COURSE],
+        coef=coef,
+        intercept=intercept,
+        n_train=counts,
+        r2=r2,
+        rmse=rmse,
+        pooled=np.r_[pooled, False],
+        feature_means=means,
+    )
+
+
+def predicted_at_risk(
+    students: List[Dict[str, Any]],
+    model: FinalModel,
+    weights: Dict[str, float],
+    cutoff: float,
+    observed: Optional[Sequence[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Students with no final yet whose grade with the predicted final is below cutoff, lowest first.
+
+    Rows are copies with predicted_final and predicted_grade added.
+    """
+    rows = list(observed) if observed is not None else students
+    finals = build_columns(rows, numeric_keys=(TARGET_KEY,), text_keys=()).numeric[TARGET_KEY]
+    pending = np.flatnonzero(np.isnan(finals))
+    if not pending.size:
+        return []
+    predicted = model.predict([rows[i] for i in pending])
+    # Grading counted the missing final as 0, so the prediction adds on top
+    base = np.nan_to_num(np.array([students[i].get("weighted_grade") for i in pending], dtype=float), nan=0.0)
+    grades = np.round(base + float(weights.get("final", 0.0)) * predicted, 2)
+    order = np.argsort(grades, kind="stable")
+    return [
+        dict(students[pending[k]], predicted_final=round(float(predicted[k]), 2), predicted_grade=float(grades[k]))
+        for k in order
+        if grades[k] < float(cutoff)
+    ]
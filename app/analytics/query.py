@@ -0,0 +1,736 @@
+"""Lazy queries over a roster CSV with filter and column pushdown into the reader.
+
+Authors:
+- John Christian Linaban
+
+    scan("data/input_bsit.csv", config)
+        .filter(col("section") == "BSIT 2-1")
+        .select("midterm", "final")
+        .agg(avg_final=col("final").mean(), n=count())
+        .collect()
+
+Each call only adds a step to a plan; nothing is read until collect().
+explain() shows the plan as it will run. Optimizations:
+- Predicate pushdown: filters before any aggregation are ANDed and run
+  inside the scan. Per chunk of rows, only the filter's columns are parsed,
+  the predicate is evaluated on those arrays, and only the matching rows
+  go on to the next step.
+- Projection pushdown: only columns the plan uses (selected, filtered,
+  grouped, aggregated or sorted on) are converted. Every other column stays
+  an unparsed CSV field.
+- Limit pushdown: a limit before any sort or aggregation stops the scan once
+  enough rows matched. Nothing after a limit is pushed into the scan.
+
+The scan applies the same rules as core.read_csv_data: rows missing a
+required column are skipped, and numeric columns outside 0-100 or not
+numeric become missing (NaN). It does so without the per-value warnings,
+and it does not bump the roster version, since the loaded roster is not
+touched. weighted_grade can be used like a file column; it is computed from
+the score columns with the config's grade_weights, as in
+compute_weighted_grades.
+
+The scan yields one NumPy array per column (numeric as float, text as str).
+Aggregation, sorting and output then work on those arrays, as the columnar
+engine does.
+"""
+
+import csv
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.analytics.columnar import QUIZ_KEYS, SCORE_KEYS, RosterColumns
+
+DERIVED_GRADE = "weighted_grade"
+SCAN_CHUNK = 65_536
+AGG_FUNCS = ("count", "sum", "mean", "min", "max", "median", "std")
+
+
+# =====================================
+# Expressions
+# =====================================
+class Expr(ABC):
+    """Column expression evaluated on a dict of column arrays."""
+
+    @abstractmethod
+    def columns(self) -> Set[str]:
+        """Names of the columns the expression reads."""
+
+    @abstractmethod
+    def evaluate(self, frame: Dict[str, np.ndarray]) -> np.ndarray:
+        """Result array (or scalar, for literals) over the given columns."""
+
+    def __bool__(self) -> bool:
+        raise TypeError("Expressions have no truth value; combine them with &, | and ~")
+
+    # Comparisons
+    def __eq__(self, other: Any) -> "Expr":  # type: ignore[override]
+        return BinaryExpr("==", self, _wrap(other))
+
+    def __ne__(self, other: Any) -> "Expr":  # type: ignore[override]
+        return BinaryExpr("!=", self, _wrap(other))
+
+    def __lt__(self, other: Any) -> "Expr":
+        return BinaryExpr("<", self, _wrap(other))
+
+    def __le__(self, other: Any) -> "Expr":
+        return BinaryExpr("<=", self, _wrap(other))
+
+    def __gt__(self, other: Any) -> "Expr":
+        return BinaryExpr(">", self, _wrap(other))
+
+    def __ge__(self, other: Any) -> "Expr":
+        return BinaryExpr(">=", self, _wrap(other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    # Boolean logic
+    def __and__(self, other: Any) -> "Expr":
+        return BinaryExpr("&", self, _wrap(other))
+
+    def __or__(self, other: Any) -> "Expr":
+        return BinaryExpr("|", self, _wrap(other))
+
+    def __invert__(self) -> "Expr":
+        return UnaryExpr("~", self)
+
+    # Arithmetic
+    def __add__(self, other: Any) -> "Expr":
+        return BinaryExpr("+", self, _wrap(other))
+
+    def __radd__(self, other: Any) -> "Expr":
+        return BinaryExpr("+", _wrap(other), self)
+
+    def __sub__(self, other: Any) -> "Expr":
+        return BinaryExpr("-", self, _wrap(other))
+
+    def __rsub__(self, other: Any) -> "Expr":
+        return BinaryExpr("-", _wrap(other), self)
+
+    def __mul__(self, other: Any) -> "Expr":
+        return BinaryExpr("*", self, _wrap(other))
+
+    def __rmul__(self, other: Any) -> "Expr":
+        return BinaryExpr("*", _wrap(other), self)
+
+    def __truediv__(self, other: Any) -> "Expr":
+        return BinaryExpr("/", self, _wrap(other))
+
+    def __neg__(self) -> "Expr":
+        return UnaryExpr("-", self)
+
+    # Membership and missing values
+    def isin(self, values: Iterable[Any]) -> "Expr":
+        return IsInExpr(self, tuple(values))
+
+    def is_null(self) -> "Expr":
+        return UnaryExpr("is_null", self)
+
+    def is_not_null(self) -> "Expr":
+        return UnaryExpr("is_not_null", self)
+
+    # Text matching
+    def startswith(self, prefix: str) -> "Expr":
+        return StrExpr("startswith", self, prefix)
+
+    def endswith(self, suffix: str) -> "Expr":
+        return StrExpr("endswith", self, suffix)
+
+    def contains(self, part: str) -> "Expr":
+        return StrExpr("contains", self, part)
+
+    # Aggregations (only valid inside agg())
+    def count(self) -> "AggExpr":
+        return AggExpr("count", self)
+
+    def sum(self) -> "AggExpr":
+        return AggExpr("sum", self)
+
+    def mean(self) -> "AggExpr":
+        return AggExpr("mean", self)
+
+    def min(self) -> "AggExpr":
+        return AggExpr("min", self)
+
+    def max(self) -> "AggExpr":
+        return AggExpr("max", self)
+
+    def median(self) -> "AggExpr":
+        return AggExpr("median", self)
+
+    def std(self) -> "AggExpr":
+        return AggExpr("std", self)
+
+
+class Col(Expr):
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def columns(self) -> Set[str]:
+        return {self.name}
+
+    def evaluate(self, frame: Dict[str, np.ndarray]) -> np.ndarray:
+        return frame[self.name]
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class Lit(Expr):
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def columns(self) -> Set[str]:
+        return set()
+
+    def evaluate(self, frame: Dict[str, np.ndarray]) -> Any:
+        return self.value
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+
+_BINARY_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "&": np.logical_and,
+    "|": np.logical_or,
+    "+": np.add,
+    "-": np.subtract,
+    "*": np.multiply,
+    "/": np.divide,
+}
+
+
+class BinaryExpr(Expr):
+    def __init__(self, op: str, left: Expr, right: Expr) -> None:
+        self.op, self.left, self.right = op, left, right
+
+    def columns(self) -> Set[str]:
+        return self.left.columns() | self.right.columns()
+
+    def evaluate(self, frame: Dict[str, np.ndarray]) -> np.ndarray:
+        left, right = self.left.evaluate(frame), self.right.evaluate(frame)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return _BINARY_OPS[self.op](left, right)
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} {self.op} {self.right!r})"
+
+
+class UnaryExpr(Expr):
+    def __init__(self, op: str, operand: Expr) -> None:
+        self.op, self.operand = op, operand
+
+    def columns(self) -> Set[str]:
+        return self.operand.columns()
+
+    def evaluate(self, frame: Dict[str, np.ndarray]) -> np.ndarray:
+        value = np.asarray(self.operand.evaluate(frame))
+        if self.op == "~":
+            return np.logical_not(value)
+        if self.op == "-":
+            return -value
+        # Missing is NaN for numeric columns and "" for text columns
+        missing = np.isnan(value) if value.dtype.kind == "f" else (value == "")
+        return missing if self.op == "is_null" else ~missing
+
+    def __repr__(self) -> str:
+        if self.op in ("~", "-"):
+            return f"{self.op}{self.operand!r}"
+        return f"{self.operand!r}.{self.op}()"
+
+
+class IsInExpr(Expr):
+    def __init__(self, operand: Expr, values: Tuple[Any, ...]) -> None:
+        self.operand, self.values = operand, values
+
+    def columns(self) -> Set[str]:
+        return self.operand.columns()
+
+    def evaluate(self, frame: Dict[str, np.ndarray]) -> np.ndarray:
+        return np.isin(self.operand.evaluate(frame), list(self.values))
+
+    def __repr__(self) -> str:
+        return f"{self.operand!r}.isin({list(self.values)!r})"
+
+
+class StrExpr(Expr):
+    def __init__(self, op: str, operand: Expr, pattern: str) -> None:
+        self.op, self.operand, self.pattern = op, operand, pattern
+
+    def columns(self) -> Set[str]:
+        return self.operand.columns()
+
+    def evaluate(self, frame: Dict[str, np.ndarray]) -> np.ndarray:
+        values = np.asarray(self.operand.evaluate(frame)).astype(str)
+        if self.op == "contains":
+            return np.char.find(values, self.pattern) >= 0
+        return getattr(np.char, self.op)(values, self.pattern)
+
+    def __repr__(self) -> str:
+        return f"{self.operand!r}.{self.op}({self.pattern!r})"
+
+
+class AggExpr:
+    """An aggregation of an expression (or of the row count) for agg()."""
+
+    def __init__(self, func: str, operand: Optional[Expr] = None) -> None:
+        if func not in AGG_FUNCS:
+            raise ValueError(f"Unknown aggregation '{func}'. Expected one of: {', '.join(AGG_FUNCS)}")
+        self.func, self.operand = func, operand
+
+    def columns(self) -> Set[str]:
+        return self.operand.columns() if self.operand is not None else set()
+
+    def __repr__(self) -> str:
+        return f"{self.func}({self.operand!r})" if self.operand is not None else "count()"
+
+
+def _wrap(value: Any) -> Expr:
+    return value if isinstance(value, Expr) else Lit(value)
+
+
+def col(name: str) -> Col:
+    return Col(name)
+
+
+def lit(value: Any) -> Lit:
+    return Lit(value)
+
+
+def count() -> AggExpr:
+    """Number of rows (per group)."""
+    return AggExpr("count")
+
+
+# =====================================
+# Plan
+# =====================================
+@dataclass(frozen=True)
+class _Step:
+    kind: str  # filter / select / agg / sort / limit
+    args: Tuple[Any, ...]
+
+
+@dataclass
+class QueryResult:
+    columns: Dict[str, np.ndarray]  # output columns, in order
+    stats: Dict[str, int] = field(default_factory=dict)  # rows_scanned / rows_skipped / rows_matched / cells_converted
+
+    def __len__(self) -> int:
+        return int(next(iter(self.columns.values())).shape[0]) if self.columns else 0
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Row dicts with NaN as None, like the rows read by core.read_csv_data."""
+        lists = {name: values.tolist() for name, values in self.columns.items()}
+        rows = [dict(zip(lists, values)) for values in zip(*lists.values())]
+        for row in rows:
+            for key, value in row.items():
+                if isinstance(value, float) and value != value:
+                    row[key] = None
+        return rows
+
+    def to_roster_columns(self) -> RosterColumns:
+        """The result as RosterColumns for the vectorized analytics."""
+        numeric = {k: v for k, v in self.columns.items() if v.dtype.kind == "f"}
+        text = {k: v for k, v in self.columns.items() if v.dtype.kind != "f"}
+        lookup: Dict[str, int] = {}
+        sections = text.get("section", np.full(len(self), "", dtype=str))
+        codes = np.fromiter((lookup.setdefault(s, len(lookup)) for s in sections.tolist()), dtype=np.int64, count=len(self))
+        return RosterColumns(numeric=numeric, text=text, section_names=list(lookup), section_codes=codes)
+
+
+class LazyFrame:
+    """An unexecuted query over one CSV file; every method returns a new LazyFrame."""
+
+    def __init__(self, path: str, config: Dict[str, Any], steps: Tuple[_Step, ...] = (), chunk_size: int = SCAN_CHUNK) -> None:
+        self.path = path
+        self.config = config
+        self.steps = steps
+        self.chunk_size = chunk_size
+
+    def _add(self, kind: str, *args: Any) -> "LazyFrame":
+        return LazyFrame(self.path, self.config, self.steps + (_Step(kind, args),), self.chunk_size)
+
+    def filter(self, predicate: Expr) -> "LazyFrame":
+        return self._add("filter", predicate)
+
+    def select(self, *names: str) -> "LazyFrame":
+        return self._add("select", tuple(names))
+
+    def group_by(self, *keys: str) -> "GroupBy":
+        return GroupBy(self, tuple(keys))
+
+    def agg(self, **aggs: AggExpr) -> "LazyFrame":
+        return self._add("agg", (), tuple(aggs.items()))
+
+    def sort(self, by: str, descending: bool = False) -> "LazyFrame":
+        return self._add("sort", by, bool(descending))
+
+    def limit(self, n: int) -> "LazyFrame":
+        return self._add("limit", int(n))
+
+    def schema(self) -> Dict[str, str]:
+        """Column kinds the scan offers: "num" for parsed numbers, "str" for text."""
+        with open(self.path, newline="") as f:
+            header = next(csv.reader(f), [])
+        numeric = set(_numeric_columns(self.config))
+        kinds = {name: "num" if name in numeric else "str" for name in header}
+        if self.config.get("grade_weights"):
+            kinds.setdefault(DERIVED_GRADE, "num")
+        return kinds
+
+    def explain(self) -> str:
+        return _optimize(self).explain()
+
+    def collect(self) -> QueryResult:
+        return _optimize(self).execute()
+
+
+class GroupBy:
+    def __init__(self, frame: LazyFrame, keys: Tuple[str, ...]) -> None:
+        self.frame, self.keys = frame, keys
+
+    def agg(self, **aggs: AggExpr) -> LazyFrame:
+        return self.frame._add("agg", self.keys, tuple(aggs.items()))
+
+
+def scan(path: str, config: Optional[Dict[str, Any]] = None, chunk_size: int = SCAN_CHUNK) -> LazyFrame:
+    """Start a lazy query over a roster CSV (config supplies column rules and grade_weights)."""
+    return LazyFrame(path, config or {}, (), chunk_size)
+
+
+# =====================================
+# Optimization and execution
+# =====================================
+def _numeric_columns(config: Dict[str, Any]) -> List[str]:
+    # Same numeric columns as core._iter_csv_rows
+    numeric = list(config.get("columns", {}).get("numeric", []))
+    for key in ("midterm", "final", "attendance_percent"):
+        if key not in numeric:
+            numeric.append(key)
+    return numeric
+
+
+@dataclass
+class _PhysicalPlan:
+    path: str
+    config: Dict[str, Any]
+    header: List[str]
+    predicate: Optional[Expr]  # pushed-down filters, ANDed
+    filter_columns: List[str]  # parsed for every row
+    project_columns: List[str]  # parsed only for matching rows
+    output: List[str]  # scan output columns, in order
+    scan_limit: Optional[int]
+    post: List[_Step]  # steps that run on the scanned arrays
+    chunk_size: int
+
+    def explain(self) -> str:
+        lines = []
+        for depth, step in enumerate(reversed(self.post)):
+            lines.append("  " * depth + _describe(step))
+        pad = "  " * len(self.post)
+        lines.append(f"{pad}SCAN {self.path}")
+        used = sorted(set(self.filter_columns) | set(self.project_columns), key=self._order)
+        lines.append(f"{pad}  columns: [{', '.join(used)}] of {len(self.header)} in file")
+        if DERIVED_GRADE in used and DERIVED_GRADE not in self.header:
+            lines.append(f"{pad}  derived: {DERIVED_GRADE} from {', '.join(SCORE_KEYS)}")
+        lines.append(f"{pad}  filter: {self.predicate!r}" if self.predicate is not None else f"{pad}  filter: -")
+        if self.scan_limit is not None:
+            lines.append(f"{pad}  limit: {self.scan_limit}")
+        return "\n".join(lines)
+
+    def _order(self, name: str) -> int:
+        return self.header.index(name) if name in self.header else len(self.header)
+
+    def execute(self) -> QueryResult:
+        frame, stats = _run_scan(self)
+        for step in self.post:
+            frame = _apply(step, frame)
+        return QueryResult(columns=frame, stats=stats)
+
+
+def _describe(step: _Step) -> str:
+    if step.kind == "filter":
+        return f"FILTER {step.args[0]!r}"
+    if step.kind == "select":
+        return f"SELECT [{', '.join(step.args[0])}]"
+    if step.kind == "agg":
+        keys, aggs = step.args
+        by = f" by [{', '.join(keys)}]" if keys else ""
+        return f"AGGREGATE{by}: " + ", ".join(f"{name}={agg!r}" for name, agg in aggs)
+    if step.kind == "sort":
+        return f"SORT {step.args[0]} {'DESC' if step.args[1] else 'ASC'}"
+    return f"LIMIT {step.args[0]}"
+
+
+def _optimize(frame: LazyFrame) -> _PhysicalPlan:
+    with open(frame.path, newline="") as f:
+        header = next(csv.reader(f), [])
+    available = list(header)
+    if DERIVED_GRADE not in available and frame.config.get("grade_weights"):
+        available.append(DERIVED_GRADE)
+
+    # Validate names step by step: each step sees the previous step's columns
+    schema = list(available)
+    for step in frame.steps:
+        if step.kind == "filter":
+            needed = set(step.args[0].columns())
+        elif step.kind == "select":
+            needed = set(step.args[0])
+        elif step.kind == "agg":
+            needed = set(step.args[0]).union(*[agg.columns() for _, agg in step.args[1]])
+        elif step.kind == "sort":
+            needed = {step.args[0]}
+        else:
+            needed = set()
+        missing = sorted(needed - set(schema))
+        if missing:
+            raise ValueError(f"Unknown column(s) {', '.join(missing)}. Available: {', '.join(schema)}")
+        if step.kind == "select":
+            schema = list(step.args[0])
+        elif step.kind == "agg":
+            schema = list(step.args[0]) + [name for name, _ in step.args[1]]
+
+    # The prefix before any sort or aggregation runs inside the scan. It ends
+    # at the first limit too: a filter after a limit only sees the limited
+    # rows, so pushing it ahead of the limit would pick different rows
+    prefix: List[_Step] = []
+    for step in frame.steps:
+        if step.kind in ("sort", "agg"):
+            break
+        prefix.append(step)
+        if step.kind == "limit":
+            break
+    post = list(frame.steps[len(prefix):])
+
+    predicates = [s.args[0] for s in prefix if s.kind == "filter"]
+    predicate: Optional[Expr] = None
+    for p in predicates:
+        predicate = p if predicate is None else predicate & p
+    limits = [s.args[0] for s in prefix if s.kind == "limit"]
+    selects = [s.args[0] for s in prefix if s.kind == "select"]
+    output = list(selects[-1]) if selects else list(header)
+
+    # Columns the steps after the scan read, up to the first aggregation
+    later: Set[str] = set()
+    aggregated = False
+    for step in post:
+        if step.kind == "agg":
+            later |= set(step.args[0]).union(*[agg.columns() for _, agg in step.args[1]])
+            aggregated = True
+            break
+        if step.kind == "sort":
+            later.add(step.args[0])
+        elif step.kind == "filter":
+            later |= step.args[0].columns()
+        elif step.kind == "select":
+            later |= set(step.args[0])
+    if aggregated:
+        # Nothing but what the aggregation needs leaves the scan
+        output = [c for c in available if c in later]
+    elif not selects and DERIVED_GRADE in later and DERIVED_GRADE not in output:
+        output.append(DERIVED_GRADE)
+    filter_columns = sorted(predicate.columns(), key=available.index) if predicate is not None else []
+    project_columns = [c for c in output if c not in filter_columns]
+    return _PhysicalPlan(
+        path=frame.path,
+        config=frame.config,
+        header=header,
+        predicate=predicate,
+        filter_columns=filter_columns,
+        project_columns=project_columns,
+        output=output,
+        scan_limit=min(limits) if limits else None,
+        post=post,
+        chunk_size=frame.chunk_size,
+    )
+
+
+def _parse_numeric(values: List[str]) -> np.ndarray:
+    try:
+        out = np.array(values, dtype=float)
+    except ValueError:
+        out = np.full(len(values), np.nan)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except ValueError:
+                pass
+    with np.errstate(invalid="ignore"):
+        out[(out < 0) | (out > 100)] = np.nan
+    return out
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    # Python's round, not np.round: the two disagree on some halves, and the
+    # result must equal compute_weighted_grades to the cent
+    return np.array([round(v, 2) for v in values.tolist()], dtype=float)
+
+
+def _weighted_grade(scores: Dict[str, np.ndarray], weights: Dict[str, float]) -> np.ndarray:
+    # Same arithmetic, in the same order, as compute_weighted_grades: missing as 0
+    filled = {k: np.nan_to_num(v, nan=0.0) for k, v in scores.items()}
+    quiz_sum = filled[QUIZ_KEYS[0]].copy()
+    for k in QUIZ_KEYS[1:]:
+        quiz_sum += filled[k]
+    quiz_avg = _round2(quiz_sum / len(QUIZ_KEYS))
+    total = (
+        quiz_avg * weights["quizzes_total"]
+        + filled["midterm"] * weights["midterm"]
+        + filled["final"] * weights["final"]
+        + filled["attendance_percent"] * weights["attendance"]
+    )
+    return _round2(total)
+
+
+def _convert(
+    rows: List[List[str]], names: Sequence[str], plan: _PhysicalPlan, numeric: Set[str]
+) -> Tuple[Dict[str, np.ndarray], int]:
+    """Parse the named columns of rows; weighted_grade is derived from the score columns."""
+    index = {name: i for i, name in enumerate(plan.header)}
+    wanted = [n for n in names if n != DERIVED_GRADE]
+    if DERIVED_GRADE in names:
+        wanted += [k for k in SCORE_KEYS if k not in wanted]
+    out: Dict[str, np.ndarray] = {}
+    for name in wanted:
+        i = index[name]
+        raw = [r[i].strip() if i < len(r) else "" for r in rows]
+        out[name] = _parse_numeric(raw) if name in numeric else np.array(raw, dtype=str)
+    if DERIVED_GRADE in names:
+        out[DERIVED_GRADE] = _weighted_grade({k: out[k] for k in SCORE_KEYS}, plan.config["grade_weights"])
+    return out, len(wanted) * len(rows)
+
+
+def _run_scan(plan: _PhysicalPlan) -> Tuple[Dict[str, np.ndarray], Dict[str, int]]:
+    numeric = set(_numeric_columns(plan.config))
+    required = [plan.header.index(c) for c in plan.config.get("columns", {}).get("required", []) if c in plan.header]
+    width = max(required, default=-1)
+    stats = {"rows_scanned": 0, "rows_skipped": 0, "rows_matched": 0, "cells_converted": 0}
+    parts: Dict[str, List[np.ndarray]] = {name: [] for name in plan.output}
+
+    def process(rows: List[List[str]]) -> None:
+        stats["rows_scanned"] += len(rows)
+        # Required fields are only checked for being non-blank, never parsed;
+        # one pass per column is much cheaper than all() per row
+        valid = [r for r in rows if len(r) > width] if required else rows
+        for i in required:
+            valid = [r for r in valid if r[i].strip()]
+        stats["rows_skipped"] += len(rows) - len(valid)
+        first, cells = _convert(valid, plan.filter_columns, plan, numeric)
+        stats["cells_converted"] += cells
+        if plan.predicate is not None:
+            mask = np.asarray(plan.predicate.evaluate(first), dtype=bool)
+            keep = np.flatnonzero(np.broadcast_to(mask, (len(valid),)))
+            valid = [valid[i] for i in keep]
+            first = {k: v[keep] for k, v in first.items()}
+        rest, cells = _convert(valid, plan.project_columns, plan, numeric)
+        stats["cells_converted"] += cells
+        stats["rows_matched"] += len(valid)
+        for name in plan.output:
+            parts[name].append(first[name] if name in first else rest[name])
+
+    with open(plan.path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        chunk: List[List[str]] = []
+        for row in reader:
+            chunk.append(row)
+            if len(chunk) >= plan.chunk_size:
+                process(chunk)
+                chunk = []
+                if plan.scan_limit is not None and stats["rows_matched"] >= plan.scan_limit:
+                    break
+        else:
+            if chunk:
+                process(chunk)
+
+    frame = {
+        name: np.concatenate(arrays) if arrays else np.zeros(0, dtype=float if name in numeric or name == DERIVED_GRADE else str)
+        for name, arrays in parts.items()
+    }
+    if plan.scan_limit is not None:
+        frame = {k: v[:plan.scan_limit] for k, v in frame.items()}
+        stats["rows_matched"] = min(stats["rows_matched"], plan.scan_limit)
+    return frame, stats
+
+
+def _group_codes(frame: Dict[str, np.ndarray], keys: Sequence[str], n: int) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Group code per row (groups in first-appearance order) and the key values per group."""
+    if not keys:
+        return np.zeros(n, dtype=np.int64), {}
+    combined = np.zeros(n, dtype=np.int64)
+    for key in keys:
+        _, inverse = np.unique(frame[key], return_inverse=True)
+        combined = combined * (int(inverse.max()) + 1 if n else 1) + inverse
+    _, first, inverse = np.unique(combined, return_index=True, return_inverse=True)
+    rank = np.empty(first.size, dtype=np.int64)
+    rank[np.argsort(first, kind="stable")] = np.arange(first.size)
+    codes = rank[inverse]
+    firsts = np.sort(first)
+    return codes, {key: frame[key][firsts] for key in keys}
+
+
+def _aggregate(agg: AggExpr, frame: Dict[str, np.ndarray], codes: np.ndarray, n_groups: int) -> np.ndarray:
+    if agg.operand is None:
+        return np.bincount(codes, minlength=n_groups)
+    values = np.asarray(agg.operand.evaluate(frame), dtype=float)
+    if values.ndim == 0:
+        values = np.full(codes.size, float(values))
+    present = ~np.isnan(values)
+    counts = np.bincount(codes[present], minlength=n_groups)
+    if agg.func == "count":
+        return counts
+    sums = np.bincount(codes[present], weights=values[present], minlength=n_groups)
+    if agg.func == "sum":
+        return sums
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+        if agg.func == "mean":
+            return means
+        if agg.func == "std":
+            dev = values[present] - means[codes[present]]
+            return np.sqrt(np.bincount(codes[present], weights=dev * dev, minlength=n_groups) / counts)
+    out = np.full(n_groups, np.nan)
+    order = np.argsort(codes[present], kind="stable")
+    grouped = values[present][order]
+    bounds = np.r_[0, np.cumsum(counts)]
+    reducer = {"min": np.min, "max": np.max, "median": np.median}[agg.func]
+    for g in np.flatnonzero(counts):
+        out[g] = reducer(grouped[bounds[g]:bounds[g + 1]])
+    return out
+
+
+def _apply(step: _Step, frame: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    n = len(next(iter(frame.values()))) if frame else 0
+    if step.kind == "filter":
+        keep = np.broadcast_to(np.asarray(step.args[0].evaluate(frame), dtype=bool), (n,))
+        return {k: v[keep] for k, v in frame.items()}
+    if step.kind == "select":
+        return {k: frame[k] for k in step.args[0]}
+    if step.kind == "limit":
+        return {k: v[:step.args[0]] for k, v in frame.items()}
+    if step.kind == "sort":
+        by, descending = step.args
+        values = frame[by]
+        _, codes = np.unique(values, return_inverse=True)
+        missing = np.isnan(values) if values.dtype.kind == "f" else values == ""
+        order = np.lexsort((-codes if descending else codes, missing))
+        return {k: v[order] for k, v in frame.items()}
+    keys, aggs = step.args
+    codes, out = _group_codes(frame, keys, n)
+    # Without keys the whole frame is one group, even when it is empty
+    n_groups = len(out[keys[0]]) if keys else 1
+    for name, agg in aggs:
+        out[name] = _aggregate(agg, frame, codes, n_groups)
+    return out
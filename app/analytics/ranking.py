@@ -0,0 +1,90 @@
+"""Rank columns for every student, course-wide and within section.
+
+Authors:
+- John Christian Linaban
+
+Three tie-aware ranks are computed, highest grade = 1:
+- competition ("1224"): 1 + number of strictly higher grades in the group.
+- dense ("1223"): 1 + number of distinct higher grades in the group.
+- percentile: share of the group scoring at or below the student, in percent.
+
+Each grouping is a single np.lexsort on (section code, -grade); tie runs and
+group starts are found with one pass of running maxima over the sorted
+order, so no per-section loops or re-sorting are needed. Missing grades count
+as 0, like stats.get_top_n_students.
+
+assign_ranks() writes the columns into the student dicts in place, so section
+lists that share those dicts, ranking tables and CSV exports all read the
+same values.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+RANK_COLUMNS = ("rank", "rank_dense", "rank_pct", "section_rank", "section_rank_dense", "section_rank_pct")
+
+
+@dataclass
+class RankColumns:
+    rank: np.ndarray
+    rank_dense: np.ndarray
+    rank_pct: np.ndarray
+    section_rank: np.ndarray
+    section_rank_dense: np.ndarray
+    section_rank_pct: np.ndarray
+
+
+def group_ranks(grades: Any, codes: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Competition, dense and percentile ranks of grades within each integer group code."""
+    grades = np.nan_to_num(np.asarray(grades, dtype=float), nan=0.0)
+    codes = np.asarray(codes, dtype=np.int64)
+    n = grades.size
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+
+    order = np.lexsort((-grades, codes))
+    g, c = grades[order], codes[order]
+    new_group = np.r_[True, c[1:] != c[:-1]]
+    new_value = new_group | np.r_[True, g[1:] != g[:-1]]
+    pos = np.arange(n)
+    group_start = np.maximum.accumulate(np.where(new_group, pos, 0))
+    run_start = np.maximum.accumulate(np.where(new_value, pos, 0))
+    distinct = np.cumsum(new_value)
+
+    competition = run_start - group_start + 1
+    dense = distinct - distinct[group_start] + 1
+    size = np.bincount(c)[c]
+    pct = np.round((size - competition + 1) / size * 100.0, 2)
+
+    out_comp = np.empty(n, dtype=np.int64)
+    out_dense = np.empty(n, dtype=np.int64)
+    out_pct = np.empty(n)
+    out_comp[order] = competition
+    out_dense[order] = dense
+    out_pct[order] = pct
+    return out_comp, out_dense, out_pct
+
+
+def rank_columns(
+    students: List[Dict[str, Any]], key: str = "weighted_grade", section_key: str = "section"
+) -> RankColumns:
+    grades = np.array([s.get(key) for s in students], dtype=float)
+    _, section_codes = np.unique(np.array([str(s.get(section_key) or "") for s in students], dtype=str), return_inverse=True)
+    course = group_ranks(grades, np.zeros(len(students), dtype=np.int64))
+    section = group_ranks(grades, section_codes)
+    return RankColumns(*course, *section)
+
+
+def assign_ranks(
+    students: List[Dict[str, Any]], key: str = "weighted_grade", section_key: str = "section"
+) -> List[Dict[str, Any]]:
+    """Write RANK_COLUMNS into each student dict (in place) and return the same list."""
+    cols = rank_columns(students, key, section_key)
+    arrays = [getattr(cols, name).tolist() for name in RANK_COLUMNS]
+    for i, s in enumerate(students):
+        for name, values in zip(RANK_COLUMNS, arrays):
+            s[name] = values[i]
+    return students
@@ -0,0 +1,237 @@
+"""Monte Carlo failure probabilities with missing assessments simulated.
+
+Authors:
+- John Christian Linaban
+
+compute_weighted_grades counts a missing midterm, final or attendance as 0,
+so a student who has not sat the final yet looks certain to fail. Here every
+missing assessment is instead drawn from the observed scores of the same
+column in the student's section (resampled with replacement; the course-wide
+scores are used when the section has none).
+
+The grade is linear in the assessments, so it splits into a fixed part from
+the scores on record and a simulated part from the missing ones:
+
+    P(fail) = P(fixed + simulated < cutoff) = P(simulated < cutoff - fixed)
+
+The simulated part depends only on the section and which assessments are
+missing, not on the student. So each section draws n_draws samples once per
+column it needs, every (section, missing pattern) group sums its columns'
+draws, and each member's probability is read off the sorted sums with a
+searchsorted (tiny groups just count). Students with nothing missing get 0
+or 1 from their grade directly.
+
+Sections are split into fixed-size chunks, each seeded by its own
+SeedSequence child, and run on a ProcessPoolExecutor over a shared-memory
+block when there are enough of them. The chunking does not depend on the
+worker count, so results are identical for any max_workers.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.analytics.columnar import QUIZ_KEYS, build_columns
+
+RISK_COLUMNS = tuple(QUIZ_KEYS) + ("midterm", "final", "attendance_percent")
+DEFAULT_DRAWS = 10_000
+DEFAULT_SEED = 2024
+RISK_MIN_SECTIONS = 64
+SECTIONS_PER_CHUNK = 16
+_COUNT_MAX_ROWS = 8
+
+# One section: {column: (pool start, pool length)} and its groups as
+# (row start, row end, missing columns), indexing the shared arrays
+_Task = Tuple[Dict[int, Tuple[int, int]], List[Tuple[int, int, Tuple[int, ...]]]]
+
+
+@dataclass
+class RiskResult:
+    probabilities: np.ndarray  # N probability of finishing below the cutoff
+    missing: np.ndarray  # N x len(RISK_COLUMNS) True where the assessment was simulated
+    n_draws: int
+    cutoff: float
+
+    def missing_labels(self, i: int) -> str:
+        return ", ".join(key for key, m in zip(RISK_COLUMNS, self.missing[i]) if m)
+
+    def ranked(self, students: List[Dict[str, Any]], min_probability: float = 0.0) -> List[Dict[str, Any]]:
+        """Students above min_probability as copies with fail_probability/simulated columns, most at risk first."""
+        probs = self.probabilities
+        grades = np.nan_to_num(np.array([s.get("weighted_grade") for s in students], dtype=float), nan=0.0)
+        keep = np.flatnonzero(probs > min_probability)
+        order = keep[np.lexsort((grades[keep], -probs[keep]))]
+        return [
+            dict(students[i], fail_probability=round(float(probs[i]), 4), simulated=self.missing_labels(i))
+            for i in order
+        ]
+
+
+def _column_weights(weights: Dict[str, float]) -> np.ndarray:
+    # Each quiz carries a fifth of the quiz weight, as in the quiz average
+    quiz = float(weights.get("quizzes_total", 0.0)) / len(QUIZ_KEYS)
+    return np.array(
+        [quiz] * len(QUIZ_KEYS)
+        + [float(weights.get("midterm", 0.0)), float(weights.get("final", 0.0)), float(weights.get("attendance", 0.0))]
+    )
+
+
+def _section_pools(
+    values: np.ndarray, sections: np.ndarray, n_sections: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Observed scores grouped by (section, column) in one flat array, plus starts and lengths.
+
+    Row n_sections of starts/lengths holds the course-wide pool, which is
+    substituted for sections with no scores in a column.
+    """
+    parts: List[np.ndarray] = []
+    starts = np.zeros((n_sections + 1, values.shape[1]), dtype=np.int64)
+    lengths = np.zeros_like(starts)
+    offset = 0
+    for c in range(values.shape[1]):
+        present = ~np.isnan(values[:, c])
+        col, sec = values[present, c], sections[present]
+        counts = np.bincount(sec, minlength=n_sections)
+        parts += [col[np.argsort(sec, kind="stable")], col]
+        starts[:n_sections, c] = offset + np.cumsum(counts) - counts
+        lengths[:n_sections, c] = counts
+        starts[n_sections, c] = offset + col.size
+        lengths[n_sections, c] = col.size
+        offset += 2 * col.size
+    empty = lengths[:n_sections] == 0
+    starts[:n_sections] = np.where(empty, starts[n_sections], starts[:n_sections])
+    lengths[:n_sections] = np.where(empty, lengths[n_sections], lengths[:n_sections])
+    return (np.concatenate(parts) if parts else np.zeros(0)), starts, lengths
+
+
+def _simulate_chunk(
+    pools: np.ndarray, gaps: np.ndarray, tasks: List[_Task], col_weights: np.ndarray, n_draws: int, seed: np.random.SeedSequence
+) -> List[np.ndarray]:
+    """Failure probabilities for each group's rows, in task order."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for columns, groups in tasks:
+        # Weighted draws per column, shared by every missing pattern in the section
+        draws = {
+            c: col_weights[c] * pools[p_start + rng.integers(0, p_len, size=n_draws, dtype=np.int32)]
+            if p_len else np.zeros(n_draws)
+            for c, (p_start, p_len) in columns.items()
+        }
+        for start, end, cols in groups:
+            simulated = draws[cols[0]].copy()
+            for c in cols[1:]:
+                simulated += draws[c]
+            if end - start <= _COUNT_MAX_ROWS:
+                # A linear count per member beats sorting for tiny groups
+                counts = [np.count_nonzero(simulated < gap) for gap in gaps[start:end]]
+                out.append(np.array(counts, dtype=float) / n_draws)
+            else:
+                simulated.sort()
+                out.append(np.searchsorted(simulated, gaps[start:end], side="left") / n_draws)
+    return out
+
+
+def _run_chunk(
+    shm_name: str, n_pool: int, n_gaps: int, tasks: List[_Task], col_weights: np.ndarray, n_draws: int, seed: np.random.SeedSequence
+) -> List[np.ndarray]:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        data = np.ndarray((n_pool + n_gaps,), dtype=np.float64, buffer=shm.buf)
+        result = _simulate_chunk(data[:n_pool], data[n_pool:], tasks, col_weights, n_draws, seed)
+        del data  # release the buffer view before closing
+    finally:
+        shm.close()
+    return result
+
+
+def simulate_failure_risk(
+    students: List[Dict[str, Any]],
+    weights: Dict[str, float],
+    cutoff: float,
+    n_draws: int = DEFAULT_DRAWS,
+    seed: int = DEFAULT_SEED,
+    observed: Optional[Sequence[Dict[str, Any]]] = None,
+    section_key: str = "section",
+    max_workers: Optional[int] = None,
+    min_sections: int = RISK_MIN_SECTIONS,
+) -> RiskResult:
+    """Probability that each student finishes below cutoff once missing scores are simulated.
+
+    observed holds the rows as read, before compute_weighted_grades zero-filled
+    missing midterm/final/attendance; it must line up with students (default:
+    students themselves, where only missing quizzes are still visible).
+    """
+    rows = list(observed) if observed is not None else students
+    if len(rows) != len(students):
+        raise ValueError("observed rows must line up with students")
+    cols = build_columns(rows, numeric_keys=RISK_COLUMNS, text_keys=(section_key,))
+    values = cols.matrix(RISK_COLUMNS)
+    names, sections = np.unique(cols.text[section_key].astype(str), return_inverse=True)
+    sections = sections.astype(np.int64)
+    col_weights = _column_weights(weights)
+    missing = np.isnan(values)
+    fixed = np.nan_to_num(values, nan=0.0) @ col_weights
+
+    probabilities = (np.round(fixed, 2) < float(cutoff)).astype(float)
+    pattern = missing @ (1 << np.arange(len(RISK_COLUMNS)))
+    rows_idx = np.flatnonzero(pattern)
+    if rows_idx.size:
+        group_key = sections[rows_idx] * (1 << len(RISK_COLUMNS)) + pattern[rows_idx]
+        by_group = np.argsort(group_key, kind="stable")
+        order = rows_idx[by_group]
+        keys, starts = np.unique(group_key[by_group], return_index=True)
+        ends = np.r_[starts[1:], order.size]
+        gaps = float(cutoff) - fixed[order]
+        pools, pool_starts, pool_lengths = _section_pools(values, sections, len(names))
+
+        tasks: List[_Task] = []
+        for key, s, e in zip(keys.tolist(), starts.tolist(), ends.tolist()):
+            sec, bits = divmod(key, 1 << len(RISK_COLUMNS))
+            cols = tuple(c for c in range(len(RISK_COLUMNS)) if bits >> c & 1)
+            if not tasks or tasks[-1][2] != sec:
+                tasks.append(({}, [], sec))
+            columns, groups, _ = tasks[-1]
+            for c in cols:
+                columns[c] = (int(pool_starts[sec, c]), int(pool_lengths[sec, c]))
+            groups.append((s, e, cols))
+        tasks = [(columns, groups) for columns, groups, _ in tasks]
+        chunks = [tasks[i:i + SECTIONS_PER_CHUNK] for i in range(0, len(tasks), SECTIONS_PER_CHUNK)]
+        seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+        workers = max_workers or os.cpu_count() or 1
+        if len(tasks) < min_sections or len(chunks) < 2 or workers <= 1:
+            results = [p for chunk, ss in zip(chunks, seeds) for p in _simulate_chunk(pools, gaps, chunk, col_weights, n_draws, ss)]
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, (pools.size + gaps.size) * 8))
+            try:
+                shared = np.ndarray((pools.size + gaps.size,), dtype=np.float64, buffer=shm.buf)
+                shared[:pools.size] = pools
+                shared[pools.size:] = gaps
+                del shared
+                with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                    futures = [
+                        pool.submit(_run_chunk, shm.name, pools.size, gaps.size, chunk, col_weights, n_draws, ss)
+                        for chunk, ss in zip(chunks, seeds)
+                    ]
+                    results = [p for f in futures for p in f.result()]
+            finally:
+                shm.close()
+                shm.unlink()
+        probabilities[order] = np.concatenate(results)
+
+    return RiskResult(probabilities=probabilities, missing=missing, n_draws=int(n_draws), cutoff=float(cutoff))
+
+
+def risk_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """draws / seed / max_workers / min_sections from config's optional analytics.risk block."""
+    cfg = config.get("analytics", {}).get("risk", {})
+    return {
+        "n_draws": int(cfg.get("draws", DEFAULT_DRAWS)),
+        "seed": int(cfg.get("seed", DEFAULT_SEED)),
+        "max_workers": cfg.get("max_workers"),
+        "min_sections": int(cfg.get("min_sections", RISK_MIN_SECTIONS)),
+    }
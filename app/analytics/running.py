@@ -0,0 +1,154 @@
+"""Running (incrementally maintained) statistics for the loaded roster.
+
+Authors:
+- John Christian Linaban
+
+RunningStats is built once from the roster and then updated in O(1) per
+insert, edit or delete, so dashboard views can read averages, variance,
+letter distributions and quiz averages without rescanning every student.
+Results use the same shapes as get_average_grade, calculate_distribution
+and get_quiz_averages.
+
+Welford's update is used for mean/variance; removals apply the inverse
+update, which can drift by floating-point noise after very many edits
+(rebuild with RunningStats.from_students to reset).
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.analytics.binning import LetterBins
+
+
+class _Accumulator:
+    """Welford mean/variance, letter counters and per-quiz sums for one group."""
+
+    def __init__(self, thresholds: Dict[str, int]) -> None:
+        self.bins = LetterBins.from_thresholds(thresholds)
+        self.students = 0
+        self.grade_total = 0.0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.letters: Dict[str, int] = {k: 0 for k in self.bins.key_order}
+        self.quiz_sums: Dict[str, float] = {}
+        self.quiz_counts: Dict[str, int] = {}
+
+    def add(self, student: Dict[str, Any]) -> None:
+        self.students += 1
+        grade = student.get("weighted_grade")
+        if isinstance(grade, (int, float)):
+            self.grade_total += grade
+            self.n += 1
+            delta = grade - self.mean
+            self.mean += delta / self.n
+            self.m2 += delta * (grade - self.mean)
+            self.letters[self.bins.letter_for(grade)] += 1
+        for key, value in student.items():
+            if key.lower().startswith('quiz') and isinstance(value, (int, float)):
+                self.quiz_sums[key] = self.quiz_sums.get(key, 0.0) + value
+                self.quiz_counts[key] = self.quiz_counts.get(key, 0) + 1
+
+    def remove(self, student: Dict[str, Any]) -> None:
+        self.students -= 1
+        grade = student.get("weighted_grade")
+        if isinstance(grade, (int, float)):
+            self.grade_total -= grade
+            if self.n <= 1:
+                self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            else:
+                # Inverse Welford update
+                old_mean = (self.n * self.mean - grade) / (self.n - 1)
+                self.m2 -= (grade - self.mean) * (grade - old_mean)
+                self.mean = old_mean
+                self.n -= 1
+                self.m2 = max(self.m2, 0.0)
+            self.letters[self.bins.letter_for(grade)] -= 1
+        for key, value in student.items():
+            if key.lower().startswith('quiz') and isinstance(value, (int, float)):
+                self.quiz_sums[key] -= value
+                self.quiz_counts[key] -= 1
+                if self.quiz_counts[key] == 0:
+                    del self.quiz_sums[key]
+                    del self.quiz_counts[key]
+
+    def average_grade(self) -> float:
+        return self.grade_total / self.students if self.students else 0.0
+
+    def variance(self, sample: bool = False) -> float:
+        denom = self.n - 1 if sample else self.n
+        return self.m2 / denom if denom > 0 else 0.0
+
+    def quiz_averages(self) -> List[Any]:
+        averages = {k: self.quiz_sums[k] / c for k, c in self.quiz_counts.items()}
+        counts = dict(self.quiz_counts)
+        if averages:
+            hardest = min(averages, key=averages.get)
+            return [averages, counts, hardest, averages[hardest]]
+        return [averages, counts, "", 0.0]
+
+
+class RunningStats:
+    """Course-wide and per-section accumulators kept in sync with CRUD operations."""
+
+    def __init__(self, thresholds: Dict[str, int]) -> None:
+        self.thresholds = thresholds
+        self.overall = _Accumulator(thresholds)
+        self.sections: Dict[str, _Accumulator] = {}
+
+    @classmethod
+    def from_students(cls, students: Iterable[Dict[str, Any]], thresholds: Dict[str, int]) -> "RunningStats":
+        stats = cls(thresholds)
+        for student in students:
+            stats.add(student)
+        return stats
+
+    def _section(self, student: Dict[str, Any]) -> Optional[_Accumulator]:
+        section = student.get("section")
+        if not section:
+            return None
+        if section not in self.sections:
+            self.sections[section] = _Accumulator(self.thresholds)
+        return self.sections[section]
+
+    def add(self, student: Dict[str, Any]) -> None:
+        self.overall.add(student)
+        acc = self._section(student)
+        if acc is not None:
+            acc.add(student)
+
+    def remove(self, student: Dict[str, Any]) -> None:
+        self.overall.remove(student)
+        acc = self._section(student)
+        if acc is not None:
+            acc.remove(student)
+
+    def replace(self, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        self.remove(old)
+        self.add(new)
+
+    def _group(self, section: Optional[str]) -> _Accumulator:
+        if section is None:
+            return self.overall
+        return self.sections.get(section) or _Accumulator(self.thresholds)
+
+    def average_grade(self, section: Optional[str] = None) -> float:
+        return self._group(section).average_grade()
+
+    def mean(self, section: Optional[str] = None) -> float:
+        return self._group(section).mean
+
+    def variance(self, section: Optional[str] = None, sample: bool = False) -> float:
+        return self._group(section).variance(sample)
+
+    def std_dev(self, section: Optional[str] = None, sample: bool = False) -> float:
+        return math.sqrt(self.variance(section, sample))
+
+    def distribution(self, section: Optional[str] = None) -> Dict[str, int]:
+        return dict(self._group(section).letters)
+
+    def quiz_averages(self, section: Optional[str] = None) -> List[Any]:
+        return self._group(section).quiz_averages()
+
+    def section_averages(self) -> Dict[str, float]:
+        return {sec: acc.average_grade() for sec, acc in self.sections.items() if acc.students > 0}
@@ -0,0 +1,121 @@
+"""What-if grade weight scenarios evaluated as one matrix product.
+
+Authors:
+- John Christian Linaban
+
+Each student reduces to four components: quiz average (None counted as 0 and
+rounded to 2 decimals, as in compute_weighted_grades), midterm, final and
+attendance. Stacking K weight dicts as the columns of a 4 x K matrix W gives
+every scenario's weighted grades as the N x K product C @ W, so dozens of
+alternatives cost about the same as one compute_weighted_grades pass.
+
+Per scenario the result carries the letter distribution, average, at-risk
+count and each student's rank shift against the baseline scenario.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.analytics.columnar import QUIZ_KEYS, build_columns
+from app.analytics.numpy_stats import letter_counts_matrix
+
+COMPONENTS = ("quizzes_total", "midterm", "final", "attendance")
+BASELINE = "current"
+
+
+@dataclass
+class ScenarioResult:
+    names: List[str]
+    weights: np.ndarray  # 4 x K, rows in COMPONENTS order
+    grades: np.ndarray  # N x K weighted grades
+    ranks: np.ndarray  # N x K competition ranks (1 = highest grade)
+    rank_shift: np.ndarray  # N x K, baseline rank minus scenario rank (positive = moved up)
+    averages: Dict[str, float] = field(default_factory=dict)
+    distributions: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    at_risk: Dict[str, int] = field(default_factory=dict)
+
+    def column(self, name: str) -> int:
+        return self.names.index(name)
+
+    def movement(self) -> Dict[str, Dict[str, int]]:
+        """Per scenario: students moved up, moved down and the largest absolute rank shift."""
+        up = (self.rank_shift > 0).sum(axis=0)
+        down = (self.rank_shift < 0).sum(axis=0)
+        largest = np.abs(self.rank_shift).max(axis=0) if self.rank_shift.size else np.zeros(len(self.names), dtype=int)
+        return {
+            name: {"up": int(up[k]), "down": int(down[k]), "max": int(largest[k])}
+            for k, name in enumerate(self.names)
+        }
+
+
+def component_matrix(students: List[Dict[str, Any]]) -> np.ndarray:
+    """N x 4 matrix of quiz average, midterm, final and attendance (missing as 0)."""
+    if not students:
+        return np.zeros((0, len(COMPONENTS)))
+    keys = list(QUIZ_KEYS) + ["midterm", "final", "attendance_percent"]
+    scores = np.nan_to_num(build_columns(students, numeric_keys=keys, text_keys=()).matrix(keys), nan=0.0)
+    quiz_avg = np.round(scores[:, : len(QUIZ_KEYS)].mean(axis=1), 2)
+    return np.column_stack([quiz_avg, scores[:, len(QUIZ_KEYS):]])
+
+
+def weight_matrix(scenarios: Dict[str, Dict[str, float]]) -> np.ndarray:
+    """4 x K matrix with one column per scenario's grade_weights dict."""
+    W = np.array([[float(w.get(c, 0.0)) for w in scenarios.values()] for c in COMPONENTS], dtype=float)
+    if (W < 0).any():
+        raise ValueError("Scenario weights must be non-negative")
+    return W.reshape(len(COMPONENTS), len(scenarios))
+
+
+def _competition_ranks(grades: np.ndarray) -> np.ndarray:
+    # rank = 1 + number of strictly higher grades in the same column
+    ranks = np.empty(grades.shape, dtype=np.int64)
+    ascending = np.sort(grades, axis=0)
+    n = grades.shape[0]
+    for k in range(grades.shape[1]):
+        ranks[:, k] = n - np.searchsorted(ascending[:, k], grades[:, k], side="right") + 1
+    return ranks
+
+
+def run_scenarios(
+    students: List[Dict[str, Any]],
+    scenarios: Dict[str, Dict[str, float]],
+    thresholds: Dict[str, int],
+    at_risk_cutoff: float,
+    baseline: Optional[str] = None,
+) -> ScenarioResult:
+    """Evaluate every weight scenario in one C @ W product.
+
+    baseline names the scenario rank shifts are measured against (defaults to
+    the first one).
+    """
+    if not scenarios:
+        raise ValueError("At least one scenario is required")
+    names = list(scenarios.keys())
+    W = weight_matrix(scenarios)
+    grades = np.round(component_matrix(students) @ W, 2)
+    ranks = _competition_ranks(grades)
+    base = names.index(baseline) if baseline is not None else 0
+    shift = ranks[:, [base]] - ranks
+
+    n = grades.shape[0]
+    averages = grades.mean(axis=0) if n else np.zeros(len(names))
+    at_risk = (grades < float(at_risk_cutoff)).sum(axis=0)
+    return ScenarioResult(
+        names=names,
+        weights=W,
+        grades=grades,
+        ranks=ranks,
+        rank_shift=shift,
+        averages={name: float(averages[k]) for k, name in enumerate(names)},
+        distributions=dict(zip(names, letter_counts_matrix(grades, thresholds))),
+        at_risk={name: int(at_risk[k]) for k, name in enumerate(names)},
+    )
+
+
+def scenarios_from_config(config: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """The configured grade_weights as the baseline, followed by config's weight_scenarios."""
+    scenarios = {BASELINE: dict(config["grade_weights"])}
+    scenarios.update(config.get("weight_scenarios", {}))
+    return scenarios
@@ -0,0 +1,212 @@
+"""Versioned roster snapshots and a vectorized diff between grading runs.
+
+Authors:
+- John Christian Linaban
+
+This module provides:
+- snapshot_from_students(students, thresholds): Freeze the current roster in memory.
+- save_snapshot(students, snapshot_dir, thresholds, label): Write the next numbered
+  snapshot (roster_v0001.npz, roster_v0002.npz, ...) and return its path.
+- list_snapshots(snapshot_dir) / load_snapshot(path): Browse and read saved runs.
+- diff_snapshots(old, new, tolerance): Hash-join on student_id and compare every
+  score column at once; returns added, removed and changed students with
+  per-column deltas in O(n_old + n_new).
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.analytics.columnar import NUMERIC_KEYS, build_columns
+from app.analytics.numpy_stats import assign_letters_numpy
+
+_SNAPSHOT_RE = re.compile(r"^roster_v(\d+)\.npz$")
+
+
+@dataclass
+class RosterSnapshot:
+    version: int
+    created: str
+    label: str
+    columns: List[str]
+    student_ids: np.ndarray
+    last_names: np.ndarray
+    first_names: np.ndarray
+    sections: np.ndarray
+    scores: np.ndarray
+    letters: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.student_ids.shape[0])
+
+
+@dataclass
+class RosterDiff:
+    columns: List[str]
+    added_ids: List[str] = field(default_factory=list)
+    removed_ids: List[str] = field(default_factory=list)
+    changed: List[Dict[str, Any]] = field(default_factory=list)
+    unchanged_count: int = 0
+
+    @property
+    def letter_changes(self) -> int:
+        return sum(1 for row in self.changed if row["old_letter"] != row["new_letter"])
+
+
+def snapshot_from_students(
+    students: List[Dict[str, Any]], thresholds: Dict[str, int], label: str = "current"
+) -> RosterSnapshot:
+    cols = build_columns(students)
+    scores = cols.matrix(NUMERIC_KEYS)
+    return RosterSnapshot(
+        version=0,
+        created=datetime.now().isoformat(timespec="seconds"),
+        label=label,
+        columns=list(NUMERIC_KEYS),
+        student_ids=cols.text["student_id"],
+        last_names=cols.text["last_name"],
+        first_names=cols.text["first_name"],
+        sections=cols.text["section"],
+        scores=scores,
+        letters=assign_letters_numpy(cols.numeric["weighted_grade"], thresholds),
+    )
+
+
+def list_snapshots(snapshot_dir: str) -> List[Dict[str, Any]]:
+    """Return metadata for every saved snapshot, oldest version first."""
+    if not os.path.isdir(snapshot_dir):
+        return []
+    found: List[Dict[str, Any]] = []
+    for name in os.listdir(snapshot_dir):
+        match = _SNAPSHOT_RE.match(name)
+        if not match:
+            continue
+        path = os.path.join(snapshot_dir, name)
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+        meta["path"] = path
+        found.append(meta)
+    return sorted(found, key=lambda m: m["version"])
+
+
+def save_snapshot(
+    students: List[Dict[str, Any]], snapshot_dir: str, thresholds: Dict[str, int], label: str = ""
+) -> str:
+    os.makedirs(snapshot_dir, exist_ok=True)
+    existing = list_snapshots(snapshot_dir)
+    version = existing[-1]["version"] + 1 if existing else 1
+    snap = snapshot_from_students(students, thresholds, label=label)
+    meta = {"version": version, "created": snap.created, "label": label, "count": len(snap)}
+    path = os.path.join(snapshot_dir, f"roster_v{version:04d}.npz")
+    np.savez_compressed(
+        path,
+        meta=np.array(json.dumps(meta)),
+        columns=np.array(snap.columns),
+        student_ids=snap.student_ids,
+        last_names=snap.last_names,
+        first_names=snap.first_names,
+        sections=snap.sections,
+        scores=snap.scores,
+        letters=snap.letters,
+    )
+    return path
+
+
+def load_snapshot(path: str) -> RosterSnapshot:
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        return RosterSnapshot(
+            version=int(meta["version"]),
+            created=meta.get("created", ""),
+            label=meta.get("label", ""),
+            columns=[str(c) for c in data["columns"]],
+            student_ids=data["student_ids"],
+            last_names=data["last_names"],
+            first_names=data["first_names"],
+            sections=data["sections"],
+            scores=data["scores"],
+            letters=data["letters"],
+        )
+
+
+def _fmt_delta(value: Optional[float]) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), 2)
+
+
+def diff_snapshots(old: RosterSnapshot, new: RosterSnapshot, tolerance: float = 0.005) -> RosterDiff:
+    """Compare two snapshots; columns are matched by name, students by ID."""
+    columns = [c for c in new.columns if c in old.columns]
+    old_cols = [old.columns.index(c) for c in columns]
+    new_cols = [new.columns.index(c) for c in columns]
+
+    # Hash join: one dict build over old IDs, one probe pass over new IDs
+    old_index = {sid: i for i, sid in enumerate(old.student_ids.tolist())}
+    pos = np.fromiter((old_index.get(sid, -1) for sid in new.student_ids.tolist()), dtype=np.int64, count=len(new))
+    matched = pos >= 0
+    seen = np.zeros(len(old), dtype=bool)
+    seen[pos[matched]] = True
+
+    diff = RosterDiff(columns=columns)
+    diff.added_ids = new.student_ids[~matched].tolist()
+    diff.removed_ids = old.student_ids[~seen].tolist()
+
+    new_rows = np.flatnonzero(matched)
+    old_rows = pos[matched]
+    before = old.scores[np.ix_(old_rows, old_cols)]
+    after = new.scores[np.ix_(new_rows, new_cols)]
+    delta = after - before
+    # A cell changed when both values exist and differ, or only one side is missing
+    value_changed = np.abs(np.nan_to_num(delta, nan=0.0)) > tolerance
+    presence_changed = np.isnan(before) != np.isnan(after)
+    cell_changed = value_changed | presence_changed
+    letter_changed = old.letters[old_rows] != new.letters[new_rows]
+    row_changed = cell_changed.any(axis=1) | letter_changed
+    diff.unchanged_count = int((~row_changed).sum())
+
+    grade_col = columns.index("weighted_grade") if "weighted_grade" in columns else None
+    for r in np.flatnonzero(row_changed):
+        i_new = int(new_rows[r])
+        i_old = int(old_rows[r])
+        deltas = {
+            columns[c]: _fmt_delta(delta[r, c])
+            for c in np.flatnonzero(cell_changed[r])
+        }
+        diff.changed.append({
+            "student_id": str(new.student_ids[i_new]),
+            "last_name": str(new.last_names[i_new]),
+            "first_name": str(new.first_names[i_new]),
+            "section": str(new.sections[i_new]),
+            "old_grade": _fmt_delta(before[r, grade_col]) if grade_col is not None else None,
+            "new_grade": _fmt_delta(after[r, grade_col]) if grade_col is not None else None,
+            "old_letter": str(old.letters[i_old]),
+            "new_letter": str(new.letters[i_new]),
+            "deltas": deltas,
+        })
+    return diff
+
+
+def diff_to_rows(diff: RosterDiff) -> List[Dict[str, Any]]:
+    """Flatten a diff into export-friendly rows (one per student)."""
+    rows: List[Dict[str, Any]] = []
+    for sid in diff.added_ids:
+        rows.append({"student_id": sid, "status": "added"})
+    for sid in diff.removed_ids:
+        rows.append({"student_id": sid, "status": "removed"})
+    for row in diff.changed:
+        flat = {k: v for k, v in row.items() if k != "deltas"}
+        flat["status"] = "changed"
+        for col in diff.columns:
+            flat[f"delta_{col}"] = row["deltas"].get(col, "")
+        rows.append(flat)
+    # Uniform keys so csv.DictWriter accepts every row
+    keys: List[str] = []
+    for row in rows:
+        for k in row:
+            if k not in keys:
+                keys.append(k)
+    return [{k: row.get(k, "") for k in keys} for row in rows]
@@ -6,8 +6,14 @@ Authors:
 - John Christian Linaban
 """
 
+import heapq
 import math
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from app.analytics.binning import letter_distribution
+
+if TYPE_CHECKING:
+    from app.analytics.sketch import QuantileSketch
 
 def compute_weighted_grades(students: List[Dict[str, Any]], weight: Dict[str, float]) -> List[Dict[str, Any]]:
     # Initializing keys
@@ -47,35 +53,12 @@ def compute_weighted_grades(students: List[Dict[str, Any]], weight: Dict[str, fl
     return stud_w_weighted_grade
 
 def calculate_distribution(students: List[Dict[str, Any]], thresholds: Dict[str, int]) -> Dict[str, int]:
-    # Creating placeholder for students with grade evaluation
-    students_with_gradeletter: Dict[str, int] = {}
-    # Initializing the Dictionary for grade evaluation counter
-    key = list(thresholds.keys())
-    key.append('-D') # For students who doesn't meet the thresholds (below D)
-    grade_eval_counter = {key:0 for key in key}
-    # Processing students...
-    for stud in students:
-        # Checking what's the grade evaluation on a student then count
-        if thresholds['A'] <= round(stud['weighted_grade']):
-            grade_eval_counter['A'] += 1
-        elif thresholds['B'] <= round(stud['weighted_grade']) < thresholds['A']:
-            grade_eval_counter['B'] += 1
-        elif thresholds['C'] <= round(stud['weighted_grade']) < thresholds['B']:
-            grade_eval_counter['C'] += 1
-        elif thresholds['D'] <= round(stud['weighted_grade']) < thresholds['C']:
-            grade_eval_counter['D'] += 1
-        elif thresholds['D'] > round(stud['weighted_grade']):
-            grade_eval_counter['-D'] += 1
-    return grade_eval_counter
-
-def calculate_percentile(students: List[Dict[str, Any]], percentile: int) -> Optional[float]:
-    grades = [
-        s.get('weighted_grade') for s in students
-        if isinstance(s.get('weighted_grade'), (int, float))
-    ]
-    if not grades:
-        return None
-    sorted_grades = sorted(float(g) for g in grades)
+    # Any number of letter bands: grades are binned against the sorted cutoffs
+    # in one searchsorted/bincount pass (see binning.py); '-D' counts grades
+    # below the lowest cutoff
+    return letter_distribution([stud.get('weighted_grade') for stud in students], thresholds)
+
+def _nearest_rank(sorted_grades: List[float], percentile: int) -> float:
     N = len(sorted_grades)
     p = max(0, min(100, int(percentile)))
     if p == 0:
@@ -85,20 +68,55 @@ def calculate_percentile(students: List[Dict[str, Any]], percentile: int) -> Opt
     index = math.ceil((p / 100) * N) - 1
     index = max(0, min(index, N - 1))
     return sorted_grades[index]
+
+def calculate_percentiles(
+    students: List[Dict[str, Any]],
+    percentiles: Sequence[int],
+    sketch: Optional["QuantileSketch"] = None,
+) -> Dict[int, Optional[float]]:
+    """Answer every requested percentile from a single sort of the grades.
+
+    When a QuantileSketch is given (streaming/parallel ingest), the approximate
+    answers come from the sketch and students is ignored.
+    """
+    if sketch is not None:
+        return sketch.percentiles(percentiles)
+    grades = [
+        s.get('weighted_grade') for s in students
+        if isinstance(s.get('weighted_grade'), (int, float))
+    ]
+    if not grades:
+        return {int(p): None for p in percentiles}
+    sorted_grades = sorted(float(g) for g in grades)
+    return {int(p): _nearest_rank(sorted_grades, p) for p in percentiles}
+
+def calculate_percentile(
+    students: List[Dict[str, Any]], percentile: int, sketch: Optional["QuantileSketch"] = None
+) -> Optional[float]:
+    return calculate_percentiles(students, [percentile], sketch=sketch)[int(percentile)]
     
 def _get_grade(student: Dict[str, Any]) -> float:
     """Helper function to get a student's grade, defaulting to 0."""
-    return student.get("weighted_grade", 0)
+    grade = student.get("weighted_grade", 0)
+    return grade if grade is not None else 0
+
+def _top_key(student: Dict[str, Any]):
+    # Highest grade first; equal grades ordered by student_id
+    return (-_get_grade(student), str(student.get("student_id", "")))
+
+def _bottom_key(student: Dict[str, Any]):
+    return (_get_grade(student), str(student.get("student_id", "")))
 
 def get_top_n_students(students: List[Dict[str, Any]], n: int) -> List[Dict[str, Any]]:
-    sorted_students = sorted(students, key=_get_grade, reverse=True)
-    top_students = sorted_students[:n]
-    return top_students
+    # Heap selection keeps only n candidates: O(len(students) * log n) instead of a full sort
+    if n <= 0:
+        return []
+    return heapq.nsmallest(n, students, key=_top_key)
 
 def get_bottom_n_students(students: List[Dict[str, Any]], n: int) -> List[Dict[str, Any]]:
-    sorted_students = sorted(students, key=_get_grade)
-    bottom_students = sorted_students[:n]
-    return bottom_students
+    if n <= 0:
+        return []
+    return heapq.nsmallest(n, students, key=_bottom_key)
 
 def get_average_grade(students: List[Dict[str, Any]]) -> float:
     if not students:
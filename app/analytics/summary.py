@@ -0,0 +1,90 @@
+"""Fused course summary: every dashboard aggregate from one vectorized sweep.
+
+Authors:
+- John Christian Linaban
+
+summarize(students, config) converts the roster to columns once and derives the
+average grade, letter distribution, quiz averages / hardest quiz, midterm-to-final
+improvement, attendance correlation, percentiles, IQR outliers and the at-risk
+list from those arrays. Result dicts match the per-function versions in
+stats.py and insights.py so the existing table builders can consume them.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.analytics.columnar import QUIZ_KEYS, RosterColumns, build_columns
+from app.analytics.numpy_insights import (
+    attendance_from_columns,
+    improvement_from_columns,
+    quiz_stats_from_columns,
+)
+from app.analytics.numpy_stats import letter_counts_matrix, percentiles_numpy
+
+
+@dataclass
+class CourseSummary:
+    total_students: int
+    average_grade: float
+    distribution: Dict[str, int]
+    quiz_averages: Dict[str, float]
+    quiz_counts: Dict[str, int]
+    hardest_quiz: str
+    lowest_quiz_avg: float
+    improvement: Dict[str, Any]
+    attendance: Dict[str, Any]
+    percentiles: Dict[int, Optional[float]]
+    outliers: List[Dict[str, Any]] = field(default_factory=list)
+    at_risk: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _distribution(grades: np.ndarray, thresholds: Dict[str, int]) -> Dict[str, int]:
+    return letter_counts_matrix(grades, thresholds)[0]
+
+
+def summarize(
+    students: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    attendance_threshold: float = 80.0,
+    percentiles: Sequence[int] = (25, 50, 75, 90),
+    columns: Optional[RosterColumns] = None,
+) -> CourseSummary:
+    """Compute every course-level aggregate from a single columnar conversion."""
+    cols = columns if columns is not None else build_columns(students, text_keys=())
+    thresholds = config["thresholds"]["grade_letters"]
+    cutoff = float(config["thresholds"]["at_risk_cutoff"])
+    n = len(cols)
+
+    grades = cols.numeric["weighted_grade"]
+    has_grade = ~np.isnan(grades)
+    valid_grades = grades[has_grade]
+
+    pcts = sorted(set(int(p) for p in percentiles) | {25, 75})
+    pct_values = percentiles_numpy(valid_grades, pcts)
+    outliers: List[Dict[str, Any]] = []
+    q1, q3 = pct_values[25], pct_values[75]
+    if q1 is not None and q3 is not None:
+        iqr = q3 - q1
+        flagged = has_grade & ((grades < q1 - 1.5 * iqr) | (grades > q3 + 1.5 * iqr))
+        outliers = [students[i] for i in np.flatnonzero(flagged)]
+    at_risk = [students[i] for i in np.flatnonzero(has_grade & (grades < cutoff))]
+
+    quiz_keys = [k for k in QUIZ_KEYS if k in cols.numeric]
+    quiz_averages, quiz_counts, hardest, lowest = quiz_stats_from_columns(cols, quiz_keys)
+
+    return CourseSummary(
+        total_students=n,
+        average_grade=float(np.nan_to_num(grades, nan=0.0).sum() / n) if n else 0.0,
+        distribution=_distribution(grades, thresholds),
+        quiz_averages=quiz_averages,
+        quiz_counts=quiz_counts,
+        hardest_quiz=hardest,
+        lowest_quiz_avg=lowest,
+        improvement=improvement_from_columns(cols.numeric["midterm"], cols.numeric["final"]),
+        attendance=attendance_from_columns(cols.numeric["attendance_percent"], grades, attendance_threshold),
+        percentiles={int(p): pct_values[int(p)] for p in percentiles},
+        outliers=outliers,
+        at_risk=at_risk,
+    )
@@ -5,7 +5,7 @@ Authors:
 - John Christian Linaban
 """
 
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
 from rich.progress import Progress
@@ -14,6 +14,7 @@ from rich.text import Text
 from rich.theme import Theme
 from rich.layout import Layout
 from rich.live import Live
+from rich.markup import escape
 from rich.columns import Columns
 from time import sleep
 import time
@@ -29,40 +30,80 @@ from app.core import (
     group_students_by_section,
     insert_student as core_insert_student,
     delete_student as core_delete_student,
+    bump_roster_version,
+    get_roster_version,
     sort_students,
 )
 from app.analytics.stats import (
     compute_weighted_grades,
     calculate_distribution,
-    calculate_percentile,
+    calculate_percentiles,
     get_top_n_students,
     get_bottom_n_students,
     get_average_grade,
-    apply_grade_curve as stats_apply_curve,
 )
 from app.analytics.numpy_stats import (
     compute_weighted_grades_numpy,
+    select_n_indices,
+    section_percentiles_numpy,
 )
-from app.analytics.insights import (
-    get_quiz_averages,
-    get_sections_quiz_averages,
-    track_midterm_to_final_improvement,
-    correlate_attendance_and_grades,
-    compare_sections,
-    get_at_risk_students,
-    find_outliers,
-)
+from app.analytics.columnar import NUMERIC_KEYS, SCORE_KEYS, TEXT_KEYS, RosterColumns, build_columns
+from app.analytics.expressions import filter_indices
+from app.analytics.engine import get_engine
+from app.analytics.running import RunningStats
+from app.analytics.cache import DEFAULT_MAXSIZE, AnalyticsCache
 from app.reporting.tables import (
     build_student_table,
     build_distribution_table,
     build_section_summary_table,
     build_rank_table,
-    build_curve_table,
     build_hardest_topic_table,
     build_quiz_comparison_table,
+    build_diff_table,
+    build_percentile_table,
+    build_correlation_table,
+    build_scenario_table,
+    build_curve_impact_table,
+    build_curve_comparison_table,
+    build_section_distribution_table,
+    build_section_overview_table,
+    build_cohort_percentile_table,
+    build_cohort_trend_table,
+    build_section_trend_table,
+    build_histogram_table,
+    build_outlier_table,
+    build_final_plan_table,
+    build_risk_table,
+    build_prediction_fit_table,
+    build_predicted_final_table,
+    build_cluster_table,
+)
+from app.analytics.summary import CourseSummary, summarize
+from app.analytics.binning import section_distributions, with_letters
+from app.analytics.curves import curve_impact, curve_params_from_config
+from app.analytics.scenarios import run_scenarios, scenarios_from_config
+from app.analytics.ranking import assign_ranks
+from app.analytics.histogram import HistogramService
+from app.analytics.clustering import cluster_students, clustering_settings
+from app.analytics.prediction import FinalModel, fit_final_model, predicted_at_risk
+from app.analytics.risk import risk_settings, simulate_failure_risk
+from app.analytics.planner import FinalPlan, plan_final_scores
+from app.analytics.outliers import DEFAULT_THRESHOLDS as OUTLIER_THRESHOLDS, OUTLIER_METHODS, grouped_outliers
+from app.analytics.bootstrap import BootstrapInterval, bootstrap_settings, section_intervals
+from app.analytics.cohort import cohort_cache_path, expand_term_paths, find_cohort_outliers, load_cohort
+from app.analytics.parallel import parallel_settings, run_section_analytics
+from app.analytics.correlation import METHODS as CORRELATION_METHODS, correlation_matrix, section_correlation_matrices
+from app.analytics.snapshots import (
+    save_snapshot,
+    list_snapshots,
+    load_snapshot,
+    snapshot_from_students,
+    diff_snapshots,
+    diff_to_rows,
 )
 from app.reporting.exporter import export_to_csv
 from app.reporting.plotting import (
+    plot_cohort_trends,
     plot_grade_histogram,
     plot_combined_histogram,
     _is_display_available,
@@ -79,11 +120,30 @@ theme = Theme(
     }
 )
 console = Console(theme=theme)
+# Insight functions for the engine selected in config.json ("analytics.engine"); set on load
+insights_engine = get_engine()
+# Running aggregates for the loaded roster; rebuilt on load, updated in O(1) by CRUD
+roster_stats: Optional[RunningStats] = None
+# Memoized view results keyed on the roster version (see app.analytics.cache)
+analytics_cache = AnalyticsCache()
+# Binned counts for plots and text histograms, cached alongside the other views
+histogram_service = HistogramService(analytics_cache)
+# Rows as read (before grading zero-fills missing scores), keyed by id() of the graded dict
+_raw_rows: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+# Roster version the rank columns were last written for (see _ensure_ranks)
+_ranked_version = -1
 
 # =====================================
 # Helpers and State
 # =====================================
-def prompt_int(prompt_text: str, default: int, min_value: Optional[int] = None, max_value: Optional[int] = None) -> int:
+def _ensure_ranks(students: List[Dict[str, Any]]) -> None:
+    """Recompute the rank columns once per roster version (load, insert, edit, delete)."""
+    global _ranked_version
+    if _ranked_version != get_roster_version():
+        assign_ranks(students)
+        _ranked_version = get_roster_version()
+
+def prompt_int(prompt_text: str, default: Optional[int], min_value: Optional[int] = None, max_value: Optional[int] = None) -> Optional[int]:
     try:
         raw = input(f"{prompt_text} ").strip()
         if raw == "":
@@ -97,7 +157,7 @@ def prompt_int(prompt_text: str, default: int, min_value: Optional[int] = None,
     except Exception:
         return default
 
-def prompt_float(prompt_text: str, default: float, min_value: Optional[float] = None, max_value: Optional[float] = None) -> float:
+def prompt_float(prompt_text: str, default: Optional[float], min_value: Optional[float] = None, max_value: Optional[float] = None) -> Optional[float]:
     try:
         raw = input(f"{prompt_text} ").strip()
         if raw == "":
@@ -129,6 +189,10 @@ def _status_text_basic(students: Optional[List[Dict[str, Any]]] = None,
         parts.append(f"Config: {config_path}")
     return "  |  ".join(parts)
 
+def _cache_status() -> str:
+    stats = analytics_cache.stats()
+    return f"Cache: {stats['hits']} hits / {stats['misses']} misses"
+
 def _build_layout(header_title: str,
                   help_text: str,
                   status_text: str,
@@ -241,16 +305,17 @@ def paginate_students_table(students: List[Dict[str, Any]], base_title: str, pag
     status_text = f"Students: {total}"
     _paginate_loop_live(make, total, page_size, base_title, help_text, status_text)
 
-def paginate_rank_table(rows: List[Dict[str, Any]], base_title: str, page_size: int = 10) -> None:
+def paginate_rank_table(rows: List[Dict[str, Any]], base_title: str, page_size: int = 10, rank_key: str = "rank") -> None:
     total = len(rows)
     def make(i_start: int, i_end: int, total_items: int):
         title = f"{base_title} [{i_start+1}-{i_end}/{total_items}]"
-        return build_rank_table(rows[i_start:i_end], title=title)
+        return build_rank_table(rows[i_start:i_end], title=title, rank_key=rank_key)
     help_text = "Use ←/→ to navigate pages • Press q/Esc/Backspace to return"
     status_text = f"Rows: {total}"
     _paginate_loop_live(make, total, page_size, base_title, help_text, status_text)
 
-def paginate_section_summary(sections_map: Dict[str, List[Dict[str, Any]]], averages: Dict[str, float], base_title: str, page_size: int = 10) -> None:
+def paginate_section_summary(sections_map: Dict[str, List[Dict[str, Any]]], averages: Dict[str, float], base_title: str, page_size: int = 10,
+                             intervals: Optional[Dict[str, BootstrapInterval]] = None, confidence: float = 0.95) -> None:
     section_names = sorted(sections_map.keys())
     total = len(section_names)
     if total == 0:
@@ -261,12 +326,13 @@ def paginate_section_summary(sections_map: Dict[str, List[Dict[str, Any]]], aver
         subset_names = section_names[i_start:i_end]
         subset_map = {sec: sections_map[sec] for sec in subset_names}
         title = f"{base_title} [{i_start+1}-{i_end}/{total_items}]"
-        return build_section_summary_table(subset_map, averages, title=title)
+        return build_section_summary_table(subset_map, averages, title=title, intervals=intervals, confidence=confidence)
     help_text = "Use ←/→ to navigate pages • Press q/Esc/Backspace to return"
     status_text = f"Sections: {total}"
     _paginate_loop_live(make, total, page_size, base_title, help_text, status_text)
 
 def load_or_reload_data(config_path: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]], str]:
+    global insights_engine, roster_stats, analytics_cache, histogram_service, _raw_rows
     from rich.align import Align
     from rich.text import Text
     from rich.panel import Panel
@@ -288,6 +354,9 @@ def load_or_reload_data(config_path: Optional[str] = None) -> Tuple[List[Dict[st
                 progress.update(task1, advance=1)
                 sleep(0.005)
             config = load_config(chosen_path)
+            insights_engine = get_engine(config)
+            analytics_cache = AnalyticsCache(int(config.get("analytics", {}).get("cache_size", DEFAULT_MAXSIZE)))
+            histogram_service = HistogramService(analytics_cache)
             
             task2 = progress.add_task("[cyan]Reading CSV data...", total=100)
             for _ in range(100):
@@ -300,12 +369,15 @@ def load_or_reload_data(config_path: Optional[str] = None) -> Tuple[List[Dict[st
                 progress.update(task3, advance=1)
                 sleep(0.005)
             students = compute_weighted_grades(students_raw, config["grade_weights"])
+            _raw_rows = {id(s): (s, raw) for s, raw in zip(students, students_raw)}
             
             task4 = progress.add_task("[cyan]Grouping by sections...", total=100)
             for _ in range(100):
                 progress.update(task4, advance=1)
                 sleep(0.005)
             sections = group_students_by_section(students)
+            roster_stats = RunningStats.from_students(students, config["thresholds"]["grade_letters"])
+            _ensure_ranks(students)
     # Success summary in centered layout
     summary_lines = [
         "[good]Configuration loaded[/good]",
@@ -333,8 +405,8 @@ def insert_demo_student(students: List[Dict[str, Any]], sections: Dict[str, List
         "final": 93,
         "attendance_percent": 95,
     }
-    new_student = compute_weighted_grades([new_student], config["grade_weights"])[0]
-    core_insert_student(sections, new_student)
+    new_student = _grade_entered(new_student, config["grade_weights"])
+    core_insert_student(sections, new_student, running=roster_stats)
     students.append(new_student)
     console.print(f"[bold green]Inserted {new_student['first_name']} {new_student['last_name']} into {new_student['section']}[/bold green]")
     input("Press Enter to continue...")
@@ -349,7 +421,7 @@ def delete_student_by_id(students: List[Dict[str, Any]], sections: Dict[str, Lis
         console.print("[warn]Cancelled.[/warn]")
         input("Press Enter to continue...")
         return students, sections
-    if core_delete_student(sections, student_id):
+    if core_delete_student(sections, student_id, running=roster_stats):
         students = [s for s in students if s.get("student_id") != student_id]
         console.print(f"[good]Deleted student with ID {student_id}[/good]")
     else:
@@ -499,7 +571,7 @@ def arrow_menu(title: str, options: Dict[str, str], level: int = 1, status_text:
 # =====================================
 # Renderers (Showcase-integrated)
 # =====================================
-def view_overall_roster(students: List[Dict[str, Any]]) -> None:
+def view_overall_roster(students: List[Dict[str, Any]], config_path: Optional[str] = None) -> None:
     console.clear()
     filt = prompt_str("Filter by name contains (optional):", "")
     if filt:
@@ -510,57 +582,110 @@ def view_overall_roster(students: List[Dict[str, Any]]) -> None:
         ]
     else:
         filtered = students
+    if config_path:
+        filtered = with_letters(filtered, load_config(config_path)["thresholds"]["grade_letters"])
     paginate_students_table(filtered, base_title="Overall Roster", page_size=10)
 
-def view_overall_distribution(students: List[Dict[str, Any]], config_path: str) -> None:
+def view_overall_distribution(students: List[Dict[str, Any]], config_path: str, summary: Optional[CourseSummary] = None) -> None:
     console.clear()
-    cfg = load_config(config_path)
-    dist = calculate_distribution(students, cfg["thresholds"]["grade_letters"])
+    if roster_stats is not None:
+        dist = roster_stats.distribution()
+    elif summary is not None:
+        dist = summary.distribution
+    else:
+        cfg = load_config(config_path)
+        dist = calculate_distribution(students, cfg["thresholds"]["grade_letters"])
     table = build_distribution_table(dist, total=len(students), title="Overall Grade Distribution")
     status = _status_text_basic(students, None, config_path)
     _show_in_layout(table, "Overall Distribution", status_text=status)
 
-def view_section_summary(sections: Dict[str, List[Dict[str, Any]]]) -> None:
+def view_section_summary(sections: Dict[str, List[Dict[str, Any]]], config_path: str) -> None:
     console.clear()
-    averages = {sec: get_average_grade(studs) for sec, studs in sections.items()}
-    paginate_section_summary(sections, averages, base_title="Average Grade per Section", page_size=10)
+    def compute() -> Dict[str, float]:
+        if roster_stats is not None:
+            return {sec: roster_stats.average_grade(sec) for sec in sections}
+        return {sec: get_average_grade(studs) for sec, studs in sections.items()}
+    averages = analytics_cache.get_or_compute("view_section_summary", compute)
+    settings = bootstrap_settings(load_config(config_path))
+    intervals = analytics_cache.get_or_compute(
+        "section_intervals", lambda: section_intervals(sections, **settings), params=tuple(sorted(settings.items()))
+    )
+    paginate_section_summary(sections, averages, base_title="Average Grade per Section", page_size=10,
+                             intervals=intervals, confidence=settings["confidence"])
 
 def view_overall_ranking(students: List[Dict[str, Any]]) -> None:
     console.clear()
     n = prompt_int("Top N (default 10):", 10, 1, 1000)
-    top_students = get_top_n_students(students, n)
-    rows = [dict(rank=i + 1, **s) for i, s in enumerate(top_students)]
+    cols = build_columns(students, numeric_keys=("weighted_grade",), text_keys=("student_id",))
+    top_idx = select_n_indices(cols.numeric["weighted_grade"], cols.text["student_id"], n, largest=True)
+    # Rank columns are precomputed, so tied students share a rank
+    rows = [students[j] for j in top_idx]
     paginate_rank_table(rows, base_title=f"Top {n} — Overall", page_size=10)
 
-def view_percentiles(students: List[Dict[str, Any]]) -> None:
+def view_percentiles(students: List[Dict[str, Any]], summary: Optional[CourseSummary] = None) -> None:
     console.clear()
     table = Table(title="Percentiles (Overall)")
     table.add_column("Percentile", justify="center")
     table.add_column("Weighted Grade", justify="right")
-    for p in [25, 50, 75, 90]:
-        val = calculate_percentile(students, p)
+    percentiles = [25, 50, 75, 90]
+    values = summary.percentiles if summary is not None else calculate_percentiles(students, percentiles)
+    for p in percentiles:
+        val = values.get(p)
         display = f"{val:.2f}%" if val is not None else "N/A"
         table.add_row(f"{p}th", display)
     status = _status_text_basic(students, None, None)
     _show_in_layout(table, "Percentiles (Overall)", status_text=status)
 
-def view_curve_preview(students: List[Dict[str, Any]]) -> None:
+def view_curve_preview(students: List[Dict[str, Any]], config_path: str) -> None:
     console.clear()
-    method = prompt_str("Curve method [flat|normalize] (default flat):", "flat")
-    if method == "normalize":
-        target_max = prompt_int("Target max grade (default 100):", 100, 1, 100)
-        curved = stats_apply_curve([s.copy() for s in students], method="normalize", value=float(target_max))
-    else:
-        points = prompt_float("Flat curve points to add (default 5):", 5.0, -100.0, 100.0)
-        curved = stats_apply_curve([s.copy() for s in students], method="flat", value=float(points))
-    preview = prompt_int("Preview how many students? (default 5):", 5, 1, len(curved))
-    table = build_curve_table(curved[:preview], title="Curve Preview")
+    cfg = load_config(config_path)
+    params = curve_params_from_config(cfg)
+    if prompt_str("Customize curve parameters? [y/N]:", "N").strip().lower() == "y":
+        params["flat"]["points"] = prompt_float(f"Flat curve points to add ({params['flat']['points']}):", float(params["flat"]["points"]), -100.0, 100.0)
+        params["normalize"]["target_max"] = prompt_float(f"Normalize: target max ({params['normalize']['target_max']}):", float(params["normalize"]["target_max"]), 1.0, 100.0)
+        params["zscore"]["target_mean"] = prompt_float(f"Z-score: target mean ({params['zscore']['target_mean']}):", float(params["zscore"]["target_mean"]), 0.0, 100.0)
+        params["zscore"]["target_sd"] = prompt_float(f"Z-score: target SD ({params['zscore']['target_sd']}):", float(params["zscore"]["target_sd"]), 0.0, 50.0)
+        params["percentile"]["percentile"] = prompt_int(f"Percentile anchor ({params['percentile']['percentile']}):", int(params["percentile"]["percentile"]), 1, 99)
+        params["percentile"]["target"] = prompt_float(f"Percentile anchor target ({params['percentile']['target']}):", float(params["percentile"]["target"]), 0.0, 100.0)
+    preview = prompt_int("Preview how many students? (default 5):", 5, 0, len(students))
+    grades = build_columns(students, numeric_keys=("weighted_grade",), text_keys=()).numeric["weighted_grade"]
+    impact = curve_impact(grades, cfg["thresholds"]["grade_letters"], cfg["thresholds"]["at_risk_cutoff"], params=params)
+    tables: List[Any] = [build_curve_impact_table(
+        impact.methods, impact.averages, impact.distributions, impact.at_risk, impact.raised,
+        title="Curve Preview — impact of every method",
+    )]
+    if preview:
+        tables.append(build_curve_comparison_table(students[:preview], impact.methods, impact.curved[:preview], title="Sample Students"))
     status = _status_text_basic(students, None, None)
-    _show_in_layout(table, "Curve Preview", status_text=status)
+    _show_in_layout(Group(*tables), "Curve Preview", status_text=status)
 
-def view_improvement_insights(students: List[Dict[str, Any]]) -> None:
+def view_weight_scenarios(students: List[Dict[str, Any]], config_path: str) -> None:
     console.clear()
-    result = track_midterm_to_final_improvement(students)
+    cfg = load_config(config_path)
+    scenarios = scenarios_from_config(cfg)
+    if prompt_str("Add a custom weight scenario? [y/N]:", "N").strip().lower() == "y":
+        base = cfg["grade_weights"]
+        scenarios["custom"] = {
+            "quizzes_total": prompt_float(f"Quizzes weight ({base['quizzes_total']}):", float(base["quizzes_total"]), 0.0, 1.0),
+            "midterm": prompt_float(f"Midterm weight ({base['midterm']}):", float(base["midterm"]), 0.0, 1.0),
+            "final": prompt_float(f"Final weight ({base['final']}):", float(base["final"]), 0.0, 1.0),
+            "attendance": prompt_float(f"Attendance weight ({base['attendance']}):", float(base["attendance"]), 0.0, 1.0),
+        }
+    result = run_scenarios(students, scenarios, cfg["thresholds"]["grade_letters"], cfg["thresholds"]["at_risk_cutoff"])
+    table = build_scenario_table(
+        result.names, result.weights, result.averages, result.distributions, result.at_risk, result.movement(),
+        title="What-if Weight Scenarios (rank shifts vs current)",
+    )
+    status = f"Students: {len(students)}  |  Scenarios: {len(result.names)}"
+    _show_in_layout(table, "Weight Scenarios", status_text=status)
+
+def _final_model(students: List[Dict[str, Any]]) -> FinalModel:
+    # Fitted once per roster version
+    return analytics_cache.get_or_compute("final_model", lambda: fit_final_model(students, observed=_observed_rows(students)))
+
+def view_improvement_insights(students: List[Dict[str, Any]], summary: Optional[CourseSummary] = None, model: Optional[FinalModel] = None) -> None:
+    console.clear()
+    result = summary.improvement if summary is not None else insights_engine.track_midterm_to_final_improvement(students)
     lines: List[str] = ["[bold]Midterm vs. Final Improvement Analysis:[/bold]"]
     if result["total_students"] == 0:
         lines.append("[bad]No midterm and final exam data available to analyze.[/bad]")
@@ -580,14 +705,42 @@ def view_improvement_insights(students: List[Dict[str, Any]]) -> None:
         lines.append("\n[bold yellow]SUGGESTIONS:[/bold yellow]")
         for s in result["suggestions"]:
             lines.append(f"- {s}")
+    if model is not None:
+        course = model.quality()[-1]
+        own = int((~model.pooled[:-1]).sum())
+        lines.append("\n[bold]Final Exam Predictor (least squares on quizzes, midterm, attendance):[/bold]")
+        r2 = "-" if course["r2"] != course["r2"] else f"{course['r2']:.3f}"
+        lines.append(f"- Course-wide fit: R² {r2}, RMSE {course['rmse']:.2f} points over {course['n']} recorded finals")
+        lines.append(f"- Section models: {own} fitted per section, {len(model.sections) - 1 - own} using the course-wide fit")
     panel = Panel(Text.from_markup("\n".join(lines)), border_style="cyan")
     status = _status_text_basic(students, None, None)
     _show_in_layout(panel, "Improvement Insights", status_text=status)
 
-def view_attendance_correlation_overall(students: List[Dict[str, Any]]) -> None:
+def view_final_predictor(students: List[Dict[str, Any]], config_path: str) -> None:
+    console.clear()
+    cfg = load_config(config_path)
+    cutoff = float(cfg["thresholds"]["at_risk_cutoff"])
+    model = _final_model(students)
+    status = f"Sections: {len(model.sections) - 1}  |  Recorded finals: {int(model.n_train[-1])}  |  Students: {len(students)}"
+    _show_in_layout(build_prediction_fit_table(model.quality()), "Final Exam Predictor — Fit Quality", status_text=status)
+    rows = predicted_at_risk(students, model, cfg["grade_weights"], cutoff, observed=_observed_rows(students))
+    base_title = f"Predicted Below {cutoff:g} (No Final Yet)"
+    if not rows:
+        _show_in_layout(Panel(Text.from_markup("[good]No student without a final is predicted below the cutoff.[/good]"), border_style="green"), base_title, status_text=status)
+        return
+    def make(i_start: int, i_end: int, total_items: int):
+        title = f"{base_title} [{i_start+1}-{i_end}/{total_items}]"
+        return build_predicted_final_table(rows[i_start:i_end], title=title)
+    help_text = "Use ←/→ to navigate pages • Press q/Esc/Backspace to return"
+    _paginate_loop_live(make, len(rows), 10, base_title, help_text, f"Flagged: {len(rows)}  |  " + status)
+
+def view_attendance_correlation_overall(students: List[Dict[str, Any]], summary: Optional[CourseSummary] = None) -> None:
     console.clear()
     threshold = prompt_float("Attendance threshold % (default 80):", 80.0, 0.0, 100.0)
-    res = correlate_attendance_and_grades(students, threshold=float(threshold))
+    if summary is not None and summary.attendance["threshold"] == float(threshold):
+        res = summary.attendance
+    else:
+        res = insights_engine.correlate_attendance_and_grades(students, threshold=float(threshold))
     lines: List[str] = ["[bold]Attendance-Grade Correlation (Overall):[/bold]"]
     if res["low_count"] == 0 and res["high_count"] == 0:
         lines.append("[bad]No attendance data available to analyze.[/bad]")
@@ -613,9 +766,9 @@ def view_attendance_correlation_overall(students: List[Dict[str, Any]]) -> None:
     status = _status_text_basic(students, None, None)
     _show_in_layout(panel, "Attendance Correlation", status_text=status)
 
-def view_outliers(students: List[Dict[str, Any]]) -> None:
+def view_outliers(students: List[Dict[str, Any]], summary: Optional[CourseSummary] = None) -> None:
     console.clear()
-    outliers = find_outliers(students)
+    outliers = summary.outliers if summary is not None else insights_engine.find_outliers(students)
     status = _status_text_basic(students, None, None)
     if outliers:
         table = build_student_table(outliers, title="Outliers (IQR Method)")
@@ -681,8 +834,7 @@ def section_top_bottom_menu(sections: Dict[str, List[Dict[str, Any]]]) -> None:
     else:
         selected = get_bottom_n_students(studs, n)
         title = f"Bottom {n} — {section}"
-    rows = [dict(rank=i + 1, **s) for i, s in enumerate(selected)]
-    paginate_rank_table(rows, base_title=title, page_size=10)
+    paginate_rank_table(selected, base_title=title, page_size=10, rank_key="section_rank")
 
 def section_distribution(sections: Dict[str, List[Dict[str, Any]]], config_path: str) -> None:
     console.clear()
@@ -690,8 +842,11 @@ def section_distribution(sections: Dict[str, List[Dict[str, Any]]], config_path:
     if not section:
         return
     studs = sections.get(section, [])
-    cfg = load_config(config_path)
-    dist = calculate_distribution(studs, cfg["thresholds"]["grade_letters"])
+    if roster_stats is not None:
+        dist = roster_stats.distribution(section)
+    else:
+        cfg = load_config(config_path)
+        dist = calculate_distribution(studs, cfg["thresholds"]["grade_letters"])
     table = build_distribution_table(dist, total=len(studs), title=f"Grade Distribution — {section}")
     status = f"Section: {section}  |  Students: {len(studs)}"
     _show_in_layout(table, f"Distribution — {section}", status_text=status)
@@ -702,14 +857,140 @@ def section_hardest_topic(sections: Dict[str, List[Dict[str, Any]]]) -> None:
     if not section:
         return
     studs = sections.get(section, [])
-    quiz_avgs, quiz_counts, hardest_quiz, lowest = get_quiz_averages(studs)
+    def compute() -> List[Any]:
+        if roster_stats is not None:
+            return roster_stats.quiz_averages(section)
+        return insights_engine.get_quiz_averages(studs)
+    quiz_avgs, quiz_counts, hardest_quiz, lowest = analytics_cache.get_or_compute(
+        "section_hardest_topic", compute, section=section, params=(insights_engine.name,)
+    )
     table = build_hardest_topic_table(quiz_avgs, quiz_counts, hardest_quiz, title=f"Hardest Topic — {section}")
-    status = f"Section: {section}  |  Students: {len(studs)}"
+    status = f"Section: {section}  |  Students: {len(studs)}  |  {_cache_status()}"
     _show_in_layout(table, f"Hardest Topic — {section}", status_text=status)
 
+def view_section_percentiles(sections: Dict[str, List[Dict[str, Any]]]) -> None:
+    console.clear()
+    percentiles = [10, 25, 50, 75, 90]
+    rows = section_percentiles_numpy(sections, percentiles)
+    def make(i_start: int, i_end: int, total_items: int):
+        names = sorted(rows.keys())[i_start:i_end]
+        title = f"Percentiles by Section [{i_start+1}-{i_end}/{total_items}]"
+        return build_percentile_table({n: rows[n] for n in names}, percentiles, title=title)
+    help_text = "Use ←/→ to navigate pages • Press q/Esc/Backspace to return"
+    _paginate_loop_live(make, len(rows), 10, "Percentiles by Section", help_text, f"Sections: {len(sections)}")
+
+def _prompt_correlation_method() -> str:
+    method = prompt_str("Method [pearson/spearman] (default pearson):", "pearson").strip().lower()
+    return method if method in CORRELATION_METHODS else "pearson"
+
+def view_section_distributions(sections: Dict[str, List[Dict[str, Any]]], config_path: str) -> None:
+    console.clear()
+    thresholds = load_config(config_path)["thresholds"]["grade_letters"]
+    # One grouped bincount covers every section
+    rows = analytics_cache.get_or_compute(
+        "section_distributions", lambda: section_distributions(sections, thresholds),
+        params=tuple(sorted(thresholds.items())),
+    )
+    names = sorted(rows.keys())
+    def make(i_start: int, i_end: int, total_items: int):
+        title = f"Letter Distribution by Section [{i_start+1}-{i_end}/{total_items}]"
+        return build_section_distribution_table({n: rows[n] for n in names[i_start:i_end]}, title=title)
+    help_text = "Use ←/→ to navigate pages • Press q/Esc/Backspace to return"
+    _paginate_loop_live(make, len(names), 10, "Letter Distribution by Section", help_text, f"Sections: {len(sections)}")
+
+def view_profile_clusters(students: List[Dict[str, Any]], config_path: str, section: Optional[str] = None) -> None:
+    console.clear()
+    settings = clustering_settings(load_config(config_path))
+    settings["k"] = prompt_int(f"Number of profiles k (default {settings['k']}):", settings["k"], 1, 12)
+    scope = section or "All Students"
+    result = analytics_cache.get_or_compute(
+        "profile_clusters", lambda: cluster_students(students, observed=_observed_rows(students), **settings),
+        section=section, params=tuple(sorted(settings.items())),
+    )
+    status = f"{scope}  |  Students: {len(students)}  |  k: {result.k}  |  Batches: {result.n_iter}  |  Seed: {settings['seed']}"
+    table = build_cluster_table(result.summary(), title=f"Performance Profiles — {scope} (mini-batch k-means)")
+    _show_in_layout(table, "Performance Profiles", status_text=status)
+
+def view_section_outliers(students: List[Dict[str, Any]], sections: Dict[str, List[Dict[str, Any]]]) -> None:
+    console.clear()
+    method = prompt_str(f"Method [{'/'.join(OUTLIER_METHODS)}] (default iqr):", "iqr").strip().lower()
+    method = method if method in OUTLIER_METHODS else "iqr"
+    key = prompt_str(f"Column ({', '.join(NUMERIC_KEYS)}) (default weighted_grade):", "weighted_grade").strip()
+    key = key if key in NUMERIC_KEYS else "weighted_grade"
+    threshold = prompt_float(f"Threshold (default {OUTLIER_THRESHOLDS[method]}):", float(OUTLIER_THRESHOLDS[method]), 0.1, 10.0)
+    # Fences for every section come from one grouped pass over the column
+    result = analytics_cache.get_or_compute(
+        "grouped_outliers", lambda: grouped_outliers(
+            students, key=key, method=method, threshold=threshold, observed=_observed_rows(students)
+        ),
+        params=(key, method, threshold),
+    )
+    # Section order, most extreme first (NaN scores, from a zero IQR, last)
+    rows = sorted(result.rows(students), key=lambda r: (str(r.get("section", "")), -(r["outlier_score"] if r["outlier_score"] == r["outlier_score"] else 0.0)))
+    base_title = f"Outliers by Section — {key} ({method}, {threshold:g})"
+    status = f"Flagged: {len(rows)}  |  Sections: {len(sections)}  |  Students: {len(students)}"
+    if not rows:
+        _show_in_layout(Panel(Text.from_markup("[warn]No outliers detected.[/warn]"), border_style="cyan"), base_title, status_text=status)
+        return
+    def make(i_start: int, i_end: int, total_items: int):
+        title = f"{base_title} [{i_start+1}-{i_end}/{total_items}]"
+        return build_outlier_table(rows[i_start:i_end], key, title=title)
+    help_text = "Use ←/→ to navigate pages • Press q/Esc/Backspace to return"
+    _paginate_loop_live(make, len(rows), 10, base_title, help_text, status)
+
+def view_section_overview(sections: Dict[str, List[Dict[str, Any]]], config_path: str) -> None:
+    console.clear()
+    cfg = load_config(config_path)
+    thresholds = cfg["thresholds"]["grade_letters"]
+    settings = parallel_settings(cfg)
+    # Every section in one run; large rosters are split across worker processes
+    results = analytics_cache.get_or_compute(
+        "section_overview",
+        lambda: run_section_analytics(sections, thresholds, analytics=("top_bottom", "distribution", "hardest_topic"), n=1, **settings),
+        params=tuple(sorted(thresholds.items())),
+    )
+    names = sorted(results.keys())
+    def make(i_start: int, i_end: int, total_items: int):
+        title = f"Section Overview [{i_start+1}-{i_end}/{total_items}]"
+        return build_section_overview_table({n: results[n] for n in names[i_start:i_end]}, title=title)
+    help_text = "Use ←/→ to navigate pages • Press q/Esc/Backspace to return"
+    _paginate_loop_live(make, len(names), 10, "Section Overview", help_text, f"Sections: {len(sections)}  |  {_cache_status()}")
+
+def view_correlation_matrix(students: List[Dict[str, Any]]) -> None:
+    console.clear()
+    method = _prompt_correlation_method()
+    corr = analytics_cache.get_or_compute(
+        "correlation_matrix",
+        lambda: correlation_matrix(students, method=method, observed=_observed_rows(students)),
+        params=(method,),
+    )
+    table = build_correlation_table(corr.keys, corr.values, title=f"{method.title()} Correlation (Overall)")
+    status = f"Students: {len(students)}  |  {_cache_status()}"
+    _show_in_layout(table, "Correlation Matrix", status_text=status)
+
+def view_section_correlations(sections: Dict[str, List[Dict[str, Any]]]) -> None:
+    console.clear()
+    method = _prompt_correlation_method()
+    # Every section's matrix comes from one batched computation; pages just index into it
+    matrices = analytics_cache.get_or_compute(
+        "section_correlation_matrices",
+        lambda: section_correlation_matrices(
+            sections, method=method, observed={name: _observed_rows(studs) for name, studs in sections.items()}
+        ),
+        params=(method,),
+    )
+    names = sorted(matrices.keys())
+    def make(i_start: int, i_end: int, total_items: int):
+        name = names[i_start]
+        corr = matrices[name]
+        title = f"{method.title()} Correlation — {name} [{i_start+1}/{total_items}]"
+        return build_correlation_table(corr.keys, corr.values, title=title)
+    help_text = "Use ←/→ to switch sections • Press q/Esc/Backspace to return"
+    _paginate_loop_live(make, len(names), 1, "Correlation by Section", help_text, f"Sections: {len(sections)}")
+
 def view_quiz_comparison(sections: Dict[str, List[Dict[str, Any]]]) -> None:
     console.clear()
-    avg_by_section, quiz_keys, lowest_per_quiz = get_sections_quiz_averages(sections)
+    avg_by_section, quiz_keys, lowest_per_quiz = insights_engine.get_sections_quiz_averages(sections)
     table = build_quiz_comparison_table(avg_by_section, quiz_keys, lowest_per_quiz, title="Quiz Averages Comparison")
     status = f"Sections: {len(sections)}"
     _show_in_layout(table, "Quiz Averages Comparison", status_text=status)
@@ -720,7 +1001,7 @@ def section_improvement_insights(sections: Dict[str, List[Dict[str, Any]]]) -> N
     if not section:
         return
     studs = sections.get(section, [])
-    result = track_midterm_to_final_improvement(studs)
+    result = insights_engine.track_midterm_to_final_improvement(studs)
     lines: List[str] = [f"[bold]Improvement Analysis — {section}[/bold]"]
     if result["total_students"] == 0:
         lines.append("[bad]No midterm and final exam data available to analyze.[/bad]")
@@ -751,7 +1032,7 @@ def section_attendance_correlation(sections: Dict[str, List[Dict[str, Any]]]) ->
         return
     studs = sections.get(section, [])
     threshold = prompt_float("Attendance threshold % (default 80):", 80.0, 0.0, 100.0)
-    res = correlate_attendance_and_grades(studs, threshold=float(threshold))
+    res = insights_engine.correlate_attendance_and_grades(studs, threshold=float(threshold))
     lines: List[str] = [f"[bold]Attendance-Grade Correlation — {section}[/bold]"]
     if res["low_count"] == 0 and res["high_count"] == 0:
         lines.append("[bad]No attendance data available to analyze.[/bad]")
@@ -779,7 +1060,9 @@ def section_attendance_correlation(sections: Dict[str, List[Dict[str, Any]]]) ->
 
 def view_compare_sections_insights(sections: Dict[str, List[Dict[str, Any]]]) -> None:
     console.clear()
-    res = compare_sections(sections)
+    res = analytics_cache.get_or_compute(
+        "view_compare_sections_insights", lambda: insights_engine.compare_sections(sections), params=(insights_engine.name,)
+    )
     lines: List[str] = ["[bold]Compare Sections — Text Insights[/bold]"]
     if not res.get("insights"):
         lines.append("[bad]No insights available.[/bad]")
@@ -787,7 +1070,7 @@ def view_compare_sections_insights(sections: Dict[str, List[Dict[str, Any]]]) ->
         for line in res["insights"]:
             lines.append(f"- {line}")
     panel = Panel(Text.from_markup("\n".join(lines)), border_style="cyan")
-    status = f"Sections: {len(sections)}"
+    status = f"Sections: {len(sections)}  |  {_cache_status()}"
     _show_in_layout(panel, "Compare Sections", status_text=status)
 
 # =====================================
@@ -800,15 +1083,19 @@ def _prompt_student_fields(existing: Optional[Dict[str, Any]] = None, preselecte
     middle_name = prompt_str(f"Middle Name ({existing.get('middle_name','')}):", existing.get("middle_name", "") or "")
     last_name = prompt_str(f"Last Name ({existing.get('last_name','')}):", existing.get("last_name", "") or "")
     section = preselected_section if preselected_section else prompt_str(f"Section ({existing.get('section','')}):", existing.get("section", "") or "")
-    # Scores
-    q1 = prompt_int(f"Quiz1 ({existing.get('quiz1','')}):", int(existing.get("quiz1", 0)))
-    q2 = prompt_int(f"Quiz2 ({existing.get('quiz2','')}):", int(existing.get("quiz2", 0)))
-    q3 = prompt_int(f"Quiz3 ({existing.get('quiz3','')}):", int(existing.get("quiz3", 0)))
-    q4 = prompt_int(f"Quiz4 ({existing.get('quiz4','')}):", int(existing.get("quiz4", 0)))
-    q5 = prompt_int(f"Quiz5 ({existing.get('quiz5','')}):", int(existing.get("quiz5", 0)))
-    midterm = prompt_int(f"Midterm ({existing.get('midterm','')}):", int(existing.get("midterm", 0)))
-    final = prompt_int(f"Final ({existing.get('final','')}):", int(existing.get("final", 0)))
-    attendance = prompt_float(f"Attendance % ({existing.get('attendance_percent','')}):", float(existing.get("attendance_percent", 0.0)))
+    # Scores; a blank answer keeps the current value, and with none on record
+    # the score stays missing (None), as an empty CSV cell would
+    def current(key: str, cast: Callable[[Any], Any]) -> Any:
+        value = existing.get(key)
+        return None if value is None else cast(value)
+    q1 = prompt_int(f"Quiz1 ({existing.get('quiz1','')}):", current("quiz1", int))
+    q2 = prompt_int(f"Quiz2 ({existing.get('quiz2','')}):", current("quiz2", int))
+    q3 = prompt_int(f"Quiz3 ({existing.get('quiz3','')}):", current("quiz3", int))
+    q4 = prompt_int(f"Quiz4 ({existing.get('quiz4','')}):", current("quiz4", int))
+    q5 = prompt_int(f"Quiz5 ({existing.get('quiz5','')}):", current("quiz5", int))
+    midterm = prompt_int(f"Midterm ({existing.get('midterm','')}):", current("midterm", int))
+    final = prompt_int(f"Final ({existing.get('final','')}):", current("final", int))
+    attendance = prompt_float(f"Attendance % ({existing.get('attendance_percent','')}):", current("attendance_percent", float))
     return {
         "student_id": student_id,
         "first_name": first_name,
@@ -839,8 +1126,8 @@ def _replace_in_students_list(students: List[Dict[str, Any]], updated: Dict[str,
 def add_student_to_section(students: List[Dict[str, Any]], sections: Dict[str, List[Dict[str, Any]]], section: str, config_path: str) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
     cfg = load_config(config_path)
     base = _prompt_student_fields(preselected_section=section)
-    base = compute_weighted_grades([base], cfg["grade_weights"])[0]
-    core_insert_student(sections, base)
+    base = _grade_entered(base, cfg["grade_weights"])
+    core_insert_student(sections, base, running=roster_stats)
     students.append(base)
     _show_in_layout(Panel(Text.from_markup(f"[good]Inserted {base.get('first_name','')} {base.get('last_name','')} into {section}[/good]"), border_style="green"),
                     "Insert Student", status_text=f"Section: {section}")
@@ -855,13 +1142,18 @@ def edit_student_in_section(students: List[Dict[str, Any]], sections: Dict[str,
     if not target:
         _show_in_layout(Panel(Text.from_markup(f"[bad]No student with ID {sid} in {section}[/bad]"), border_style="red"), "Edit Student", status_text=f"Section: {section}")
         return students, sections
-    updated = _prompt_student_fields(existing=target, preselected_section=section)
-    updated = compute_weighted_grades([updated], cfg["grade_weights"])[0]
+    # Defaults come from the scores as recorded, not the zero-filled graded copy
+    updated = _prompt_student_fields(existing=_observed_rows([target])[0], preselected_section=section)
+    updated = _grade_entered(updated, cfg["grade_weights"])
+    _raw_rows.pop(id(target), None)
     # Update in sections list
     for i, s in enumerate(sections[section]):
         if str(s.get("student_id","")) == sid:
             sections[section][i] = updated
             break
+    if roster_stats is not None:
+        roster_stats.replace(target, updated)
+    bump_roster_version()
     # Update in global students list
     students = _replace_in_students_list(students, updated)
     _show_in_layout(Panel(Text.from_markup(f"[good]Updated {updated.get('first_name','')} {updated.get('last_name','')}[/good]"), border_style="green"),
@@ -880,7 +1172,7 @@ def delete_student_in_section(students: List[Dict[str, Any]], sections: Dict[str
     if confirm != "y":
         _show_in_layout(Panel(Text.from_markup("[warn]Cancelled.[/warn]"), border_style="yellow"), "Delete Student", status_text=f"Section: {section}")
         return students, sections
-    if core_delete_student(sections, sid):
+    if core_delete_student(sections, sid, running=roster_stats):
         students = [s for s in students if str(s.get("student_id","")) != sid]
         _show_in_layout(Panel(Text.from_markup(f"[good]Deleted {sid}[/good]"), border_style="green"), "Delete Student", status_text=f"Section: {section}")
     else:
@@ -977,9 +1269,31 @@ def lookup_by_last_name(students: List[Dict[str, Any]]) -> None:
 # =====================================
 # Plotting Functions
 # =====================================
-def plot_overall_histograms(students: List[Dict[str, Any]]) -> None:
-    console.clear()
-    console.print("[bold cyan]Select histogram type:[/bold cyan]")
+# menu choice -> (columns, overall plot title, section plot title)
+_HISTOGRAM_SETS = {
+    "1": (["weighted_grade"], "Overall Weighted Grade Distribution", "Weighted Grade Distribution"),
+    "2": (["quiz1", "quiz2", "quiz3", "quiz4", "quiz5"], "Quiz Scores Distribution", "Quiz Scores Distribution"),
+    "3": (["midterm", "final"], "Midterm vs Final Exam Distribution", "Midterm vs Final"),
+    "4": (["attendance_percent"], "Attendance Distribution", "Attendance Distribution"),
+    "5": (["quiz1", "quiz2", "quiz3", "quiz4", "quiz5", "midterm", "final", "weighted_grade"],
+          "All Scores including Weighted Grade", "All Scores"),
+}
+
+def _plot_histogram_set(students: List[Dict[str, Any]], keys: List[str], title: str, section: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    # Counts come from the shared histogram cache; the plot only draws bars
+    hists = histogram_service.get_many(students, keys, section=section)
+    if len(keys) == 1:
+        return plot_grade_histogram(students, keys[0], title, histogram=hists[keys[0]]), hists
+    return plot_combined_histogram(students, keys, title, histograms=hists), hists
+
+def _histogram_result(file_path: str, hists: Dict[str, Any], display_msg: str) -> Any:
+    msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
+    if len(hists) != 1:
+        return msg
+    (key, hist), = hists.items()
+    return Group(build_histogram_table(hist, title=key.replace("_", " ").capitalize()), msg)
+
+def _histogram_menu(students: List[Dict[str, Any]], title: str, status: str, section: Optional[str] = None) -> None:
     options = {
         "1": "Weighted Grade Distribution",
         "2": "Quiz Scores Distribution",
@@ -989,121 +1303,39 @@ def plot_overall_histograms(students: List[Dict[str, Any]]) -> None:
         "6": "Generate All Plots",
         "7": "Back"
     }
-    choice = arrow_menu("Overall Histograms", options, level=3, status_text=f"Students: {len(students)}")
-    
+    choice = arrow_menu(title, options, level=3, status_text=status)
+
     has_display = _is_display_available()
     display_msg = " (and displayed)" if has_display else ""
-    
-    if choice == "1":
-        file_path = plot_grade_histogram(students, "weighted_grade", "Overall Weighted Grade Distribution")
-        msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
-        _show_in_layout(msg, "Weighted Grade Distribution", status_text=f"Students: {len(students)}")
-    elif choice == "2":
-        file_path = plot_combined_histogram(students, ["quiz1", "quiz2", "quiz3", "quiz4", "quiz5"], "Quiz Scores Distribution")
-        msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
-        _show_in_layout(msg, "Quiz Scores Distribution", status_text=f"Students: {len(students)}")
-    elif choice == "3":
-        file_path = plot_combined_histogram(students, ["midterm", "final"], "Midterm vs Final Exam Distribution")
-        msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
-        _show_in_layout(msg, "Midterm vs Final", status_text=f"Students: {len(students)}")
-    elif choice == "4":
-        file_path = plot_grade_histogram(students, "attendance_percent", "Attendance Distribution")
-        msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
-        _show_in_layout(msg, "Attendance Distribution", status_text=f"Students: {len(students)}")
-    elif choice == "5":
-        file_path = plot_combined_histogram(
-            students,
-            ["quiz1", "quiz2", "quiz3", "quiz4", "quiz5", "midterm", "final", "weighted_grade"],
-            "All Scores including Weighted Grade"
-        )
-        msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
-        _show_in_layout(msg, "All Scores Combined", status_text=f"Students: {len(students)}")
+    def plot_title(choice_key: str) -> str:
+        _, overall, per_section = _HISTOGRAM_SETS[choice_key]
+        return f"{per_section} - {section}" if section else overall
+
+    if choice in _HISTOGRAM_SETS:
+        file_path, hists = _plot_histogram_set(students, _HISTOGRAM_SETS[choice][0], plot_title(choice), section)
+        _show_in_layout(_histogram_result(file_path, hists, display_msg), plot_title(choice), status_text=status)
     elif choice == "6":
         console.print("[bold yellow]Generating all plots...[/bold yellow]")
-        f1 = plot_grade_histogram(students, "weighted_grade", "Overall Weighted Grade Distribution")
-        f2 = plot_combined_histogram(students, ["quiz1", "quiz2", "quiz3", "quiz4", "quiz5"], "Quiz Scores Distribution")
-        f3 = plot_combined_histogram(students, ["midterm", "final"], "Midterm vs Final Exam Distribution")
-        f4 = plot_grade_histogram(students, "attendance_percent", "Attendance Distribution")
-        f5 = plot_combined_histogram(
-            students,
-            ["quiz1", "quiz2", "quiz3", "quiz4", "quiz5", "midterm", "final", "weighted_grade"],
-            "All Scores including Weighted Grade"
-        )
-        lines = [
-            f"[good]Saved:[/good] {f1}",
-            f"[good]Saved:[/good] {f2}",
-            f"[good]Saved:[/good] {f3}",
-            f"[good]Saved:[/good] {f4}",
-            f"[good]Saved:[/good] {f5}",
-        ]
+        lines = []
+        for key, (keys, _, _) in _HISTOGRAM_SETS.items():
+            file_path, _ = _plot_histogram_set(students, keys, plot_title(key), section)
+            lines.append(f"[good]Saved:[/good] {file_path}")
         if has_display:
             lines.append("[good]All plots displayed (if GUI available).[/good]")
         panel = Panel(Text.from_markup("\n".join(lines)), border_style="cyan")
-        _show_in_layout(panel, "Generated All Plots", status_text=f"Students: {len(students)}")
+        _show_in_layout(panel, f"Generated All Plots — {section}" if section else "Generated All Plots", status_text=status)
+
+def plot_overall_histograms(students: List[Dict[str, Any]]) -> None:
+    console.clear()
+    _histogram_menu(students, "Overall Histograms", f"Students: {len(students)}")
 
 def plot_section_histograms(sections: Dict[str, List[Dict[str, Any]]]) -> None:
     console.clear()
     section = _select_section(sections)
     if not section:
         return
-    
     studs = sections[section]
-    console.print(f"[bold cyan]Select histogram for {section}:[/bold cyan]")
-    options = {
-        "1": "Weighted Grade Distribution",
-        "2": "Quiz Scores Distribution",
-        "3": "Midterm vs Final",
-        "4": "Attendance Distribution",
-        "5": "All Scores Combined",
-        "6": "Generate All Plots",
-        "7": "Back"
-    }
-    choice = arrow_menu(f"Section Histograms - {section}", options, level=3, status_text=f"Section: {section}  |  Students: {len(studs)}")
-    
-    has_display = _is_display_available()
-    display_msg = " (and displayed)" if has_display else ""
-    
-    if choice == "1":
-        file_path = plot_grade_histogram(studs, "weighted_grade", f"Weighted Grade Distribution - {section}")
-        msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
-        _show_in_layout(msg, f"Weighted Grade — {section}", status_text=f"Section: {section}")
-    elif choice == "2":
-        file_path = plot_combined_histogram(studs, ["quiz1", "quiz2", "quiz3", "quiz4", "quiz5"], f"Quiz Scores Distribution - {section}")
-        msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
-        _show_in_layout(msg, f"Quiz Scores — {section}", status_text=f"Section: {section}")
-    elif choice == "3":
-        file_path = plot_combined_histogram(studs, ["midterm", "final"], f"Midterm vs Final - {section}")
-        msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
-        _show_in_layout(msg, f"Midterm vs Final — {section}", status_text=f"Section: {section}")
-    elif choice == "4":
-        file_path = plot_grade_histogram(studs, "attendance_percent", f"Attendance Distribution - {section}")
-        msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
-        _show_in_layout(msg, f"Attendance — {section}", status_text=f"Section: {section}")
-    elif choice == "5":
-        file_path = plot_combined_histogram(
-            studs,
-            ["quiz1", "quiz2", "quiz3", "quiz4", "quiz5", "midterm", "final", "weighted_grade"],
-            f"All Scores - {section}"
-        )
-        msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
-        _show_in_layout(msg, f"All Scores — {section}", status_text=f"Section: {section}")
-    elif choice == "6":
-        console.print("[bold yellow]Generating all plots...[/bold yellow]")
-        plot_grade_histogram(studs, "weighted_grade", f"Weighted Grade Distribution - {section}")
-        plot_combined_histogram(studs, ["quiz1", "quiz2", "quiz3", "quiz4", "quiz5"], f"Quiz Scores Distribution - {section}")
-        plot_combined_histogram(studs, ["midterm", "final"], f"Midterm vs Final - {section}")
-        plot_grade_histogram(studs, "attendance_percent", f"Attendance Distribution - {section}")
-        plot_combined_histogram(
-            studs,
-            ["quiz1", "quiz2", "quiz3", "quiz4", "quiz5", "midterm", "final", "weighted_grade"],
-            f"All Scores - {section}"
-        )
-        lines = [
-            "[good]All plots saved to output/plots/[/good]",
-            ("[good]Displayed as well.[/good]" if has_display else "[warn]No display detected; files saved only.[/warn]"),
-        ]
-        panel = Panel(Text.from_markup("\n".join(lines)), border_style="cyan")
-        _show_in_layout(panel, f"Generated All Plots — {section}", status_text=f"Section: {section}")
+    _histogram_menu(studs, f"Section Histograms - {section}", f"Section: {section}  |  Students: {len(studs)}", section=section)
 
 def plot_custom_histogram(students: List[Dict[str, Any]]) -> None:
     console.clear()
@@ -1119,9 +1351,122 @@ def plot_custom_histogram(students: List[Dict[str, Any]]) -> None:
     has_display = _is_display_available()
     display_msg = " (and displayed)" if has_display else ""
     
-    file_path = plot_grade_histogram(students, key)
+    bins = prompt_int("Number of bins (default 10):", 10, 1, 100)
+    hist = histogram_service.get(students, key, bins=bins)
+    file_path = plot_grade_histogram(students, key, histogram=hist)
     msg = Panel(Text.from_markup(f"[good]Plot saved to: {file_path}{display_msg}[/good]"), border_style="cyan")
-    _show_in_layout(msg, f"Custom Histogram — {key}", status_text=f"Students: {len(students)}")
+    renderable = Group(build_histogram_table(hist, title=f"{key} ({bins} bins)"), msg)
+    _show_in_layout(renderable, f"Custom Histogram — {key}", status_text=f"Students: {len(students)}")
+
+# =====================================
+# Roster Snapshots
+# =====================================
+def _snapshot_dir(cfg: Dict[str, Any]) -> str:
+    paths = cfg.get("file_paths", {})
+    return paths.get("snapshot_dir") or os.path.join(paths.get("output_dir", "output/"), "snapshots")
+
+def save_roster_snapshot(students: List[Dict[str, Any]], config_path: str) -> None:
+    console.clear()
+    cfg = load_config(config_path)
+    label = prompt_str("Snapshot label (optional):", "")
+    path = save_snapshot(students, _snapshot_dir(cfg), cfg["thresholds"]["grade_letters"], label=label)
+    msg = Panel(Text.from_markup(f"[good]Saved {len(students)} students to {path}[/good]"), border_style="green")
+    _show_in_layout(msg, "Roster Snapshot", status_text=f"Students: {len(students)}")
+
+def _select_snapshot(snapshots: List[Dict[str, Any]], title: str, include_current: bool = False) -> Optional[str]:
+    options: Dict[str, str] = {}
+    paths: Dict[str, str] = {}
+    if include_current:
+        options["0"] = "Current Roster (in memory)"
+        paths["0"] = ""
+    for meta in reversed(snapshots):
+        key = str(meta["version"])
+        label = f" — {meta['label']}" if meta.get("label") else ""
+        options[key] = f"v{meta['version']} • {meta['created']} • {meta['count']} students{label}"
+        paths[key] = meta["path"]
+    options["b"] = "Back"
+    choice = arrow_menu(title, options, level=3, status_text=f"Snapshots: {len(snapshots)}")
+    if choice == "b":
+        return None
+    return paths.get(choice)
+
+def view_snapshot_diff(students: List[Dict[str, Any]], config_path: str) -> None:
+    console.clear()
+    cfg = load_config(config_path)
+    thresholds = cfg["thresholds"]["grade_letters"]
+    snapshots = list_snapshots(_snapshot_dir(cfg))
+    if not snapshots:
+        _show_in_layout(Panel(Text.from_markup("[warn]No snapshots saved yet.[/warn]"), border_style="yellow"), "Roster Diff")
+        return
+    base_path = _select_snapshot(snapshots, "Diff — Base Snapshot")
+    if base_path is None:
+        return
+    target_path = _select_snapshot(snapshots, "Diff — Compare Against", include_current=True)
+    if target_path is None:
+        return
+    old = load_snapshot(base_path)
+    new = load_snapshot(target_path) if target_path else snapshot_from_students(students, thresholds)
+    diff = diff_snapshots(old, new)
+    new_name = f"v{new.version}" if target_path else "current"
+    status = (f"Added: {len(diff.added_ids)}  |  Removed: {len(diff.removed_ids)}  |  "
+              f"Changed: {len(diff.changed)}  |  Letter changes: {diff.letter_changes}  |  Unchanged: {diff.unchanged_count}")
+    base_title = f"Roster Diff v{old.version} → {new_name}"
+    if diff.changed:
+        def make(i_start: int, i_end: int, total_items: int):
+            title = f"{base_title} [{i_start+1}-{i_end}/{total_items}]"
+            return build_diff_table(diff.changed[i_start:i_end], title=title)
+        _paginate_loop_live(make, len(diff.changed), 10, base_title,
+                            "Use ←/→ to navigate pages • Press q/Esc/Backspace to return", status)
+    else:
+        _show_in_layout(Panel(Text.from_markup("[good]No score changes between runs.[/good]"), border_style="green"),
+                        base_title, status_text=status)
+    if diff.changed or diff.added_ids or diff.removed_ids:
+        if prompt_str("Export diff to CSV? [y/N]:", "N").strip().lower() == "y":
+            out_dir = cfg["file_paths"]["output_dir"]
+            os.makedirs(out_dir, exist_ok=True)
+            export_to_csv(diff_to_rows(diff), os.path.join(out_dir, f"roster_diff_v{old.version}_{new_name}.csv"))
+            input("Press Enter to return...")
+
+# =====================================
+# Multi-term Cohorts
+# =====================================
+def view_cohort_comparison(config_path: str) -> None:
+    console.clear()
+    cfg = load_config(config_path)
+    cohort_cfg = cfg.get("cohort", {})
+    default = ", ".join(cohort_cfg.get("term_files", []))
+    raw = prompt_str(f"Term CSV files or glob patterns, comma-separated ({default or 'none configured'}):", default)
+    paths = expand_term_paths([p.strip() for p in raw.split(",") if p.strip()])
+    if not paths:
+        _show_in_layout(Panel(Text.from_markup("[warn]No term files matched.[/warn]"), border_style="yellow"), "Cohort Comparison")
+        return
+    # Unchanged files come straight from the summary cache; the rest are read in parallel
+    cohort = load_cohort(paths, cfg, cache_path=cohort_cache_path(cfg), max_workers=cohort_cfg.get("max_workers"))
+    term_names = [t.term for t in cohort.terms]
+    outlier_counts: Dict[str, int] = {}
+
+    def percentile_page():
+        # Streams every term file once against the merged fences, on first view only
+        if not outlier_counts:
+            outlier_counts.update({t: len(o) for t, o in find_cohort_outliers(cohort, cfg).items()})
+        return build_cohort_percentile_table(cohort.percentiles(), outlier_counts)
+
+    pages = [
+        lambda: build_cohort_trend_table(cohort.terms, title="Course Trends by Term"),
+        lambda: build_section_trend_table(cohort.section_trend("section_averages"), term_names, title="Section Averages by Term"),
+        lambda: build_section_trend_table(cohort.section_trend("section_at_risk_rates"), term_names,
+                                          title="Section At-Risk Rate by Term", suffix="%"),
+        percentile_page,
+    ]
+    def make(i_start: int, i_end: int, total_items: int):
+        return pages[i_start]()
+    status = f"Terms: {len(cohort.terms)}  |  From cache: {cohort.cached}  |  Re-read: {cohort.computed}"
+    _paginate_loop_live(make, len(pages), 1, "Cohort Comparison",
+                        "Use ←/→ to switch views • Press q/Esc/Backspace to return", status)
+    if len(cohort.terms) > 1 and prompt_str("Save trend plot? [y/N]:", "N").strip().lower() == "y":
+        file_path = plot_cohort_trends(cohort.terms)
+        console.print(f"[good]Plot saved to: {file_path}[/good]")
+        input("Press Enter to return...")
 
 # =====================================
 # Submenus
@@ -1138,33 +1483,53 @@ def course_dashboard(students: List[Dict[str, Any]], sections: Dict[str, List[Di
         "1.h": "Attendance-Grade Correlation (Overall)",
         "1.j": "Percentiles (Overall)",
         "1.k": "Outliers (Overall)",
+        "1.l": "Correlation Matrix (Overall)",
+        "1.m": "What-if Weight Scenarios",
+        "1.n": "Final Exam Predictor (Least Squares)",
+        "1.o": "Performance Profiles (k-means)",
         "1.i": "Back"
     }
+    # The roster does not change inside this menu, so one summary serves every view
+    summary: Optional[CourseSummary] = None
+    def get_summary() -> CourseSummary:
+        nonlocal summary
+        if summary is None:
+            summary = summarize(students, load_config(config_path))
+        return summary
     while True:
         status = _status_text_basic(students, sections, config_path)
         choice = arrow_menu("Course Dashboard", options, level=2, status_text=status)
+        _ensure_ranks(students)
         if choice == "1.i":
             break
         elif choice == "1.a":
-            view_overall_roster(students)
+            view_overall_roster(students, config_path)
         elif choice == "1.b":
-            view_overall_distribution(students, config_path)
+            view_overall_distribution(students, config_path, get_summary())
         elif choice == "1.c":
-            view_section_summary(sections)
+            view_section_summary(sections, config_path)
         elif choice == "1.d":
             view_overall_ranking(students)
         elif choice == "1.e":
-            view_curve_preview(students)
+            view_curve_preview(students, config_path)
         elif choice == "1.f":
             plot_overall_histograms(students)
         elif choice == "1.g":
-            view_improvement_insights(students)
+            view_improvement_insights(students, get_summary(), _final_model(students))
         elif choice == "1.h":
-            view_attendance_correlation_overall(students)
+            view_attendance_correlation_overall(students, get_summary())
         elif choice == "1.j":
-            view_percentiles(students)
+            view_percentiles(students, get_summary())
         elif choice == "1.k":
-            view_outliers(students)
+            view_outliers(students, get_summary())
+        elif choice == "1.l":
+            view_correlation_matrix(students)
+        elif choice == "1.m":
+            view_weight_scenarios(students, config_path)
+        elif choice == "1.n":
+            view_final_predictor(students, config_path)
+        elif choice == "1.o":
+            view_profile_clusters(students, config_path)
     return students, sections, config_path
 
 def section_analytics(students: List[Dict[str, Any]], sections: Dict[str, List[Dict[str, Any]]], config_path: str) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]], str]:
@@ -1180,11 +1545,18 @@ def section_analytics(students: List[Dict[str, Any]], sections: Dict[str, List[D
         "2.i": "Section Attendance Correlation",
         "2.j": "Section Histograms",
         "2.k": "Manage Section (CRUD)",
+        "2.m": "Percentiles by Section",
+        "2.n": "Correlation Matrix by Section",
+        "2.o": "Letter Distribution (All Sections)",
+        "2.p": "Section Overview (All Sections)",
+        "2.q": "Outliers by Section (IQR / z-score / MAD)",
+        "2.r": "Performance Profiles (k-means) in Section",
         "2.l": "Back"
     }
     while True:
         status = _status_text_basic(students, sections, config_path)
         choice = arrow_menu("Section Analytics", options, level=2, status_text=status)
+        _ensure_ranks(students)
         if choice == "2.l":
             break
         elif choice == "2.a":
@@ -1209,25 +1581,162 @@ def section_analytics(students: List[Dict[str, Any]], sections: Dict[str, List[D
             plot_section_histograms(sections)
         elif choice == "2.k":
             students, sections, config_path = section_manage_crud(students, sections, config_path)
+        elif choice == "2.m":
+            view_section_percentiles(sections)
+        elif choice == "2.n":
+            view_section_correlations(sections)
+        elif choice == "2.o":
+            view_section_distributions(sections, config_path)
+        elif choice == "2.p":
+            view_section_overview(sections, config_path)
+        elif choice == "2.q":
+            view_section_outliers(students, sections)
+        elif choice == "2.r":
+            section = _select_section(sections)
+            if section:
+                view_profile_clusters(sections.get(section, []), config_path, section)
     return students, sections, config_path
 
+def _final_plan(students: List[Dict[str, Any]], config_path: str) -> FinalPlan:
+    cfg = load_config(config_path)
+    weights, letters = cfg["grade_weights"], cfg["thresholds"]["grade_letters"]
+    return analytics_cache.get_or_compute(
+        "final_plan", lambda: plan_final_scores(students, weights, letters),
+        params=(tuple(sorted(weights.items())), tuple(sorted(letters.items()))),
+    )
+
+def view_final_planner(students: List[Dict[str, Any]], config_path: str) -> None:
+    console.clear()
+    plan = _final_plan(students, config_path)
+    query = prompt_str("Student ID (blank = whole roster):", "").strip().lower()
+    rows = plan.rows(students)
+    if query:
+        rows = [r for r in rows if str(r.get("student_id", "")).lower() == query]
+    base_title = f"Final Exam Planner — final weight {plan.final_weight:.0%}"
+    counts = plan.counts()
+    status = "  |  ".join(
+        f"{letter}: {c['secured']} secured, {c['needed']} reachable, {c['impossible']} out of reach"
+        for letter, c in counts.items()
+    )
+    if not rows:
+        _show_in_layout(Panel(Text.from_markup(f"[warn]No student found with ID {query}[/warn]"), border_style="cyan"), base_title, status_text=status)
+        return
+    def make(i_start: int, i_end: int, total_items: int):
+        title = f"{base_title} [{i_start+1}-{i_end}/{total_items}]"
+        return build_final_plan_table(rows[i_start:i_end], plan.letters, title=title)
+    help_text = "Use ←/→ to navigate pages • Press q/Esc/Backspace to return"
+    _paginate_loop_live(make, len(rows), 10, base_title, help_text, status)
+
+def export_final_planner(students: List[Dict[str, Any]], config_path: str) -> None:
+    cfg = load_config(config_path)
+    out_dir = cfg["file_paths"]["output_dir"]
+    os.makedirs(out_dir, exist_ok=True)
+    plan = _final_plan(students, config_path)
+    export_to_csv(plan.rows(students), os.path.join(out_dir, "final_exam_planner.csv"))
+    console.print(f"[bold green]Final exam planner exported for {len(students)} student(s).[/bold green]")
+    input("Press Enter to return...")
+
+def _grade_entered(row: Dict[str, Any], weights: Dict[str, float]) -> Dict[str, Any]:
+    # Grade a student entered in the CLI, keeping the entered values (missing
+    # scores still None) as its raw row, like the rows loaded from the CSV
+    graded = compute_weighted_grades([row], weights)[0]
+    _raw_rows[id(graded)] = (graded, dict(row))
+    return graded
+
+def _observed_rows(students: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Rows without a raw entry (e.g. from a snapshot) are used as they are
+    out = []
+    for s in students:
+        entry = _raw_rows.get(id(s))
+        out.append(entry[1] if entry is not None and entry[0] is s else s)
+    return out
+
+def view_failure_risk(students: List[Dict[str, Any]], config_path: str) -> None:
+    console.clear()
+    cfg = load_config(config_path)
+    cutoff = float(cfg["thresholds"]["at_risk_cutoff"])
+    settings = risk_settings(cfg)
+    min_pct = prompt_float("Show students with P(fail) above % (default 0):", 0.0, 0.0, 100.0)
+    result = analytics_cache.get_or_compute(
+        "failure_risk",
+        lambda: simulate_failure_risk(students, cfg["grade_weights"], cutoff, observed=_observed_rows(students), **settings),
+        params=(cutoff, tuple(sorted(cfg["grade_weights"].items())), tuple(sorted(settings.items()))),
+    )
+    rows = result.ranked(students, min_pct / 100.0)
+    base_title = f"Failure Risk — P(weighted < {cutoff:g}), {result.n_draws:,} draws"
+    simulated = int(result.missing.any(axis=1).sum())
+    status = f"Listed: {len(rows)}  |  With simulated scores: {simulated}  |  Students: {len(students)}"
+    if not rows:
+        _show_in_layout(Panel(Text.from_markup("[good]No student is at risk of failing.[/good]"), border_style="green"), base_title, status_text=status)
+        return
+    def make(i_start: int, i_end: int, total_items: int):
+        title = f"{base_title} [{i_start+1}-{i_end}/{total_items}]"
+        return build_risk_table(rows[i_start:i_end], title=title, start=i_start)
+    help_text = "Use ←/→ to navigate pages • Press q/Esc/Backspace to return"
+    _paginate_loop_live(make, len(rows), 10, base_title, help_text, status)
+
+def _query_columns(students: List[Dict[str, Any]]) -> RosterColumns:
+    # Scores as read (missing stays missing), weighted_grade from the graded roster
+    def build() -> RosterColumns:
+        cols = build_columns(_observed_rows(students), numeric_keys=SCORE_KEYS, text_keys=TEXT_KEYS)
+        cols.numeric["weighted_grade"] = build_columns(students, numeric_keys=("weighted_grade",), text_keys=()).numeric["weighted_grade"]
+        return cols
+    return analytics_cache.get_or_compute("query_columns", build)
+
+def view_query(students: List[Dict[str, Any]]) -> None:
+    console.clear()
+    console.print(Panel(Text(
+        "Filter with columns, numbers and quoted text, e.g.\n"
+        "  final < midterm - 10 and attendance_percent < 75 and section startswith \"BSIT 2\"\n"
+        "  60 <= weighted_grade < 70 or final is None\n"
+        "Operators: + - * /  == != < <= > >=  in [..]  is None  and or not  startswith endswith contains\n"
+        f"Columns: {', '.join(TEXT_KEYS + NUMERIC_KEYS)}"
+    ), title="Query Students", border_style="cyan"))
+    expression = prompt_str("Filter:", "")
+    if not expression:
+        return
+    start = time.perf_counter()
+    try:
+        # One boolean mask over the cached roster columns
+        matched = filter_indices(expression, _query_columns(students))
+    except ValueError as e:
+        _show_in_layout(Panel(Text(str(e)), border_style="red"), "Query Students", status_text=f"Filter: {escape(expression)}")
+        return
+    elapsed = (time.perf_counter() - start) * 1000
+    rows = [students[i] for i in matched]
+    base_title = f"Query — {escape(expression)}"
+    status = f"Matched: {len(rows)} of {len(students)}  |  {elapsed:.1f} ms"
+    if not rows:
+        _show_in_layout(Panel(Text.from_markup("[warn]No students match this filter.[/warn]"), border_style="cyan"), base_title, status_text=status)
+        return
+    def make(i_start: int, i_end: int, total_items: int):
+        title = f"{base_title} [{i_start+1}-{i_end}/{total_items}]"
+        return build_student_table(rows[i_start:i_end], title=title)
+    help_text = "Use ←/→ to navigate pages • Press q/Esc/Backspace to return"
+    _paginate_loop_live(make, len(rows), 10, base_title, help_text, status)
+
 def student_reports(students: List[Dict[str, Any]], sections: Dict[str, List[Dict[str, Any]]], config_path: str) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]], str]:
     options = {
         "3.a": "View 'At-Risk' Student List",
         "3.b": "Export Section Reports to CSV",
         "3.c": "Export At-Risk per Section to CSV",
         "3.d": "Look Up Individual Student",
+        "3.f": "Final Exam Planner (score needed per letter)",
+        "3.g": "Export Final Exam Planner to CSV",
+        "3.h": "Failure Risk (Monte Carlo)",
+        "3.i": "Query Students (filter expression)",
         "3.e": "Back"
     }
     while True:
         status = _status_text_basic(students, sections, config_path)
         choice = arrow_menu("Student Reports", options, level=2, status_text=status)
+        _ensure_ranks(students)
         if choice == "3.e":
             break
         elif choice == "3.a":
             cfg = load_config(config_path)
             cutoff = cfg["thresholds"]["at_risk_cutoff"]
-            at_risk = get_at_risk_students(students, float(cutoff))
+            at_risk = insights_engine.get_at_risk_students(students, float(cutoff))
             paginate_students_table(at_risk, base_title=f"At-Risk Students (cutoff {cutoff})", page_size=10)
         elif choice == "3.b":
             cfg = load_config(config_path)
@@ -1247,7 +1756,7 @@ def student_reports(students: List[Dict[str, Any]], sections: Dict[str, List[Dic
             for section_name, section_data in sections.items():
                 if not section_data:
                     continue
-                at_risk = get_at_risk_students(section_data, float(cutoff))
+                at_risk = insights_engine.get_at_risk_students(section_data, float(cutoff))
                 if not at_risk:
                     continue
                 export_to_csv(at_risk, os.path.join(out_dir, f"section_{section_name}_at_risk.csv"))
@@ -1259,6 +1768,14 @@ def student_reports(students: List[Dict[str, Any]], sections: Dict[str, List[Dic
             input("Press Enter to return...")
         elif choice == "3.d":
             lookup_student(students)
+        elif choice == "3.f":
+            view_final_planner(students, config_path)
+        elif choice == "3.g":
+            export_final_planner(students, config_path)
+        elif choice == "3.h":
+            view_failure_risk(students, config_path)
+        elif choice == "3.i":
+            view_query(students)
     return students, sections, config_path
 
 def tools_utilities(students: List[Dict[str, Any]], sections: Dict[str, List[Dict[str, Any]]], config_path: str) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]], str]:
@@ -1267,12 +1784,15 @@ def tools_utilities(students: List[Dict[str, Any]], sections: Dict[str, List[Dic
         "4.b": "Insert Demo Student",
         "4.c": "Delete Student by ID",
         "4.d": "Custom Histogram Plot",
-        "4.e": "Back"
+        "4.e": "Save Roster Snapshot",
+        "4.f": "Diff Roster Snapshots",
+        "4.h": "Multi-term Cohort Comparison",
+        "4.g": "Back"
     }
     while True:
         status = _status_text_basic(students, sections, config_path)
         choice = arrow_menu("Tools & Utilities", options, level=2, status_text=status)
-        if choice == "4.e":
+        if choice == "4.g":
             break
         elif choice == "4.a":
             students, sections, config_path = load_or_reload_data(config_path)
@@ -1294,6 +1814,12 @@ def tools_utilities(students: List[Dict[str, Any]], sections: Dict[str, List[Dic
                 input("Press Enter to continue...")
             else:
                 plot_custom_histogram(students)
+        elif choice == "4.e":
+            save_roster_snapshot(students, config_path)
+        elif choice == "4.f":
+            view_snapshot_diff(students, config_path)
+        elif choice == "4.h":
+            view_cohort_comparison(config_path)
     return students, sections, config_path
 
 # =====================================
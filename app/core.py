@@ -9,24 +9,43 @@ This module provides:
 - read_csv_data(filepath, config): Read and validate CSV rows based on config;
   trims strings; coerces numeric fields to floats in the 0–100 range or sets None;
   skips rows with missing required columns.
+- iter_csv_chunks(filepath, config, chunk_size): Same validation as read_csv_data,
+  yielding lists of at most chunk_size rows for streaming ingest.
 - group_students_by_section(students): Build a mapping of section -> list of students.
-- insert_student(sections, student): Insert a student into the proper section.
-- delete_student(sections, student_id): Remove a student by ID from its section.
+- get_roster_version() / bump_roster_version(): Counter bumped by every load and
+  mutation, used to key cached analytics.
+- insert_student(sections, student, running=None): Insert a student into the proper
+  section, updating running statistics when given.
+- delete_student(sections, student_id, running=None): Remove a student by ID from its
+  section, updating running statistics when given.
 - sort_students(students, sort_by, reverse=False): Return a sorted copy of students
   on text fields (e.g., last_name) or numeric fields (e.g., weighted_grade).
 """
 
 import csv
 import json
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from app.analytics.running import RunningStats
+
+# Incremented whenever the roster is (re)loaded or mutated
+_roster_version = 0
+
+def get_roster_version() -> int:
+    return _roster_version
+
+def bump_roster_version() -> int:
+    global _roster_version
+    _roster_version += 1
+    return _roster_version
 
 def load_config(filepath: str) -> Dict[str, Any]:
     """Loads configuration from a JSON file."""
     with open(filepath, 'r') as f:
         return json.load(f)
 
-def read_csv_data(filepath: str, config: Dict[str, Any]) -> List[Dict[str, Any]]:
-    records = []
+def _iter_csv_rows(filepath: str, config: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
     required_columns = config.get("columns", {}).get("required", [])
     numeric_columns = list(config.get("columns", {}).get("numeric", []))
     for _auto_numeric_field in ["midterm", "final", "attendance_percent"]:
@@ -60,9 +79,26 @@ def read_csv_data(filepath: str, config: Dict[str, Any]) -> List[Dict[str, Any]]
                     print(f"Warning: Non-numeric value '{value}' in row {i}, column '{col}'. Setting to None.")
                     row[col] = None
             
-            records.append(row)
+            yield row
+
+def read_csv_data(filepath: str, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    records = list(_iter_csv_rows(filepath, config))
+    bump_roster_version()
     return records
 
+def iter_csv_chunks(
+    filepath: str, config: Dict[str, Any], chunk_size: int = 50_000
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield validated rows in lists of at most chunk_size, for streaming ingest."""
+    chunk: List[Dict[str, Any]] = []
+    for row in _iter_csv_rows(filepath, config):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
 # "Helper" function to para gumawa ng dictionary na may section as key and list of students as value
 def group_students_by_section(students: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
     """Groups a list of students by their section."""
@@ -77,17 +113,24 @@ def group_students_by_section(students: List[Dict[str, Any]]) -> Dict[str, List[
 
 
 def insert_student(
-    sections: Dict[str, List[Dict[str, Any]]], student: Dict[str, Any]
+    sections: Dict[str, List[Dict[str, Any]]],
+    student: Dict[str, Any],
+    running: Optional["RunningStats"] = None,
 ) -> None:
     section = student.get("section")
     if section:
         if section not in sections:
             sections[section] = []
         sections[section].append(student)
+        bump_roster_version()
+        if running is not None:
+            running.add(student)
 
 
 def delete_student(
-    sections: Dict[str, List[Dict[str, Any]]], student_id: str
+    sections: Dict[str, List[Dict[str, Any]]],
+    student_id: str,
+    running: Optional["RunningStats"] = None,
 ) -> bool:
     for section_list in sections.values():
         student_to_remove_index = -1
@@ -96,7 +139,10 @@ def delete_student(
                 student_to_remove_index = i
                 break
         if student_to_remove_index != -1:
-            del section_list[student_to_remove_index]
+            removed = section_list.pop(student_to_remove_index)
+            bump_roster_version()
+            if running is not None:
+                running.remove(removed)
             return True
     return False
 
@@ -6,7 +6,7 @@ Authors:
 - John Christian Linaban
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 import matplotlib
 import os
 import sys
@@ -26,9 +26,18 @@ if not _is_display_available():
 
 import matplotlib.pyplot as plt
 
+from app.analytics.histogram import DEFAULT_BINS, Histogram, histograms_for
+
+
+# Draw pre-binned counts (see app.analytics.histogram) instead of re-binning raw values
+def _draw_histogram(hist: Histogram, **style):
+    plt.bar(hist.edges[:-1], hist.counts, width=hist.widths, align="edge", edgecolor='black', **style)
+
 # Function to plot histogram for any column
-def plot_grade_histogram(students: List[Dict[str, Any]], key: str, title: str = None, save_path: str = None, show_plot: bool = None):
-    values = [s.get(key) for s in students if s.get(key) is not None]
+def plot_grade_histogram(students: List[Dict[str, Any]], key: str, title: str = None, save_path: str = None, show_plot: bool = None,
+                         histogram: Optional[Histogram] = None, bins: int = DEFAULT_BINS):
+    if histogram is None:
+        histogram = histograms_for(students, [key], bins)[key]
 
     if title is None:
         title = f"Distribution of {key.replace('_', ' ').capitalize()}"
@@ -48,7 +57,7 @@ def plot_grade_histogram(students: List[Dict[str, Any]], key: str, title: str =
         color = "gray"
 
     plt.figure(figsize=(8, 5))
-    plt.hist(values, bins=10, edgecolor='black', color=color)
+    _draw_histogram(histogram, color=color)
     plt.title(title)
     plt.xlabel("Score")
     plt.ylabel("Number of Students")
@@ -79,7 +88,10 @@ def plot_grade_histogram(students: List[Dict[str, Any]], key: str, title: str =
 
 
 # Function to plot combined histogram for multiple columns with distinct colors
-def plot_combined_histogram(students: List[Dict[str, Any]], keys: List[str], title: str = None, save_path: str = None, show_plot: bool = None):
+def plot_combined_histogram(students: List[Dict[str, Any]], keys: List[str], title: str = None, save_path: str = None, show_plot: bool = None,
+                            histograms: Optional[Dict[str, Histogram]] = None, bins: int = DEFAULT_BINS):
+    if histograms is None:
+        histograms = histograms_for(students, keys, bins)
     plt.figure(figsize=(12, 6))
 
     # Assign specific colors
@@ -97,9 +109,8 @@ def plot_combined_histogram(students: List[Dict[str, Any]], keys: List[str], tit
 
     # Plot each column
     for key in keys:
-        values = [s.get(key) for s in students if s.get(key) is not None]
-        plt.hist(values, bins=10, alpha=0.6, edgecolor='black', label=key.replace('_', ' ').capitalize(),
-                 color=color_mapping.get(key, "gray"))
+        _draw_histogram(histograms[key], alpha=0.6, label=key.replace('_', ' ').capitalize(),
+                        color=color_mapping.get(key, "gray"))
 
     if title is None:
         title = "Combined Histogram"
@@ -133,3 +144,57 @@ def plot_combined_histogram(students: List[Dict[str, Any]], keys: List[str], tit
         plt.close()
     
     return filename
+
+
+# Function to plot term-over-term trends from cohort summaries
+def plot_cohort_trends(terms: List[Any], title: str = None, save_path: str = None, show_plot: bool = None):
+    labels = [t.term for t in terms]
+    x = list(range(len(terms)))
+    sections = sorted({name for t in terms for name in t.section_averages})
+
+    fig, (ax_course, ax_sections) = plt.subplots(1, 2, figsize=(14, 5))
+
+    ax_course.plot(x, [t.average for t in terms], marker="o", color="salmon", label="Average grade")
+    ax_course.plot(x, [t.at_risk_rate for t in terms], marker="s", color="red", label="At-risk %")
+    ax_course.set_title("Course")
+    ax_course.set_ylabel("Score / Percent")
+
+    # Sections missing from a term are left as gaps in their line
+    for name in sections:
+        values = [t.section_averages.get(name, float("nan")) for t in terms]
+        ax_sections.plot(x, values, marker="o", label=name)
+    ax_sections.set_title("Section averages")
+
+    for ax in (ax_course, ax_sections):
+        ax.set_xticks(x)
+        ax.set_xticklabels(labels, rotation=30, ha="right")
+        ax.set_xlabel("Term")
+        ax.grid(axis='y', linestyle='--', alpha=0.7)
+        ax.legend(fontsize="small")
+
+    if title is None:
+        title = "Cohort Trends"
+    fig.suptitle(title)
+
+    # Determine whether to show or save
+    if show_plot is None:
+        show_plot = _is_display_available()
+
+    # Always save the file
+    if save_path:
+        filename = save_path
+    else:
+        # Auto-generate filename
+        os.makedirs("output/plots", exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"output/plots/cohort_trends_{timestamp}.png"
+
+    plt.savefig(filename, bbox_inches='tight', dpi=300)
+
+    # Show plot if display is available
+    if show_plot:
+        plt.show()
+    else:
+        plt.close()
+
+    return filename
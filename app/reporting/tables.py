@@ -4,7 +4,7 @@ Authors:
 - John Christian Linaban
 """
 
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
 from rich.table import Table
 from rich import box
 
@@ -86,6 +86,15 @@ def build_student_table(students: Iterable[Dict[str, Any]], title: str = "Studen
         ["Q1", "right"], ["Q2", "right"], ["Q3", "right"], ["Q4", "right"], ["Q5", "right"],
         ["Quiz Avg", "right"], ["Midterm", "right"], ["Final", "right"], ["Attendance", "right"], ["Weighted", "right"],
     ]
+    students = list(students)
+    # Letter column only when the rows carry one (see binning.with_letters)
+    show_letter = any("letter" in s for s in students)
+    if show_letter:
+        headers.append(["Letter", "center"])
+    # Course rank with the within-section rank in brackets (see analytics.ranking)
+    show_rank = any("rank" in s for s in students)
+    if show_rank:
+        headers.append(["Rank (Sec)", "right"])
     for col, justify in headers:
         table.add_column(col, justify=justify)
 
@@ -106,10 +115,23 @@ def build_student_table(students: Iterable[Dict[str, Any]], title: str = "Studen
             _progress_bar(s.get('attendance_percent', None)),
             _colorize_percent(s.get('weighted_grade', None), decimals=2),
         ]
+        if show_letter:
+            letter = s.get("letter") or ""
+            row.append(f"[{_color_for_letter(letter)}]{letter}[/]" if letter else _format_cell_value(None))
+        if show_rank:
+            row.append(f"{s['rank']} ({s.get('section_rank', '-')})" if "rank" in s else _format_cell_value(None))
         table.add_row(*row)
     return table
 
 
+_LETTER_COLORS = {"A": "green", "B": "cyan", "C": "yellow", "D": "orange3"}
+
+
+def _color_for_letter(letter: str) -> str:
+    # Plus/minus variants share their base letter's color; '-D', 'F' and others are red
+    return _LETTER_COLORS.get(letter[:1], "red")
+
+
 def build_distribution_table(distribution: Dict[str, int], total: int, title: str = "Grade Distribution") -> Table:
     table = _styled_table(title)
     table.add_column("Grade", justify="center")
@@ -117,40 +139,75 @@ def build_distribution_table(distribution: Dict[str, int], total: int, title: st
     table.add_column("Percent", justify="right")
     table.add_column("Bar", justify="left")
 
-    # Stable order A > B > C > D > -D
-    order = ["A", "B", "C", "D", "-D"]
-    for grade in order:
+    # Rows follow the distribution's own order (the configured letters, then '-D')
+    for grade in distribution:
         count = distribution.get(grade, 0)
         pct = (count / total * 100) if total else 0
-        color_map = {"A": "green", "B": "cyan", "C": "yellow", "D": "orange3", "-D": "red"}
-        color = color_map.get(grade, "white")
+        color = _color_for_letter(grade)
         bar = (f"[{color}]" + ("█" * max(1, int(pct // 2))) + "[/]") if count else ""
         table.add_row(f"[{color}]{grade}[/]", str(count), f"[{color}]{pct:.1f}%[/]", bar)
     return table
 
 
-def build_section_summary_table(section_map: Dict[str, List[Dict[str, Any]]], averages: Dict[str, float], title: str = "Sections Summary") -> Table:
-    table = _styled_table(title)
+def _format_interval(low: Any, high: Any) -> str:
+    if low is None or high is None or low != low or high != high:  # NaN check
+        return _format_cell_value(None)
+    return f"[dim][[/dim]{low:.2f}, {high:.2f}[dim]][/dim]"
+
+
+def build_section_summary_table(
+    section_map: Dict[str, List[Dict[str, Any]]],
+    averages: Dict[str, float],
+    title: str = "Sections Summary",
+    intervals: Optional[Dict[str, Any]] = None,
+    confidence: float = 0.95,
+) -> Table:
+    """Section sizes and averages; with bootstrap intervals (see analytics.bootstrap), adds mean and median CIs."""
+    caption = f"{confidence * 100:g}% bootstrap confidence intervals" if intervals else None
+    table = _styled_table(title, caption)
     table.add_column("Section", justify="left")
     table.add_column("Students", justify="right")
     table.add_column("Avg Weighted", justify="right")
+    if intervals:
+        table.add_column("Mean CI", justify="center", no_wrap=True)
+        table.add_column("Median", justify="right")
+        table.add_column("Median CI", justify="center", no_wrap=True)
     for section, studs in sorted(section_map.items()):
         avg = averages.get(section, 0.0)
-        table.add_row(section, str(len(studs)), _colorize_percent(avg, decimals=2))
+        row = [section, str(len(studs)), _colorize_percent(avg, decimals=2)]
+        if intervals:
+            ci = intervals.get(section)
+            if ci is None:
+                row += [_format_cell_value(None)] * 3
+            else:
+                median = None if ci.median != ci.median else ci.median
+                row += [
+                    _format_interval(ci.mean_low, ci.mean_high),
+                    _colorize_percent(median, decimals=2),
+                    _format_interval(ci.median_low, ci.median_high),
+                ]
+        table.add_row(*row)
     return table
 
 
-def build_rank_table(rows: List[Dict[str, Any]], title: str = "Ranking") -> Table:
+def build_rank_table(rows: List[Dict[str, Any]], title: str = "Ranking", rank_key: str = "rank") -> Table:
+    """rank_key picks the rank column to show ('rank' course-wide, 'section_rank' within section)."""
     table = _styled_table(title)
     table.add_column("Rank", justify="center")
     table.add_column("Student", justify="left")
     table.add_column("Section", justify="left")
     table.add_column("Weighted", justify="right")
+    # Percentile column only when the rows carry precomputed ranks (see analytics.ranking)
+    pct_key = f"{rank_key}_pct"
+    show_pct = any(pct_key in r for r in rows)
+    if show_pct:
+        table.add_column("Percentile", justify="right")
     for r in rows:
         name = f"{r.get('first_name','')} {r.get('last_name','')}".strip()
-        table.add_row(
-            str(r.get("rank", "")), name, str(r.get("section", "")), _colorize_percent(r.get('weighted_grade', None), decimals=2)
-        )
+        row = [str(r.get(rank_key, "")), name, str(r.get("section", "")), _colorize_percent(r.get('weighted_grade', None), decimals=2)]
+        if show_pct:
+            row.append(_format_cell_value(r.get(pct_key)))
+        table.add_row(*row)
     return table
 
 
@@ -214,3 +271,439 @@ def build_quiz_comparison_table(avg_by_section: Dict[str, Dict[str, float]], qui
         row.append(f"{low_sec} ({low_val:.0f}%)" if low_sec else "")
         table.add_row(*row)
     return table
+
+
+def build_diff_table(changed: List[Dict[str, Any]], title: str = "Changed Students") -> Table:
+    table = _styled_table(title)
+    table.add_column("ID", justify="left")
+    table.add_column("Student", justify="left")
+    table.add_column("Section", justify="left")
+    table.add_column("Old", justify="right")
+    table.add_column("New", justify="right")
+    table.add_column("Letter", justify="center")
+    table.add_column("Why", justify="left")
+    for row in changed:
+        name = f"{row.get('last_name','')}, {row.get('first_name','')}".strip(', ')
+        letter = row.get("old_letter", "")
+        if row.get("new_letter") != letter:
+            letter = f"{letter} → [bold]{row.get('new_letter', '')}[/]"
+        reasons = []
+        for col, delta in row.get("deltas", {}).items():
+            pretty = col.replace('_', ' ')
+            reasons.append(f"{pretty} {'n/a' if delta is None else f'{delta:+.2f}'}")
+        table.add_row(
+            _format_cell_value(row.get("student_id", "")),
+            _format_cell_value(name),
+            _format_cell_value(row.get("section", "")),
+            _colorize_percent(row.get("old_grade"), decimals=2),
+            _colorize_percent(row.get("new_grade"), decimals=2),
+            letter,
+            ", ".join(reasons),
+        )
+    return table
+
+
+def build_percentile_table(rows: Dict[str, Dict[int, Any]], percentiles: List[int], title: str = "Percentiles by Section") -> Table:
+    table = _styled_table(title)
+    table.add_column("Section", justify="left")
+    for p in percentiles:
+        table.add_column(f"P{p}", justify="right")
+    for section in sorted(rows.keys()):
+        values = rows[section]
+        table.add_row(section, *[_colorize_percent(values.get(p), decimals=2) for p in percentiles])
+    return table
+
+
+_SHORT_LABELS = {"midterm": "Mid", "final": "Final", "attendance_percent": "Att%", "weighted_grade": "Grade"}
+
+
+def _short_label(key: str) -> str:
+    if key.startswith("quiz"):
+        return f"Q{key[4:]}"
+    return _SHORT_LABELS.get(key, key)
+
+
+def _colorize_corr(r: Any) -> str:
+    if r is None or r != r:  # NaN
+        return "[dim]—[/dim]"
+    strength = abs(r)
+    if strength >= 0.7:
+        color = "bold green" if r > 0 else "bold red"
+    elif strength >= 0.4:
+        color = "cyan" if r > 0 else "orange3"
+    else:
+        color = "dim"
+    return f"[{color}]{r:+.2f}[/]"
+
+
+def build_correlation_table(keys: List[str], values: Any, title: str = "Correlation Matrix") -> Table:
+    """K x K matrix with cells colored by strength and sign of the correlation."""
+    table = _styled_table(title)
+    table.add_column("", justify="left")
+    for key in keys:
+        table.add_column(_short_label(key), justify="right")
+    for i, key in enumerate(keys):
+        table.add_row(_short_label(key), *[_colorize_corr(float(values[i][j])) for j in range(len(keys))])
+    return table
+
+
+def build_scenario_table(
+    names: List[str],
+    weights: Any,
+    averages: Dict[str, float],
+    distributions: Dict[str, Dict[str, int]],
+    at_risk: Dict[str, int],
+    moved: Dict[str, Dict[str, int]],
+    title: str = "What-if Weight Scenarios",
+) -> Table:
+    """Scenarios side by side: weights, average, letter counts, at-risk and rank movement."""
+    table = _styled_table(title)
+    table.add_column("Metric", justify="left")
+    for name in names:
+        table.add_column(name, justify="right")
+    labels = ("Quizzes", "Midterm", "Final", "Attendance")
+    for i, label in enumerate(labels):
+        table.add_row(f"{label} weight", *[f"{float(weights[i][k]) * 100:.0f}%" for k in range(len(names))])
+    table.add_row("Average", *[_colorize_percent(averages[n], decimals=2) for n in names])
+    letters = list(distributions[names[0]].keys()) if names else []
+    for letter in letters:
+        table.add_row(f"Letter {letter}", *[str(distributions[n][letter]) for n in names])
+    table.add_row("At risk", *[f"[red]{at_risk[n]}[/red]" if at_risk[n] else "0" for n in names])
+    table.add_row("Moved up", *[str(moved[n]["up"]) for n in names])
+    table.add_row("Moved down", *[str(moved[n]["down"]) for n in names])
+    table.add_row("Largest shift", *[str(moved[n]["max"]) for n in names])
+    return table
+
+
+def build_curve_impact_table(
+    methods: List[str],
+    averages: Dict[str, float],
+    distributions: Dict[str, Dict[str, int]],
+    at_risk: Dict[str, int],
+    raised: Dict[str, int],
+    title: str = "Curve Impact",
+) -> Table:
+    """Original grades and every curve method side by side."""
+    table = _styled_table(title)
+    table.add_column("Metric", justify="left")
+    for method in methods:
+        table.add_column(method, justify="right")
+    table.add_row("Average", *[_colorize_percent(averages[m], decimals=2) for m in methods])
+    letters = list(distributions[methods[0]].keys()) if methods else []
+    for letter in letters:
+        table.add_row(f"Letter {letter}", *[str(distributions[m][letter]) for m in methods])
+    table.add_row("At risk", *[f"[red]{at_risk[m]}[/red]" if at_risk[m] else "0" for m in methods])
+    table.add_row("Raised", *[str(raised[m]) for m in methods])
+    return table
+
+
+def build_curve_comparison_table(students: List[Dict[str, Any]], methods: List[str], curved: Any, title: str = "Curved Grades by Method") -> Table:
+    """One row per student with the grade under each method (curved[i][k] for methods[k])."""
+    table = _styled_table(title)
+    table.add_column("Student", justify="left")
+    table.add_column("Section", justify="left")
+    for method in methods:
+        table.add_column(method, justify="right")
+    for i, s in enumerate(students):
+        name = f"{s.get('last_name','')}, {s.get('first_name','')}".strip(', ')
+        cells = [None if curved[i][k] != curved[i][k] else float(curved[i][k]) for k in range(len(methods))]
+        table.add_row(
+            _format_cell_value(name),
+            _format_cell_value(s.get("section", "")),
+            *[_colorize_percent(v, decimals=2) for v in cells],
+        )
+    return table
+
+
+def build_section_distribution_table(distributions: Dict[str, Dict[str, int]], title: str = "Letter Distribution by Section") -> Table:
+    """Sections as rows, letters (in configured order) as columns."""
+    table = _styled_table(title)
+    table.add_column("Section", justify="left")
+    letters = list(next(iter(distributions.values())).keys()) if distributions else []
+    for letter in letters:
+        table.add_column(f"[{_color_for_letter(letter)}]{letter}[/]", justify="right")
+    table.add_column("Total", justify="right")
+    for section in sorted(distributions.keys()):
+        dist = distributions[section]
+        table.add_row(section, *[str(dist[letter]) for letter in letters], str(sum(dist.values())))
+    return table
+
+
+def build_section_overview_table(results: Dict[str, Dict[str, Any]], title: str = "Section Overview") -> Table:
+    """One row per section from run_section_analytics: top, bottom, letter counts and hardest quiz."""
+    table = _styled_table(title)
+    table.add_column("Section", justify="left")
+    table.add_column("Top", justify="left")
+    table.add_column("Bottom", justify="left")
+    letters = list(next(iter(results.values()))["distribution"].keys()) if results else []
+    for letter in letters:
+        table.add_column(f"[{_color_for_letter(letter)}]{letter}[/]", justify="right")
+    table.add_column("Hardest Quiz", justify="left")
+
+    def _who(studs: List[Dict[str, Any]]) -> str:
+        if not studs:
+            return "-"
+        s = studs[0]
+        name = f"{s.get('first_name', '')} {s.get('last_name', '')}".strip()
+        return f"{name} ({_colorize_percent(s.get('weighted_grade'), decimals=2)})"
+
+    for section, res in results.items():
+        _, _, hardest, lowest = res["hardest_topic"]
+        table.add_row(
+            section,
+            _who(res["top"]),
+            _who(res["bottom"]),
+            *[str(res["distribution"][letter]) for letter in letters],
+            f"{hardest} ({lowest:.2f})" if hardest else "-",
+        )
+    return table
+
+
+def build_cohort_trend_table(terms: List[Any], title: str = "Cohort Trends") -> Table:
+    """One row per term (TermSummary): size, average, at-risk rate and hardest quiz, with change vs the previous term."""
+    table = _styled_table(title)
+    table.add_column("Term", justify="left")
+    table.add_column("Students", justify="right")
+    table.add_column("Average", justify="right")
+    table.add_column("Δ Avg", justify="right")
+    table.add_column("At-Risk %", justify="right")
+    table.add_column("Hardest Quiz", justify="left")
+    previous = None
+    for t in terms:
+        if previous is None:
+            delta = "[dim]-[/dim]"
+        else:
+            change = t.average - previous.average
+            delta = f"[{'green' if change >= 0 else 'red'}]{change:+.2f}[/]"
+        table.add_row(
+            t.term,
+            str(t.students),
+            _colorize_percent(t.average, decimals=2),
+            delta,
+            f"{t.at_risk_rate:.1f}%",
+            f"{t.hardest_quiz} ({t.lowest_quiz_avg:.2f})" if t.hardest_quiz else "-",
+        )
+        previous = t
+    return table
+
+
+def build_cohort_percentile_table(
+    percentiles: Dict[int, Optional[float]],
+    outlier_counts: Optional[Dict[str, int]] = None,
+    title: str = "Cohort Grade Percentiles",
+) -> Table:
+    """Course-wide weighted-grade percentiles across terms; optional per-term outlier counts in the caption."""
+    caption = None
+    if outlier_counts is not None:
+        caption = "Outliers by term: " + ", ".join(f"{term} {n}" for term, n in outlier_counts.items())
+    table = _styled_table(title, caption=caption)
+    table.add_column("Percentile", justify="left")
+    table.add_column("Grade", justify="right")
+    for p, value in percentiles.items():
+        table.add_row(f"P{p}", "[dim]-[/dim]" if value is None else _colorize_percent(value, decimals=2))
+    return table
+
+
+def build_section_trend_table(
+    trend: Dict[str, Dict[str, float]], terms: List[str], title: str = "Section Trends", suffix: str = ""
+) -> Table:
+    """Sections as rows, terms as columns; blank where a section did not exist that term."""
+    table = _styled_table(title)
+    table.add_column("Section", justify="left")
+    for term in terms:
+        table.add_column(term, justify="right")
+    for section in sorted(trend.keys()):
+        values = trend[section]
+        cells = []
+        for term in terms:
+            v = values.get(term)
+            if v is None:
+                cells.append("[dim]-[/dim]")
+            elif suffix:
+                cells.append(f"{v:.1f}{suffix}")
+            else:
+                cells.append(_colorize_percent(v, decimals=2))
+        table.add_row(section, *cells)
+    return table
+
+
+def build_histogram_table(histogram: Any, title: str = "Histogram", width: int = 40) -> Table:
+    """Text histogram from pre-binned counts (app.analytics.histogram.Histogram)."""
+    table = _styled_table(title, caption=f"Missing: {histogram.missing}" if histogram.missing else None)
+    table.add_column("Range", justify="left")
+    table.add_column("Count", justify="right")
+    table.add_column("Bar", justify="left")
+    peak = int(histogram.counts.max()) if len(histogram.counts) else 0
+    edges = histogram.edges
+    for i, count in enumerate(histogram.counts):
+        closing = "]" if i == len(histogram.counts) - 1 else ")"
+        bar_len = int(round(count / peak * width)) if peak else 0
+        color = _color_for_grade((edges[i] + edges[i + 1]) / 2)
+        table.add_row(f"[{edges[i]:.1f}, {edges[i + 1]:.1f}{closing}", str(int(count)), f"[{color}]" + "█" * bar_len + "[/]")
+    return table
+
+
+def build_outlier_table(rows: List[Dict[str, Any]], key: str, title: str = "Outliers by Section") -> Table:
+    """Rows from OutlierResult.rows(): value, direction, score and the fence crossed."""
+    table = _styled_table(title)
+    table.add_column("Section", justify="left")
+    table.add_column("ID", justify="left")
+    table.add_column("Student", justify="left")
+    table.add_column(key.replace("_", " ").capitalize(), justify="right")
+    table.add_column("Direction", justify="center")
+    table.add_column("Fence", justify="right")
+    table.add_column("Score", justify="right")
+    for r in rows:
+        name = f"{r.get('first_name','')} {r.get('last_name','')}".strip()
+        reason = r.get("outlier_reason", "")
+        direction = "[green]▲ above[/]" if reason == "above" else "[red]▼ below[/]"
+        score = r.get("outlier_score")
+        table.add_row(
+            str(r.get("section", "")),
+            _format_cell_value(r.get("student_id", "")),
+            name,
+            _colorize_percent(r.get("outlier_value"), decimals=2),
+            direction,
+            f"{r.get('outlier_fence', 0):.2f}",
+            "-" if score is None or score != score else f"{score:.2f}",
+        )
+    return table
+
+def build_final_plan_table(rows: List[Dict[str, Any]], letters: List[str], title: str = "Final Exam Planner") -> Table:
+    """Rows from FinalPlan.rows(): the final score needed for each letter."""
+    table = _styled_table(title)
+    table.add_column("ID", justify="left")
+    table.add_column("Student", justify="left")
+    table.add_column("Section", justify="left")
+    table.caption = "✓ secured even with a 0 final • ✗ out of reach even with a perfect final"
+    table.add_column("Pre-final", justify="right")
+    for letter in letters:
+        table.add_column(f"Need {letter}", justify="right")
+    for r in rows:
+        name = f"{r.get('first_name','')} {r.get('last_name','')}".strip()
+        cells = []
+        for letter in letters:
+            needed = r.get(f"final_for_{letter}")
+            if needed == "secured":
+                cells.append("[green]✓[/]")
+            elif needed == "impossible":
+                cells.append("[red]✗[/]")
+            else:
+                cells.append(f"{needed:.2f}")
+        table.add_row(
+            _format_cell_value(r.get("student_id", "")),
+            name,
+            str(r.get("section", "")),
+            f"{r.get('pre_final_grade', 0):.2f}",
+            *cells,
+        )
+    return table
+
+def build_risk_table(rows: List[Dict[str, Any]], title: str = "Failure Risk", start: int = 0) -> Table:
+    """Rows from RiskResult.ranked(): probability of finishing below the cutoff, most at risk first."""
+    table = _styled_table(title)
+    table.add_column("#", justify="right")
+    table.add_column("ID", justify="left")
+    table.add_column("Student", justify="left")
+    table.add_column("Section", justify="left")
+    table.add_column("Weighted", justify="right")
+    table.add_column("Simulated", justify="left")
+    table.add_column("P(fail)", justify="right")
+    for i, r in enumerate(rows, start=start + 1):
+        name = f"{r.get('first_name','')} {r.get('last_name','')}".strip()
+        p = float(r.get("fail_probability", 0.0))
+        color = "red" if p >= 0.5 else "yellow" if p >= 0.2 else "green"
+        table.add_row(
+            str(i),
+            _format_cell_value(r.get("student_id", "")),
+            name,
+            str(r.get("section", "")),
+            _colorize_percent(r.get("weighted_grade"), decimals=2),
+            r.get("simulated") or "-",
+            f"[{color}]{p:.1%}[/]",
+        )
+    return table
+
+def build_prediction_fit_table(quality: List[Dict[str, Any]], title: str = "Final Exam Predictor Fit") -> Table:
+    """Rows from FinalModel.quality(): training size and in-sample fit per section."""
+    table = _styled_table(title)
+    table.add_column("Section", justify="left")
+    table.add_column("Train n", justify="right")
+    table.add_column("R²", justify="right")
+    table.add_column("RMSE", justify="right")
+    table.add_column("β midterm", justify="right")
+    table.add_column("Model", justify="left")
+    for q in quality:
+        r2 = q.get("r2")
+        table.add_row(
+            str(q.get("section", "")),
+            str(q.get("n", 0)),
+            "-" if r2 is None or r2 != r2 else f"{r2:.3f}",
+            "-" if q.get("rmse") != q.get("rmse") else f"{q.get('rmse', 0):.2f}",
+            f"{q.get('midterm_coef', 0):+.3f}",
+            "[dim]course-wide[/]" if q.get("model") == "course-wide" else str(q.get("model", "")),
+        )
+    return table
+
+
+def build_predicted_final_table(rows: List[Dict[str, Any]], title: str = "Predicted At-Risk (No Final Yet)") -> Table:
+    """Rows from predicted_at_risk(): predicted final and the grade it would give."""
+    table = _styled_table(title)
+    table.add_column("ID", justify="left")
+    table.add_column("Student", justify="left")
+    table.add_column("Section", justify="left")
+    table.add_column("Midterm", justify="right")
+    table.add_column("Pred. Final", justify="right")
+    table.add_column("Pred. Grade", justify="right")
+    for r in rows:
+        name = f"{r.get('first_name','')} {r.get('last_name','')}".strip()
+        table.add_row(
+            _format_cell_value(r.get("student_id", "")),
+            name,
+            str(r.get("section", "")),
+            _colorize_percent(r.get("midterm"), decimals=1),
+            _colorize_percent(r.get("predicted_final"), decimals=2),
+            _colorize_percent(r.get("predicted_grade"), decimals=2),
+        )
+    return table
+
+def build_cluster_table(summary: List[Dict[str, Any]], title: str = "Performance Profiles") -> Table:
+    """Rows from ClusterResult.summary(): centroid scores per cluster, largest first."""
+    table = _styled_table(title)
+    table.add_column("#", justify="center")
+    table.add_column("Students", justify="right")
+    table.add_column("Quiz Avg", justify="right")
+    table.add_column("Midterm", justify="right")
+    table.add_column("Final", justify="right")
+    table.add_column("Attend.", justify="right")
+    table.add_column("Weighted", justify="right")
+    table.add_column("Profile", justify="left")
+    for c in summary:
+        centroid = c.get("centroid", {})
+        quizzes = [v for k, v in centroid.items() if k.startswith("quiz")]
+        grade = c.get("weighted_grade")
+        table.add_row(
+            str(c.get("cluster", "")),
+            f"{c.get('size', 0)} ({c.get('share', 0.0):.0f}%)",
+            _colorize_percent(sum(quizzes) / len(quizzes) if quizzes else None),
+            _colorize_percent(centroid.get("midterm")),
+            _colorize_percent(centroid.get("final")),
+            _colorize_percent(centroid.get("attendance_percent"), suffix="%"),
+            _colorize_percent(None if grade is None or grade != grade else grade, decimals=2),
+            str(c.get("profile", "")),
+        )
+    return table
+
+
+def build_query_table(rows: List[Dict[str, Any]], title: str = "Query Result", caption: str | None = None) -> Table:
+    """Rows from QueryResult.to_rows(): one column per result column, floats to 2 decimals."""
+    table = _styled_table(title, caption=caption)
+    columns = list(rows[0].keys()) if rows else []
+    for name in columns:
+        table.add_column(name, justify="left" if isinstance(rows[0][name], str) else "right")
+    for row in rows:
+        table.add_row(*[
+            f"{row[name]:.2f}" if isinstance(row[name], float) else _format_cell_value(row[name])
+            for name in columns
+        ])
+    return table
@@ -4,9 +4,10 @@ Authors:
 - John Christian Linaban
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from rich.console import Console
 from rich.table import Table
+from rich.markup import escape
 
 from app.core import (
     load_config,
@@ -14,24 +15,30 @@ from app.core import (
     group_students_by_section,
     insert_student,
     delete_student,
-    sort_students,
 )
 from app.analytics.stats import (
     compute_weighted_grades,
-    calculate_distribution,
     get_top_n_students,
-    get_bottom_n_students,
     get_average_grade,
     apply_grade_curve,
-    calculate_percentile,
-)
-from app.analytics.insights import (
-    get_quiz_averages,
-    get_sections_quiz_averages,
-    track_midterm_to_final_improvement,
-    get_at_risk_students,
-    find_outliers,
 )
+from app.analytics.engine import get_engine
+from app.analytics.summary import summarize
+from app.analytics.binning import with_letters
+from app.analytics.curves import curve_impact, curve_params_from_config
+from app.analytics.numpy_stats import section_percentiles_numpy
+from app.analytics.ranking import assign_ranks
+from app.analytics.histogram import histograms_for
+from app.analytics.planner import plan_final_scores
+from app.analytics.clustering import cluster_students, clustering_settings
+from app.analytics.prediction import fit_final_model, predicted_at_risk
+from app.analytics.risk import risk_settings, simulate_failure_risk
+from app.analytics.query import col, count, scan
+from app.analytics.expressions import parse_filter
+from app.analytics.columnar import NUMERIC_KEYS, TEXT_KEYS
+from app.analytics.bootstrap import bootstrap_settings, section_intervals
+from app.analytics.cohort import cohort_cache_path, expand_term_paths, find_cohort_outliers, load_cohort
+from app.analytics.parallel import parallel_settings, run_section_analytics
 from app.reporting.tables import (
     build_student_table,
     build_distribution_table,
@@ -40,11 +47,23 @@ from app.reporting.tables import (
     build_curve_table,
     build_hardest_topic_table,
     build_quiz_comparison_table,
+    build_percentile_table,
+    build_curve_impact_table,
+    build_final_plan_table,
+    build_risk_table,
+    build_prediction_fit_table,
+    build_predicted_final_table,
+    build_cluster_table,
+    build_query_table,
+    build_cohort_percentile_table,
+    build_cohort_trend_table,
+    build_section_trend_table,
 )
 from app.reporting.exporter import export_to_csv
 from app.reporting.plotting import (
     plot_grade_histogram,
     plot_combined_histogram,
+    plot_cohort_trends,
     _is_display_available,
 )
 
@@ -52,14 +71,17 @@ from app.reporting.plotting import (
 def run_showcase(config_path: str = "config.json") -> None:
     console = Console()
     config = load_config(config_path)
+    engine = get_engine(config)
 
     # == INGEST ==
     console.rule("INGEST")
-    students = read_csv_data(config["file_paths"]["input_csv"], config)
+    raw_students = read_csv_data(config["file_paths"]["input_csv"], config)
 
     # == TRANSFORM: WEIGHTED GRADES ==
     console.rule("TRANSFORM")
-    students = compute_weighted_grades(students, config["grade_weights"])
+    students = compute_weighted_grades(raw_students, config["grade_weights"])
+    # Rows as read, for simulating scores that grading zero-fills
+    raw_by_id = {s.get("student_id"): raw for s, raw in zip(students, raw_students)}
     console.print(
         build_student_table(
             students,
@@ -97,6 +119,12 @@ def run_showcase(config_path: str = "config.json") -> None:
             students = [s for s in students if s.get("student_id") != to_delete]
             console.print(f"Deleted student with ID {to_delete}")
 
+    # == RANKS (course-wide and within section, after the roster changes) ==
+    assign_ranks(students)
+
+    # == COURSE SUMMARY (one vectorized sweep for all course-level aggregates) ==
+    summary = summarize(students, config)
+
     # == SECTION TABLES ==
     console.rule("ANALYZE")
     console.rule("SECTION TABLES")
@@ -109,59 +137,68 @@ def run_showcase(config_path: str = "config.json") -> None:
             )
         )
 
+    # == PER-SECTION ANALYTICS (one pass, process pool for large rosters) ==
+    N = 3
+    section_results = run_section_analytics(
+        sections,
+        config["thresholds"]["grade_letters"],
+        sort_by={"weighted_grade": True, "last_name": False, "first_name": False},
+        n=N,
+        **parallel_settings(config),
+    )
+
     # == SORTING ==
     console.rule("SORTING")
-    for section_name, studs in sections.items():
+    for section_name, result in section_results.items():
         console.print(
             build_student_table(
-                sort_students(studs, sort_by="weighted_grade", reverse=True),
+                result["sort"]["weighted_grade"],
                 title=f"Sorted by Grade (desc) — {section_name}",
             )
         )
         console.print(
             build_student_table(
-                sort_students(studs, sort_by="last_name"),
+                result["sort"]["last_name"],
                 title=f"Sorted by Last Name — {section_name}",
             )
         )
         console.print(
             build_student_table(
-                sort_students(studs, sort_by="first_name"),
+                result["sort"]["first_name"],
                 title=f"Sorted by First Name — {section_name}",
             )
         )
 
     # == TOP / BOTTOM N ==
     console.rule("TOP / BOTTOM N")
-    N = 3
-    for section_name, studs in sections.items():
-        top_students = get_top_n_students(studs, N)
-        rows = [dict(rank=i + 1, **s) for i, s in enumerate(top_students)]
-        console.print(build_rank_table(rows, title=f"Top {N} — {section_name}"))
-
-        bottom_students = get_bottom_n_students(studs, N)
-        rows = [dict(rank=i + 1, **s) for i, s in enumerate(bottom_students)]
-        console.print(build_rank_table(rows, title=f"Bottom {N} — {section_name}"))
+    for section_name, result in section_results.items():
+        console.print(build_rank_table(result["top"], title=f"Top {N} — {section_name}", rank_key="section_rank"))
+        console.print(build_rank_table(result["bottom"], title=f"Bottom {N} — {section_name}", rank_key="section_rank"))
 
     # == SECTION AVERAGES ==
     console.rule("SECTION AVERAGES")
     averages = {sec: get_average_grade(studs) for sec, studs in sections.items()}
+    bootstrap = bootstrap_settings(config)
     console.print(
         build_section_summary_table(
-            sections, averages, title="Average Grade per Section"
+            sections,
+            averages,
+            title="Average Grade per Section",
+            intervals=section_intervals(sections, **bootstrap),
+            confidence=bootstrap["confidence"],
         )
     )
 
     # == GRADE DISTRIBUTIONS ==
     console.rule("GRADE DISTRIBUTIONS")
-    overall_dist = calculate_distribution(students, config["thresholds"]["grade_letters"])
+    overall_dist = summary.distribution
     console.print(
         build_distribution_table(
             overall_dist, total=len(students), title="Overall Grade Distribution"
         )
     )
     for section_name, studs in sections.items():
-        dist = calculate_distribution(studs, config["thresholds"]["grade_letters"])
+        dist = section_results[section_name]["distribution"]
         console.print(
             build_distribution_table(
                 dist, total=len(studs), title=f"Grade Distribution — {section_name}"
@@ -170,14 +207,14 @@ def run_showcase(config_path: str = "config.json") -> None:
 
     # == QUIZ INSIGHTS ==
     console.rule("QUIZ INSIGHTS")
-    for section_name, studs in sections.items():
-        quiz_avgs, quiz_counts, hardest_quiz, _ = get_quiz_averages(studs)
+    for section_name, result in section_results.items():
+        quiz_avgs, quiz_counts, hardest_quiz, _ = result["hardest_topic"]
         console.print(
             build_hardest_topic_table(
                 quiz_avgs, quiz_counts, hardest_quiz, title=f"Hardest Topic — {section_name}"
             )
         )
-    avg_by_section, quiz_keys, lowest_per_quiz = get_sections_quiz_averages(sections)
+    avg_by_section, quiz_keys, lowest_per_quiz = engine.get_sections_quiz_averages(sections)
     console.print(
         build_quiz_comparison_table(
             avg_by_section, quiz_keys, lowest_per_quiz, title="Quiz Averages Comparison"
@@ -190,14 +227,25 @@ def run_showcase(config_path: str = "config.json") -> None:
     console.print(build_curve_table(students[:5], title="Curve Preview (flat +5)"))
     students = apply_grade_curve(students, method="normalize", value=100.0)
     console.print(build_curve_table(students[:5], title="Curve Preview (normalize to 100)"))
+    impact = curve_impact(
+        [s.get("weighted_grade") for s in students],
+        config["thresholds"]["grade_letters"],
+        config["thresholds"]["at_risk_cutoff"],
+        params=curve_params_from_config(config),
+    )
+    console.print(
+        build_curve_impact_table(
+            impact.methods, impact.averages, impact.distributions, impact.at_risk, impact.raised,
+            title="Curve Impact (all methods)",
+        )
+    )
 
     # == RANKINGS OVERALL == (to add)
     console.rule("RANKINGS OVERALL (to add)")
     # console.print("[dim]Overall ranking not yet implemented.[/dim]")
     N = 10
     top_students_overall = get_top_n_students(students, N)
-    rows = [dict(rank=i + 1, **s) for i, s in enumerate(top_students_overall)]
-    console.print(build_rank_table(rows, title=f"Top {N} — Overall"))
+    console.print(build_rank_table(top_students_overall, title=f"Top {N} — Overall"))
 
     # == PERCENTILES ==
     console.rule("PERCENTILES")
@@ -205,14 +253,16 @@ def run_showcase(config_path: str = "config.json") -> None:
     pct_table.add_column("Percentile", justify="center")
     pct_table.add_column("Weighted Grade", justify="right")
     for p in [25, 50, 75, 90]:
-        val = calculate_percentile(students, p)
+        val = summary.percentiles.get(p)
         display = f"{val:.2f}%" if val is not None else "N/A"
         pct_table.add_row(f"{p}th", display)
     console.print(pct_table)
+    section_pcts = section_percentiles_numpy(sections, [25, 50, 75, 90])
+    console.print(build_percentile_table(section_pcts, [25, 50, 75, 90], title="Percentiles by Section"))
 
     # == OUTLIERS ==
     console.rule("OUTLIERS")
-    outliers = find_outliers(students)
+    outliers = summary.outliers
     if outliers:
         console.print(build_student_table(outliers, title="Outliers (IQR Method)"))
     else:
@@ -220,7 +270,7 @@ def run_showcase(config_path: str = "config.json") -> None:
 
     # == IMPROVEMENT INSIGHTS == (to add)
     console.rule("IMPROVEMENT INSIGHTS")
-    imp = track_midterm_to_final_improvement(students)
+    imp = summary.improvement
     console.print("[bold]Midterm vs. Final Improvement Analysis:[/bold]")
     if imp["total_students"] == 0:
         console.print("No midterm and final exam data available to analyze.")
@@ -238,6 +288,16 @@ def run_showcase(config_path: str = "config.json") -> None:
             for s in imp["suggestions"]:
                 console.print(f"- {s}")
 
+    # Final exam predictor, fitted on the finals on record
+    observed = [raw_by_id.get(s.get("student_id"), s) for s in students]
+    final_model = fit_final_model(students, observed=observed)
+    console.print(build_prediction_fit_table(final_model.quality(), title="Final Exam Predictor Fit (Least Squares)"))
+    predicted = predicted_at_risk(
+        students, final_model, config["grade_weights"], float(config["thresholds"]["at_risk_cutoff"]), observed=observed
+    )
+    if predicted:
+        console.print(build_predicted_final_table(predicted[:10]))
+
     # == REPORT ==
     console.rule("REPORT")
     # EXPORTS
@@ -245,14 +305,14 @@ def run_showcase(config_path: str = "config.json") -> None:
     for section_name, section_data in sections.items():
         if section_data:
             export_to_csv(
-                section_data,
+                with_letters(section_data, config["thresholds"]["grade_letters"]),
                 f"{config['file_paths']['output_dir']}section_{section_name}_report.csv",
             )
 
     # == AT-RISK LIST/EXPORT == (to add)
     console.rule("AT-RISK LIST/EXPORT")
     cutoff = config["thresholds"]["at_risk_cutoff"]
-    at_risk = get_at_risk_students(students, float(cutoff))
+    at_risk = summary.at_risk
     console.print(
         build_student_table(
             at_risk,
@@ -265,6 +325,54 @@ def run_showcase(config_path: str = "config.json") -> None:
             f"{config['file_paths']['output_dir']}at_risk_report.csv",
         )
 
+    # == PERFORMANCE PROFILES (mini-batch k-means on score profiles) ==
+    console.rule("PERFORMANCE PROFILES")
+    profiles = cluster_students(students, observed=observed, **clustering_settings(config))
+    console.print(build_cluster_table(profiles.summary(), title="Performance Profiles (All Students)"))
+
+    # == FINAL EXAM PLANNER ==
+    console.rule("FINAL EXAM PLANNER")
+    plan = plan_final_scores(students, config["grade_weights"], config["thresholds"]["grade_letters"])
+    for letter, c in plan.counts().items():
+        console.print(f"- {letter}: {c['secured']} secured, {c['needed']} reachable, {c['impossible']} out of reach")
+    plan_rows = plan.rows(students)
+    at_risk_ids = {s.get("student_id") for s in at_risk}
+    console.print(build_final_plan_table(
+        [r for r in plan_rows if r["student_id"] in at_risk_ids][:10], plan.letters,
+        title="Final Score Needed (At-Risk Students)",
+    ))
+    export_to_csv(plan_rows, f"{config['file_paths']['output_dir']}final_exam_planner.csv")
+
+    # == FAILURE RISK (Monte Carlo over missing assessments) ==
+    console.rule("FAILURE RISK")
+    risk = simulate_failure_risk(
+        students, config["grade_weights"], float(cutoff),
+        observed=observed,
+        **risk_settings(config),
+    )
+    ranked_risk = risk.ranked(students)
+    console.print(f"{int(risk.missing.any(axis=1).sum())} student(s) with simulated scores, {risk.n_draws:,} draws each")
+    console.print(build_risk_table(ranked_risk[:10], title=f"Most Likely to Finish Below {cutoff}"))
+    if ranked_risk:
+        export_to_csv(ranked_risk, f"{config['file_paths']['output_dir']}failure_risk.csv")
+
+    # == LAZY QUERY (filter and column pushdown into the CSV reader) ==
+    console.rule("LAZY QUERY")
+    query = (
+        scan(config["file_paths"]["input_csv"], config)
+        .filter(col("weighted_grade") < cutoff)
+        .group_by("section")
+        .agg(students=count(), avg_midterm=col("midterm").mean(), avg_final=col("final").mean())
+        .sort("students", descending=True)
+    )
+    console.print(query.explain(), markup=False, highlight=False)
+    result = query.collect()
+    console.print(build_query_table(
+        result.to_rows(), title=f"Below {cutoff} by Section",
+        caption=f"{result.stats['rows_matched']} of {result.stats['rows_scanned']} rows matched; "
+                f"{result.stats['cells_converted']} values parsed",
+    ))
+
     # == PLOTS == (to add)
     console.rule("PLOTS")
     
@@ -275,14 +383,17 @@ def run_showcase(config_path: str = "config.json") -> None:
         console.print("[bold cyan]Generating histograms (saving to files - no display available)...[/bold cyan]")
     
     # Overall weighted grade distribution
-    file1 = plot_grade_histogram(students, "weighted_grade", "Overall Weighted Grade Distribution")
+    # Bin every plotted column once; each plot below just draws the counts
+    hists = histograms_for(students, list(NUMERIC_KEYS))
+    file1 = plot_grade_histogram(students, "weighted_grade", "Overall Weighted Grade Distribution", histogram=hists["weighted_grade"])
     console.print(f"[green]✓[/green] Saved: {file1}")
     
     # Quiz distributions
     file2 = plot_combined_histogram(
         students, 
         ["quiz1", "quiz2", "quiz3", "quiz4", "quiz5"], 
-        "Quiz Scores Distribution (All Students)"
+        "Quiz Scores Distribution (All Students)",
+        histograms=hists,
     )
     console.print(f"[green]✓[/green] Saved: {file2}")
     
@@ -290,19 +401,21 @@ def run_showcase(config_path: str = "config.json") -> None:
     file3 = plot_combined_histogram(
         students, 
         ["midterm", "final"], 
-        "Midterm vs Final Exam Distribution"
+        "Midterm vs Final Exam Distribution",
+        histograms=hists,
     )
     console.print(f"[green]✓[/green] Saved: {file3}")
     
     # Attendance
-    file4 = plot_grade_histogram(students, "attendance_percent", "Attendance Distribution")
+    file4 = plot_grade_histogram(students, "attendance_percent", "Attendance Distribution", histogram=hists["attendance_percent"])
     console.print(f"[green]✓[/green] Saved: {file4}")
     
     # All scores combined
     file5 = plot_combined_histogram(
         students,
         ["quiz1", "quiz2", "quiz3", "quiz4", "quiz5", "midterm", "final", "weighted_grade"],
-        "All Scores including Weighted Grade"
+        "All Scores including Weighted Grade",
+        histograms=hists,
     )
     console.print(f"[green]✓[/green] Saved: {file5}")
     
@@ -311,4 +424,82 @@ def run_showcase(config_path: str = "config.json") -> None:
     else:
         console.print("[bold green]All plots saved to output/plots/ (check the folder to view images)[/bold green]")
 
-    console.rule("DONE")
\ No newline at end of file
+    console.rule("DONE")
+
+
+def run_cohort(config_path: str = "config.json", patterns: Optional[List[str]] = None) -> None:
+    """Console trend report across term files (defaults to config["cohort"]["term_files"])."""
+    console = Console()
+    config = load_config(config_path)
+    cohort_cfg = config.get("cohort", {})
+    paths = expand_term_paths(patterns or cohort_cfg.get("term_files", []))
+    if not paths:
+        console.print("[bold red]No term files matched.[/bold red]")
+        return
+
+    console.rule("COHORT INGEST")
+    cohort = load_cohort(paths, config, cache_path=cohort_cache_path(config), max_workers=cohort_cfg.get("max_workers"))
+    console.print(f"Terms: {len(cohort.terms)}  |  From cache: {cohort.cached}  |  Re-read: {cohort.computed}")
+
+    console.rule("COHORT TRENDS")
+    term_names = [t.term for t in cohort.terms]
+    console.print(build_cohort_trend_table(cohort.terms, title="Course Trends by Term"))
+    console.print(build_section_trend_table(cohort.section_trend("section_averages"), term_names, title="Section Averages by Term"))
+    console.print(
+        build_section_trend_table(
+            cohort.section_trend("section_at_risk_rates"), term_names, title="Section At-Risk Rate by Term", suffix="%"
+        )
+    )
+    outliers = find_cohort_outliers(cohort, config)
+    console.print(build_cohort_percentile_table(cohort.percentiles(), {t: len(o) for t, o in outliers.items()}))
+    if len(cohort.terms) > 1:
+        console.print(f"[green]✓[/green] Saved: {plot_cohort_trends(cohort.terms)}")
+    console.rule("DONE")
+
+
+def run_query(
+    config_path: str = "config.json",
+    expression: str = "",
+    csv_path: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    output: Optional[str] = None,
+    show: int = 20,
+) -> int:
+    """Batch filter: matching rows of csv_path (default: the configured roster) to the console and/or a CSV.
+
+    The filter is compiled once and pushed into the CSV reader (see
+    analytics.query), so only the filter's columns are parsed for every row.
+    Returns the number of matching rows, or -1 when the filter is invalid.
+    """
+    console = Console()
+    config = load_config(config_path)
+    frame = scan(csv_path or config["file_paths"]["input_csv"], config)
+    schema = frame.schema()
+    try:
+        predicate = parse_filter(expression, schema)
+    except ValueError as e:
+        console.print(f"[bold red]Invalid filter:[/bold red] {escape(str(e))}")
+        return -1
+    # Default columns: who the student is, then whatever the filter looked at
+    used = predicate.columns()
+    chosen = columns or [c for c in schema if c in TEXT_KEYS or c in used]
+    try:
+        query = frame.filter(predicate).select(*chosen)
+        result = query.collect()
+    except ValueError as e:
+        console.print(f"[bold red]Invalid query:[/bold red] {escape(str(e))}")
+        return -1
+    console.print(query.explain(), markup=False, highlight=False)
+    rows = result.to_rows()
+    stats = result.stats
+    if not rows:
+        console.print(f"[yellow]No rows match this filter ({stats['rows_scanned']} scanned).[/yellow]")
+        return 0
+    console.print(build_query_table(
+        rows[:show], title=f"Query — {escape(expression)}",
+        caption=f"{stats['rows_matched']} of {stats['rows_scanned']} rows matched"
+                + (f"; showing {show}" if len(rows) > show else ""),
+    ))
+    if output:
+        export_to_csv(rows, output)
+    return len(rows)
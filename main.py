@@ -5,7 +5,7 @@ Authors:
 """
 
 from app.cli import run_menu
-from app.showcase import run_showcase
+from app.showcase import run_cohort, run_query, run_showcase
 
 CONFIG_PATH = "config.json"
 
@@ -13,5 +13,21 @@ if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1 and sys.argv[1] == "--cli":
         run_menu()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--cohort":
+        # python main.py --cohort [term.csv | "data/terms/*.csv" ...]
+        run_cohort(CONFIG_PATH, sys.argv[2:] or None)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--query":
+        # python main.py --query "final < 60 and section startswith 'BSIT 2'"
+        #                [--csv roster.csv] [--select a,b,c] [--out matches.csv] [--show 20]
+        import argparse
+        parser = argparse.ArgumentParser(prog="main.py --query")
+        parser.add_argument("expression")
+        parser.add_argument("--csv", dest="csv_path")
+        parser.add_argument("--select", type=lambda v: [c.strip() for c in v.split(",") if c.strip()])
+        parser.add_argument("--out", dest="output")
+        parser.add_argument("--show", type=int, default=20)
+        args = parser.parse_args(sys.argv[2:])
+        matched = run_query(CONFIG_PATH, args.expression, args.csv_path, args.select, args.output, args.show)
+        sys.exit(1 if matched < 0 else 0)
     else:
         run_showcase(CONFIG_PATH)
\ No newline at end of file
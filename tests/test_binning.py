@@ -0,0 +1,50 @@
+"""Tests for configurable letter-grade binning.
+
+Authors:
+- John Christian Linaban
+"""
+
+import numpy as np
+
+from app.core import group_students_by_section
+from app.analytics.binning import LetterBins, assign_letters, section_distributions, with_letters
+from app.analytics.stats import calculate_distribution, compute_weighted_grades
+from tests.test_numpy_stats import _mock_students, _weights
+
+PLUS_MINUS = {"A": 93, "A-": 90, "B+": 87, "B": 83, "B-": 80, "C+": 77, "C": 73, "C-": 70, "D": 60}
+
+
+def _reference_letter(grade, thresholds):
+	for letter, cutoff in sorted(thresholds.items(), key=lambda kv: kv[1], reverse=True):
+		if round(grade) >= cutoff:
+			return letter
+	return "-D"
+
+
+def test_plus_minus_scheme_letters_and_counts():
+	students = compute_weighted_grades(_mock_students(), _weights())
+	grades = [s["weighted_grade"] for s in students]
+	letters = assign_letters(grades + [None], PLUS_MINUS)
+	assert letters[:-1].tolist() == [_reference_letter(g, PLUS_MINUS) for g in grades]
+	assert letters[-1] == ""
+
+	dist = calculate_distribution(students, PLUS_MINUS)
+	assert list(dist) == list(PLUS_MINUS) + ["-D"]
+	for letter in dist:
+		assert dist[letter] == sum(_reference_letter(g, PLUS_MINUS) == letter for g in grades)
+	assert LetterBins.from_thresholds(PLUS_MINUS).letter_for(89.5) == "A-"
+	assert with_letters(students[:3], PLUS_MINUS)[0]["letter"] == letters[0]
+	assert "letter" not in students[0]
+
+
+def test_grouped_distributions_match_per_section():
+	students = compute_weighted_grades(_mock_students(), _weights())
+	sections = group_students_by_section(students)
+	grouped = section_distributions(sections, PLUS_MINUS)
+	assert list(grouped) == list(sections)
+	for name, studs in sections.items():
+		assert grouped[name] == calculate_distribution(studs, PLUS_MINUS)
+
+	bins = LetterBins.from_thresholds({"A": 90, "B": 80, "C": 70, "D": 60})
+	counts = bins.grouped_counts(np.array([95.0, np.nan, 59.4, 59.5]), np.array([0, 0, 1, 1]), 3)
+	assert counts.tolist() == [[0, 0, 0, 0, 1], [1, 1, 0, 0, 0], [0, 0, 0, 0, 0]]
@@ -0,0 +1,48 @@
+"""Tests for vectorized bootstrap confidence intervals.
+
+Authors:
+- John Christian Linaban
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from app.analytics.bootstrap import bootstrap_intervals, section_intervals
+from app.analytics.stats import compute_weighted_grades
+from tests.test_numpy_stats import _mock_students, _weights
+
+
+def test_intervals_bracket_estimates_and_are_seeded():
+	sections = {}
+	for s in compute_weighted_grades(_mock_students(), _weights()):
+		sections.setdefault(s["section"], []).append(s)
+	first = section_intervals(sections, n_resamples=2000, seed=7)
+	second = section_intervals(sections, n_resamples=2000, seed=7)
+	assert first == second
+	assert list(first) == list(sections)
+	for name, ci in first.items():
+		grades = np.array([s["weighted_grade"] for s in sections[name]])
+		assert ci.n == grades.size
+		assert ci.mean == pytest.approx(grades.mean())
+		assert ci.median == pytest.approx(np.median(grades))
+		assert ci.mean_low <= ci.mean <= ci.mean_high
+		assert ci.median_low <= ci.median_high
+
+
+def test_interval_width_and_scale():
+	rng = np.random.default_rng(0)
+	groups = {f"S{i}": rng.normal(75, 10, size=int(rng.integers(20, 60))) for i in range(300)}
+	groups["small"] = [55.0, 65.0, 75.0, 85.0, 95.0]
+	groups["empty"] = [None, None]
+	start = time.perf_counter()
+	result = bootstrap_intervals(groups, n_resamples=10_000)
+	assert time.perf_counter() - start < 10.0
+
+	# Standard error shrinks with n: the 5-student section gets the widest mean interval
+	widths = {name: ci.mean_high - ci.mean_low for name, ci in result.items() if ci.n}
+	assert max(widths, key=widths.get) == "small"
+	big = result["S0"]
+	assert big.mean_high - big.mean_low == pytest.approx(2 * 1.96 * np.std(groups["S0"]) / np.sqrt(big.n), rel=0.15)
+	assert result["empty"].n == 0 and np.isnan(result["empty"].mean_low)
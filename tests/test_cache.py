@@ -0,0 +1,44 @@
+"""Tests for the versioned analytics cache.
+
+Authors:
+- John Christian Linaban
+"""
+
+from app.core import delete_student, group_students_by_section, insert_student
+from app.analytics.cache import AnalyticsCache
+from app.analytics.insights import compare_sections
+from tests.test_numpy_stats import _mock_students
+
+
+def test_cache_hits_until_roster_changes():
+	students = _mock_students()
+	sections = group_students_by_section(students)
+	cache = AnalyticsCache(maxsize=4)
+	calls = []
+
+	def compute():
+		calls.append(1)
+		return compare_sections(sections)
+
+	first = cache.get_or_compute("compare_sections", compute)
+	assert cache.get_or_compute("compare_sections", compute) is first
+	assert (cache.hits, cache.misses, len(calls)) == (1, 1, 1)
+
+	# Any CRUD operation bumps the roster version and invalidates
+	assert delete_student(sections, students[0]["student_id"])
+	cache.get_or_compute("compare_sections", compute)
+	insert_student(sections, students[0])
+	cache.get_or_compute("compare_sections", compute)
+	assert (cache.hits, cache.misses, len(calls)) == (1, 3, 3)
+
+
+def test_cache_evicts_least_recently_used():
+	cache = AnalyticsCache(maxsize=2)
+	cache.get_or_compute("f", lambda: 1, section="A")
+	cache.get_or_compute("f", lambda: 2, section="B")
+	cache.get_or_compute("f", lambda: 1, section="A")
+	cache.get_or_compute("f", lambda: 3, section="C")
+	assert len(cache) == 2
+	assert cache.get_or_compute("f", lambda: "recomputed", section="B") == "recomputed"
+	assert cache.get_or_compute("f", lambda: "recomputed", section="C") == 3
+	assert cache.stats() == {"hits": 2, "misses": 4, "size": 2, "maxsize": 2}
@@ -0,0 +1,71 @@
+"""Tests for mini-batch k-means performance profiles.
+
+Authors:
+- John Christian Linaban
+"""
+
+import numpy as np
+import pytest
+
+from app.analytics.clustering import PROFILE_KEYS, cluster_students
+
+PLANTED = {
+	"strong": [92] * 5 + [90, 91, 96],
+	"weak exams": [86] * 5 + [52, 48, 92],
+	"absent": [72] * 5 + [70, 71, 40],
+}
+
+
+def _roster(per_profile=400, seed=0):
+	rng = np.random.default_rng(seed)
+	rows = []
+	for name, centre in PLANTED.items():
+		for i in range(per_profile):
+			scores = np.clip(np.array(centre) + rng.normal(0, 4, size=len(centre)), 0, 100)
+			row = dict(zip(PROFILE_KEYS, scores.tolist()), student_id=f"{name}-{i}", profile=name)
+			row["weighted_grade"] = float(scores.mean())
+			rows.append(row)
+	return rows
+
+
+def test_recovers_planted_profiles_deterministically():
+	rows = _roster()
+	result = cluster_students(rows, k=3, batch_size=256, seed=11)
+	again = cluster_students(rows, k=3, batch_size=256, seed=11)
+	assert np.array_equal(result.labels, again.labels)
+	assert result.sizes.tolist() == [400, 400, 400]
+	# Each planted profile lands in exactly one cluster, with the centroid in score units
+	for name, centre in PLANTED.items():
+		labels = {int(result.labels[i]) for i, r in enumerate(rows) if r["profile"] == name}
+		assert len(labels) == 1
+		assert result.centroids[labels.pop()] == pytest.approx(centre, abs=1.5)
+	profiles = {s["profile"] for s in result.summary()}
+	assert "exam ▼" in " ".join(profiles) and "attend ▼" in " ".join(profiles)
+
+
+def test_edge_cases():
+	rows = _roster(per_profile=2)
+	rows[0]["final"] = None
+	result = cluster_students(rows, k=10, init="random")
+	assert result.k == len(rows) and result.sizes.sum() == len(rows)
+	assert cluster_students([], k=3).k == 0
+	with pytest.raises(ValueError):
+		cluster_students(rows, init="forgy")
+
+
+def test_observed_rows_keep_missing_scores_out_of_profiles():
+	rows = _roster(per_profile=100, seed=2)
+	observed = [dict(r) for r in rows]
+	for r in observed[::3]:
+		r["final"] = None
+	# Grading turns the missing finals into 0; clustering must not see those zeros
+	graded = [dict(r, final=0.0 if o["final"] is None else r["final"]) for r, o in zip(rows, observed)]
+	result = cluster_students(graded, k=3, seed=5, observed=observed)
+	filled = cluster_students(graded, k=3, seed=5)
+	assert result.centroids[:, PROFILE_KEYS.index("final")].min() > 40
+	assert filled.mean[PROFILE_KEYS.index("final")] < result.mean[PROFILE_KEYS.index("final")]
+	assert result.grade_means == pytest.approx(
+		[np.mean([r["weighted_grade"] for r, l in zip(graded, result.labels) if l == j]) for j in range(3)]
+	)
+	with pytest.raises(ValueError):
+		cluster_students(graded, observed=observed[1:])
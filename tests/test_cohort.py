@@ -0,0 +1,79 @@
+"""Tests for multi-term cohort summaries and the summary cache.
+
+Authors:
+- John Christian Linaban
+"""
+
+import csv
+import os
+
+import pytest
+
+from app.analytics.cohort import COHORT_PERCENTILES, find_cohort_outliers, load_cohort
+from app.analytics.insights import find_outliers
+from app.analytics.stats import calculate_percentiles, compute_weighted_grades, get_average_grade
+from app.core import load_config, read_csv_data
+
+CONFIG = load_config(os.path.join(os.path.dirname(__file__), "..", "config.json"))
+SOURCE = os.path.join(os.path.dirname(__file__), "..", "data", "input_bsit.csv")
+
+
+def _write_terms(tmp_path, count):
+	with open(SOURCE, newline="") as f:
+		rows = list(csv.DictReader(f))
+	paths = []
+	for t in range(count):
+		path = tmp_path / f"term{t + 1}.csv"
+		with open(path, "w", newline="") as f:
+			writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+			writer.writeheader()
+			writer.writerows(rows[t:])  # each term drops one more student
+		paths.append(str(path))
+	return paths
+
+
+def test_term_summaries_match_stats_functions(tmp_path):
+	paths = _write_terms(tmp_path, 3)
+	cohort = load_cohort(paths, CONFIG, max_workers=2)
+	assert [t.term for t in cohort.terms] == ["term1", "term2", "term3"]
+	assert cohort.computed == 3
+	for path, term in zip(paths, cohort.terms):
+		students = compute_weighted_grades(read_csv_data(path, CONFIG), CONFIG["grade_weights"])
+		assert term.students == len(students)
+		assert term.average == pytest.approx(round(get_average_grade(students), 2))
+		assert sum(term.section_sizes.values()) == len(students)
+	trend = cohort.section_trend()
+	assert set(trend) == set(cohort.sections)
+
+
+def test_cache_skips_unchanged_files(tmp_path):
+	paths = _write_terms(tmp_path, 2)
+	cache = str(tmp_path / "cache.json")
+	first = load_cohort(paths, CONFIG, cache_path=cache, max_workers=1)
+	second = load_cohort(paths, CONFIG, cache_path=cache, max_workers=1)
+	assert (second.cached, second.computed) == (2, 0)
+	assert second.terms == first.terms
+
+	with open(paths[1], "a") as f:
+		f.write("Z999,Last,First,BSIT 2-1,90,90,90,90,90,90,90,90\n")
+	third = load_cohort(paths, CONFIG, cache_path=cache, max_workers=1)
+	assert (third.cached, third.computed) == (1, 1)
+	assert third.terms[1].students == first.terms[1].students + 1
+
+
+def test_merged_sketch_answers_cohort_percentiles_and_outliers(tmp_path):
+	paths = _write_terms(tmp_path, 2)
+	cache = str(tmp_path / "cache.json")
+	graded = {p: compute_weighted_grades(read_csv_data(p, CONFIG), CONFIG["grade_weights"]) for p in paths}
+	everyone = [s for studs in graded.values() for s in studs]
+	first = load_cohort(paths, CONFIG, cache_path=cache, max_workers=2)
+	cached = load_cohort(paths, CONFIG, cache_path=cache, max_workers=1)
+	assert cached.cached == 2 and len(cached.sketch) == len(everyone)
+	# Below the sketch's first compaction the answers are exact
+	expected = calculate_percentiles(everyone, COHORT_PERCENTILES)
+	assert first.percentiles() == cached.percentiles() == expected
+
+	outliers = find_cohort_outliers(cached, CONFIG, chunk_size=7)
+	fenced = find_outliers(everyone)
+	assert sum(len(o) for o in outliers.values()) == len(fenced)
+	assert list(outliers) == ["term1", "term2"]
@@ -0,0 +1,108 @@
+"""Tests for the NaN-aware Pearson/Spearman correlation matrices.
+
+Authors:
+- John Christian Linaban
+"""
+
+import numpy as np
+import pytest
+
+from app.core import group_students_by_section
+from app.analytics.correlation import correlation_matrix, section_correlation_matrices
+from app.analytics.stats import compute_weighted_grades
+from tests.test_numpy_stats import _mock_students, _weights
+
+
+def _pairwise_reference(students, keys):
+	X = np.array([[np.nan if s.get(k) is None else s[k] for k in keys] for s in students], dtype=float)
+	ref = np.full((len(keys), len(keys)), np.nan)
+	for i in range(len(keys)):
+		for j in range(len(keys)):
+			both = ~np.isnan(X[:, i]) & ~np.isnan(X[:, j])
+			ref[i, j] = np.corrcoef(X[both, i], X[both, j])[0, 1]
+	return ref
+
+
+def test_pearson_matches_pairwise_complete_reference():
+	students = compute_weighted_grades(_mock_students(), _weights())
+	corr = correlation_matrix(students)
+	assert corr.values == pytest.approx(_pairwise_reference(students, corr.keys), abs=1e-9)
+	assert np.allclose(np.diag(corr.values), 1.0)
+	assert corr.counts[0, 0] == sum(s["quiz1"] is not None for s in students)
+
+
+def test_section_matrices_match_individual_runs():
+	students = compute_weighted_grades(_mock_students(), _weights())
+	sections = group_students_by_section(students)
+	for method in ("pearson", "spearman"):
+		batched = section_correlation_matrices(sections, method=method)
+		assert list(batched) == list(sections)
+		for name, studs in sections.items():
+			single = correlation_matrix(studs, method=method)
+			assert np.allclose(batched[name].values, single.values, equal_nan=True)
+			assert (batched[name].counts == single.counts).all()
+
+	# Without gaps Spearman is Pearson on the (average) ranks
+	complete = [s for s in students if None not in (s["quiz1"], s["quiz2"])]
+	spearman = correlation_matrix(complete, keys=("quiz1", "quiz2"), method="spearman")
+	ranks = []
+	for key in ("quiz1", "quiz2"):
+		v = np.array([s[key] for s in complete])
+		ranks.append([(v < x).sum() + ((v == x).sum() + 1) / 2 for x in v])
+	assert spearman.values[0, 1] == pytest.approx(np.corrcoef(*ranks)[0, 1])
+	with pytest.raises(ValueError):
+		correlation_matrix(students, method="kendall")
+
+
+def test_uneven_sections_with_ties_match_individual_runs():
+	rng = np.random.default_rng(3)
+	keys = ("quiz1", "quiz2", "midterm")
+	sections = {}
+	for s, size in enumerate([400] + [1, 2, 3] * 20):
+		rows = []
+		for i in range(size):
+			# Coarse scores so ties are common, plus some gaps
+			row = {k: float(rng.integers(60, 70)) if rng.random() > 0.1 else None for k in keys}
+			rows.append(dict(row, section=f"S{s}"))
+		sections[f"S{s}"] = rows
+	for method in ("pearson", "spearman"):
+		batched = section_correlation_matrices(sections, keys=keys, method=method)
+		for name, studs in sections.items():
+			single = correlation_matrix(studs, keys=keys, method=method)
+			assert np.allclose(batched[name].values, single.values, equal_nan=True)
+			assert (batched[name].counts == single.counts).all()
+	# Within a gap-free section, the batched Spearman equals Pearson on tie-averaged ranks
+	sections["S0"] = [dict(r, quiz1=r["quiz1"] or 65.0, quiz2=r["quiz2"] or 65.0) for r in sections["S0"]]
+	batched = section_correlation_matrices(sections, keys=("quiz1", "quiz2"), method="spearman")
+	ranks = []
+	for key in ("quiz1", "quiz2"):
+		v = np.array([s[key] for s in sections["S0"]])
+		ranks.append([(v < x).sum() + ((v == x).sum() + 1) / 2 for x in v])
+	assert batched["S0"].values[0, 1] == pytest.approx(np.corrcoef(*ranks)[0, 1])
+
+
+def test_observed_rows_keep_missing_exams_out_of_pairs():
+	observed = _mock_students()
+	for r in observed:
+		r["final"] = r["midterm"]
+	for r in observed[::5]:
+		r["final"] = None
+	graded = compute_weighted_grades([dict(r) for r in observed], _weights())
+	keys = ("midterm", "final", "weighted_grade")
+	filled = correlation_matrix(graded, keys=keys)
+	corr = correlation_matrix(graded, keys=keys, observed=observed)
+	# The zero-filled finals drag r well below the true 1.0
+	assert filled.values[0, 1] < 0.95
+	assert corr.values[0, 1] == pytest.approx(1.0)
+	assert corr.counts[0, 1] == sum(r["final"] is not None and r["midterm"] is not None for r in observed)
+	# weighted_grade is only on the graded rows
+	assert corr.counts[2, 2] == len(graded)
+
+	sections = group_students_by_section(graded)
+	by_section = group_students_by_section(observed)
+	batched = section_correlation_matrices(sections, keys=keys, observed=by_section)
+	for name, studs in sections.items():
+		single = correlation_matrix(studs, keys=keys, observed=by_section[name])
+		assert np.allclose(batched[name].values, single.values, equal_nan=True)
+	with pytest.raises(ValueError):
+		correlation_matrix(graded, observed=observed[1:])
@@ -0,0 +1,63 @@
+"""Tests for the vectorized multi-method curve engine.
+
+Authors:
+- John Christian Linaban
+"""
+
+import copy
+import time
+
+import numpy as np
+import pytest
+
+from app.analytics.curves import CURVE_METHODS, curve_grades, curve_impact
+from app.analytics.stats import apply_grade_curve, calculate_distribution, compute_weighted_grades
+from tests.test_numpy_stats import _mock_students, _weights
+
+THRESHOLDS = {"A": 90, "B": 80, "C": 70, "D": 60}
+
+
+def test_flat_and_normalize_match_apply_grade_curve():
+	students = compute_weighted_grades(_mock_students(), _weights())
+	before = copy.deepcopy(students)
+	grades = np.array([s["weighted_grade"] for s in students])
+	flat = curve_grades(grades, "flat", points=5.0)
+	normalize = curve_grades(grades, "normalize", target_max=100.0)
+	assert students == before  # no mutation
+
+	legacy_flat = [s["curved_grade"] for s in apply_grade_curve(copy.deepcopy(students), "flat", 5.0)]
+	legacy_norm = [s["curved_grade"] for s in apply_grade_curve(copy.deepcopy(students), "normalize", 100.0)]
+	assert flat.tolist() == pytest.approx(legacy_flat)
+	assert normalize.tolist() == pytest.approx(legacy_norm)
+
+
+def test_rescaling_methods_and_impact():
+	rng = np.random.default_rng(3)
+	grades = np.round(np.clip(rng.normal(68, 9, size=5000), 0, 100), 2)
+	grades[::50] = np.nan
+
+	z = curve_grades(grades, "zscore", target_mean=75.0, target_sd=8.0)
+	assert np.nanmean(z) == pytest.approx(75.0, abs=0.1)
+	assert np.nanstd(z) == pytest.approx(8.0, abs=0.1)
+	assert np.isnan(z[::50]).all()
+
+	anchored = curve_grades(grades, "percentile", percentile=50, target=75.0)
+	assert np.nanmedian(anchored) == pytest.approx(75.0, abs=0.05)
+	assert np.allclose(curve_grades(grades, "sqrt"), np.round(10 * np.sqrt(grades), 2), equal_nan=True)
+
+	impact = curve_impact(grades, THRESHOLDS, 70.0)
+	assert impact.methods == ["original"] + list(CURVE_METHODS)
+	for k, name in enumerate(impact.methods):
+		col = impact.curved[:, k]
+		rows = [{"weighted_grade": float(g)} for g in col if not np.isnan(g)]
+		assert impact.distributions[name] == calculate_distribution(rows, THRESHOLDS)
+		assert impact.at_risk[name] == int(np.sum(col[~np.isnan(col)] < 70.0))
+	assert impact.raised["original"] == 0
+	assert impact.at_risk["flat"] < impact.at_risk["original"]
+
+	big = np.tile(grades, 200)
+	t0 = time.perf_counter()
+	curve_impact(big, THRESHOLDS, 70.0)
+	print(f"Timing -> curve_impact on {big.size} grades: {time.perf_counter() - t0:.3f}s")
+	with pytest.raises(ValueError):
+		curve_grades(grades, "bell")
@@ -0,0 +1,60 @@
+"""Tests for the filter expression language.
+
+Authors:
+- John Christian Linaban
+"""
+
+import os
+
+import pytest
+
+from app.analytics.columnar import SCORE_KEYS, TEXT_KEYS, build_columns
+from app.analytics.expressions import filter_indices, parse_filter
+from app.analytics.query import scan
+from app.core import load_config, read_csv_data
+
+CONFIG = load_config(os.path.join(os.path.dirname(__file__), "..", "config.json"))
+SOURCE = os.path.join(os.path.dirname(__file__), "..", "data", "input_bsit.csv")
+
+
+def test_masks_match_python_reference_and_scan():
+	rows = read_csv_data(SOURCE, CONFIG)
+	cols = build_columns(rows, numeric_keys=SCORE_KEYS, text_keys=TEXT_KEYS)
+	cases = {
+		'final > midterm + 5 and section startswith "BSIT 2"':
+			lambda r: r["final"] is not None and r["midterm"] is not None and r["final"] > r["midterm"] + 5 and r["section"].startswith("BSIT 2"),
+		"60 <= final < 75 or final is None":
+			lambda r: r["final"] is None or 60 <= r["final"] < 75,
+		'section in ["BSIT 2-1", "BSIT 2-3"] and not (quiz1 > 80)':
+			lambda r: r["section"] in ("BSIT 2-1", "BSIT 2-3") and not (r["quiz1"] is not None and r["quiz1"] > 80),
+		'last_name.contains("son") or first_name endswith "a"':
+			lambda r: "son" in r["last_name"] or r["first_name"].endswith("a"),
+	}
+	frame = scan(SOURCE, CONFIG)
+	for text, reference in cases.items():
+		expected = [i for i, r in enumerate(rows) if reference(r)]
+		assert filter_indices(text, cols).tolist() == expected, text
+		# The same filter pushed into the CSV reader picks the same students
+		pushed = frame.filter(parse_filter(text, frame.schema())).select("student_id").collect()
+		assert list(pushed.column("student_id")) == [rows[i]["student_id"] for i in expected], text
+
+
+@pytest.mark.parametrize("text", [
+	'__import__("os").system("echo hi")',
+	"final.__class__ == 1",
+	"(lambda: 1)() == 1",
+	"final[0] > 1",
+	"final < 60 and",
+	"final",
+	"final + section > 1",
+	'final < "60"',
+	"grade > 1",
+	"final in [1, 'a']",
+	"final is 0",
+	"True",
+	"",
+])
+def test_rejects_unsafe_or_ill_typed_filters(text):
+	schema = {**{k: "str" for k in TEXT_KEYS}, **{k: "num" for k in SCORE_KEYS}}
+	with pytest.raises(ValueError):
+		parse_filter(text, schema)
@@ -0,0 +1,40 @@
+"""Tests for the shared histogram service.
+
+Authors:
+- John Christian Linaban
+"""
+
+import numpy as np
+
+from app.analytics.cache import AnalyticsCache
+from app.analytics.histogram import HistogramService, histograms_for
+from app.analytics.stats import compute_weighted_grades
+from app.core import bump_roster_version
+from tests.test_numpy_stats import _mock_students, _weights
+
+
+def test_counts_match_plt_hist_binning():
+	students = compute_weighted_grades(_mock_students(), _weights())
+	hists = histograms_for(students, ["quiz2", "weighted_grade"], bins=10)
+	for key, hist in hists.items():
+		values = [s[key] for s in students if s.get(key) is not None]
+		counts, edges = np.histogram(values, bins=10)
+		assert hist.counts.tolist() == counts.tolist()
+		assert np.allclose(hist.edges, edges)
+		assert hist.total + hist.missing == len(students)
+	assert hists["quiz2"].missing > 0
+
+
+def test_service_caches_per_key_section_bins_and_version():
+	students = compute_weighted_grades(_mock_students(), _weights())
+	cache = AnalyticsCache()
+	service = HistogramService(cache)
+	first = service.get_many(students, ["quiz1", "final"])
+	assert cache.misses == 2
+	assert service.get(students, "quiz1") is first["quiz1"]
+	assert cache.hits == 1
+	service.get(students, "quiz1", bins=20)
+	service.get(students[:10], "quiz1", section="BSIT-1A")
+	assert cache.misses == 4
+	bump_roster_version()
+	assert service.get(students, "quiz1") is not first["quiz1"]
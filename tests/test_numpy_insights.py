@@ -0,0 +1,132 @@
+"""Tests comparing NumPy-based and pure-Python insight functions.
+
+Authors:
+- John Christian Linaban
+"""
+
+import time
+
+import pytest
+
+from app.analytics import insights
+from app.analytics import numpy_insights
+from app.analytics.engine import get_engine
+from app.analytics.stats import compute_weighted_grades
+from app.core import group_students_by_section
+from tests.test_numpy_stats import _mock_students, _weights
+
+
+def _graded():
+	return compute_weighted_grades(_mock_students(), _weights())
+
+
+def _ids(rows):
+	return [r["student_id"] for r in rows]
+
+
+def _assert_same(py, np_):
+	"""Exact match for ints/strings/lists, approx for floats, recursing into dicts."""
+	if isinstance(py, dict):
+		assert py.keys() == np_.keys()
+		for k in py:
+			_assert_same(py[k], np_[k])
+	elif isinstance(py, float):
+		assert np_ == pytest.approx(py)
+	else:
+		assert py == np_
+
+
+def test_row_selecting_insights_match():
+	students = _graded()
+	assert _ids(numpy_insights.find_outliers_numpy(students)) == _ids(insights.find_outliers(students))
+	for cutoff in (60, 70.0, "75"):
+		assert _ids(numpy_insights.get_at_risk_students_numpy(students, cutoff)) == _ids(
+			insights.get_at_risk_students(students, cutoff)
+		)
+	assert numpy_insights.get_at_risk_students_numpy(students, "bad") == []
+
+
+def test_dict_insights_match():
+	students = _graded()
+	pairs = [
+		(insights.track_midterm_to_final_improvement, numpy_insights.track_midterm_to_final_improvement_numpy),
+		(insights.find_hardest_topic, numpy_insights.find_hardest_topic_numpy),
+	]
+	for py_fn, np_fn in pairs:
+		_assert_same(py_fn(students), np_fn(students))
+	for threshold in (70.0, 80.0, 101.0):
+		_assert_same(
+			insights.correlate_attendance_and_grades(students, threshold),
+			numpy_insights.correlate_attendance_and_grades_numpy(students, threshold),
+		)
+	py_avgs, py_counts, py_hardest, py_lowest = insights.get_quiz_averages(students)
+	np_avgs, np_counts, np_hardest, np_lowest = numpy_insights.get_quiz_averages_numpy(students)
+	_assert_same(py_avgs, np_avgs)
+	assert (py_counts, py_hardest) == (np_counts, np_hardest)
+	assert np_lowest == pytest.approx(py_lowest)
+
+
+@pytest.mark.parametrize("rows", [
+	[{"quiz2": 50.0, "quiz1": 50.0}],
+	[{"quiz2": 80.0, "quiz10": 80.0, "quiz1": 90.0}, {"quiz2": 70.0, "quiz10": 70.0}],
+])
+def test_quiz_order_and_ties_follow_first_appearance(rows):
+	py = insights.get_quiz_averages(rows)
+	np_ = numpy_insights.get_quiz_averages_numpy(rows)
+	assert list(np_[0]) == list(py[0])
+	assert np_[2] == py[2] == "quiz2"
+
+
+def test_section_insights_match():
+	sections = group_students_by_section(_graded())
+
+	t0 = time.perf_counter()
+	py_cmp = insights.compare_sections(sections)
+	py_avg = insights.get_sections_quiz_averages(sections)
+	t1 = time.perf_counter()
+	np_cmp = numpy_insights.compare_sections_numpy(sections)
+	np_avg = numpy_insights.get_sections_quiz_averages_numpy(sections)
+	t2 = time.perf_counter()
+
+	_assert_same(py_cmp, np_cmp)
+	_assert_same(py_avg[0], np_avg[0])
+	assert py_avg[1] == np_avg[1]
+	_assert_same(py_avg[2], np_avg[2])
+	single = {"BSIT-1A": sections["BSIT-1A"]}
+	_assert_same(insights.compare_sections(single), numpy_insights.compare_sections_numpy(single))
+
+	py_time = t1 - t0
+	np_time = t2 - t1
+	ratio = py_time / np_time if np_time > 0 else float('inf')
+	print(f"Timing -> pure Python: {py_time:.6f}s | NumPy: {np_time:.6f}s | speedup: {ratio:.2f}x")
+
+
+def test_engine_switch():
+	assert get_engine().find_outliers is insights.find_outliers
+	numpy_engine = get_engine({"analytics": {"engine": "numpy"}})
+	assert numpy_engine.name == "numpy"
+	assert numpy_engine.compare_sections is numpy_insights.compare_sections_numpy
+	assert get_engine({"analytics": {"engine": "fortran"}}).name == "python"
+	with pytest.raises(ValueError):
+		get_engine("fortran")
+
+
+def test_grouped_quiz_comparison_scales_with_sections():
+	students = _graded()
+	# Spread the same roster over 500 sections, leaving one section empty
+	for i, s in enumerate(students):
+		s["section"] = f"SEC-{i % 500:03d}"
+	sections = group_students_by_section(students)
+	sections["SEC-EMPTY"] = []
+
+	t0 = time.perf_counter()
+	py_avg = insights.get_sections_quiz_averages(sections)
+	t1 = time.perf_counter()
+	np_avg = numpy_insights.get_sections_quiz_averages_numpy(sections)
+	t2 = time.perf_counter()
+
+	_assert_same(py_avg[0], np_avg[0])
+	assert py_avg[1] == np_avg[1]
+	_assert_same(py_avg[2], np_avg[2])
+	assert np_avg[2]["quiz1"]["section"] == "SEC-EMPTY"
+	print(f"500 sections -> pure Python: {t1 - t0:.6f}s | grouped NumPy: {t2 - t1:.6f}s")
@@ -123,3 +123,49 @@ def test_numpy_weighted_grades_matches_python_version():
 	ratio = py_time / np_time if np_time > 0 else float('inf')
 	print(f"Timing -> pure Python: {py_time:.6f}s | NumPy: {np_time:.6f}s | speedup: {ratio:.2f}x")
 
+
+
+def test_top_bottom_selection_matches_full_sort():
+	from app.analytics.stats import get_top_n_students, get_bottom_n_students
+	from app.analytics.numpy_stats import select_n_indices
+
+	students = compute_weighted_grades_py(_mock_students(), _weights())
+	# Force ties so the student_id tie-break is exercised
+	for s in students[:50]:
+		s['weighted_grade'] = 95.0
+	ids = np.array([s['student_id'] for s in students])
+	grades = np.array([s['weighted_grade'] for s in students], dtype=float)
+
+	for n in (1, 10, 60, len(students) + 5):
+		top_ref = sorted(students, key=lambda s: (-s['weighted_grade'], s['student_id']))[:n]
+		bottom_ref = sorted(students, key=lambda s: (s['weighted_grade'], s['student_id']))[:n]
+		assert get_top_n_students(students, n) == top_ref
+		assert get_bottom_n_students(students, n) == bottom_ref
+		assert [students[i] for i in select_n_indices(grades, ids, n, largest=True)] == top_ref
+		assert [students[i] for i in select_n_indices(grades, ids, n, largest=False)] == bottom_ref
+
+	assert get_top_n_students(students, 0) == []
+	assert select_n_indices(grades, ids, 0).size == 0
+
+
+def test_batch_and_section_percentiles_match_single_calls():
+	from app.analytics.stats import calculate_percentile, calculate_percentiles
+	from app.analytics.numpy_stats import percentiles_numpy, section_percentiles_numpy
+	from app.core import group_students_by_section
+
+	students = compute_weighted_grades_py(_mock_students(), _weights())
+	percentiles = [0, 1, 10, 25, 50, 75, 90, 99, 100]
+	expected = {p: calculate_percentile(students, p) for p in percentiles}
+
+	assert calculate_percentiles(students, percentiles) == expected
+	grades = np.array([s['weighted_grade'] for s in students], dtype=float)
+	assert percentiles_numpy(grades, percentiles) == expected
+
+	sections = group_students_by_section(students)
+	sections["EMPTY"] = []
+	t0 = time.perf_counter()
+	table = section_percentiles_numpy(sections, percentiles)
+	t1 = time.perf_counter()
+	for name, studs in sections.items():
+		assert table[name] == {p: calculate_percentile(studs, p) for p in percentiles}
+	print(f"Section percentile table ({len(sections)} sections): {t1 - t0:.6f}s")
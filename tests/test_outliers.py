@@ -0,0 +1,72 @@
+"""Tests for grouped multi-method outlier detection.
+
+Authors:
+- John Christian Linaban
+"""
+
+import numpy as np
+import pytest
+
+from app.analytics.insights import find_outliers
+from app.analytics.outliers import grouped_outliers
+from app.analytics.stats import compute_weighted_grades
+from tests.test_numpy_stats import _mock_students, _weights
+
+
+def test_iqr_matches_find_outliers_per_section():
+	students = compute_weighted_grades(_mock_students(), _weights())
+	result = grouped_outliers(students, key="weighted_grade", method="iqr")
+	flagged = {id(students[i]) for i in result.indices}
+	expected = set()
+	sections = {}
+	for s in students:
+		sections.setdefault(s["section"], []).append(s)
+	for studs in sections.values():
+		expected |= {id(s) for s in find_outliers(studs)}
+	assert flagged == expected
+	assert all(reason in ("above", "below") for reason in result.reasons)
+
+
+def test_zscore_and_mad_flag_planted_values():
+	rng = np.random.default_rng(4)
+	students = []
+	for sec in ("A", "B", "C"):
+		for i, v in enumerate(rng.normal(70, 5, size=200)):
+			students.append({"student_id": f"{sec}{i}", "section": sec, "quiz1": float(v)})
+	students[5]["quiz1"] = 140.0  # far above section A
+	students[250]["quiz1"] = 5.0  # far below section B
+	students[450]["quiz1"] = None  # missing values are never flagged
+	for method in ("zscore", "mad"):
+		result = grouped_outliers(students, key="quiz1", method=method)
+		rows = {r["student_id"]: r for r in result.rows(students)}
+		assert rows["A5"]["outlier_reason"] == "above"
+		assert rows["B50"]["outlier_reason"] == "below"
+		assert "C50" not in rows
+		assert rows["A5"]["outlier_score"] > result.threshold
+	z = grouped_outliers(students, key="quiz1", method="zscore")
+	vals = np.array([s["quiz1"] for s in students[:200]])
+	i = list(z.indices).index(5)
+	assert z.scores[i] == pytest.approx(abs(vals[5] - vals.mean()) / vals.std())
+	with pytest.raises(ValueError):
+		grouped_outliers(students, method="grubbs")
+
+
+def test_observed_rows_keep_missing_exams_unflagged():
+	rng = np.random.default_rng(7)
+	rows = []
+	for sec in ("A", "B"):
+		for i, v in enumerate(rng.normal(80, 4, size=60)):
+			row = {f"quiz{q}": 80.0 for q in range(1, 6)}
+			rows.append(dict(row, student_id=f"{sec}{i}", section=sec, midterm=78.0, final=float(v), attendance_percent=90.0))
+	for r in rows[::15]:
+		r["final"] = None
+	graded = compute_weighted_grades([dict(r) for r in rows], _weights())
+	# Grading turns the missing finals into 0, which the IQR fences then flag
+	filled = grouped_outliers(graded, key="final")
+	result = grouped_outliers(graded, key="final", observed=rows)
+	assert {graded[i]["student_id"] for i in filled.indices} >= {r["student_id"] for r in rows[::15]}
+	assert all(rows[i]["final"] is not None for i in result.indices)
+	# weighted_grade always comes from the graded rows
+	assert grouped_outliers(graded, observed=rows).indices.tolist() == grouped_outliers(graded).indices.tolist()
+	with pytest.raises(ValueError):
+		grouped_outliers(graded, key="final", observed=rows[1:])
@@ -0,0 +1,48 @@
+"""Tests for parallel per-section analytics.
+
+Authors:
+- John Christian Linaban
+"""
+
+import pytest
+
+from app.analytics.insights import get_quiz_averages
+from app.analytics.parallel import run_section_analytics
+from app.analytics.stats import calculate_distribution, compute_weighted_grades, get_bottom_n_students, get_top_n_students
+from app.core import sort_students
+from tests.test_numpy_stats import _mock_students, _weights
+
+THRESHOLDS = {"A": 90, "B": 80, "C": 70, "D": 60}
+SORT_BY = {"weighted_grade": True, "last_name": False, "first_name": False}
+
+
+def _sections():
+	sections = {}
+	for s in compute_weighted_grades(_mock_students(), _weights()):
+		sections.setdefault(s["section"], []).append(s)
+	return sections
+
+
+def test_serial_matches_reference_functions():
+	sections = _sections()
+	results = run_section_analytics(sections, THRESHOLDS, sort_by=SORT_BY, n=3, max_workers=1)
+	assert list(results) == list(sections)
+	for name, studs in sections.items():
+		res = results[name]
+		for key, reverse in SORT_BY.items():
+			assert res["sort"][key] == sort_students(studs, key, reverse=reverse)
+		assert res["top"] == get_top_n_students(studs, 3)
+		assert res["bottom"] == get_bottom_n_students(studs, 3)
+		assert res["distribution"] == calculate_distribution(studs, THRESHOLDS)
+		expected = get_quiz_averages(studs)
+		assert res["hardest_topic"][0] == pytest.approx(expected[0])
+		assert res["hardest_topic"][1:3] == expected[1:3]
+
+
+def test_process_pool_matches_serial():
+	sections = _sections()
+	serial = run_section_analytics(sections, THRESHOLDS, sort_by=SORT_BY, max_workers=1)
+	parallel = run_section_analytics(sections, THRESHOLDS, sort_by=SORT_BY, max_workers=2, min_rows=0)
+	assert parallel == serial
+	with pytest.raises(ValueError):
+		run_section_analytics(sections, THRESHOLDS, analytics=("median",))
@@ -0,0 +1,48 @@
+"""Tests for the vectorized final exam planner.
+
+Authors:
+- John Christian Linaban
+"""
+
+import numpy as np
+
+from app.analytics.planner import IMPOSSIBLE, NEEDED, SECURED, plan_final_scores
+from app.analytics.stats import compute_weighted_grades
+from tests.test_numpy_stats import _mock_students, _weights
+
+LETTERS = {"A": 90, "B": 80, "C": 70, "D": 60}
+
+
+def test_required_final_reaches_exact_threshold():
+	students = _mock_students()
+	weights = _weights()
+	plan = plan_final_scores(students, weights, LETTERS)
+	assert plan.letters == ["A", "B", "C", "D"]
+	assert plan.required.shape == plan.status.shape == (len(students), 4)
+	for i in range(0, len(students), 53):
+		for j, cutoff in enumerate(plan.thresholds):
+			code = plan.status[i, j]
+			if code != NEEDED:
+				continue
+			needed = float(plan.required[i, j])
+			graded = compute_weighted_grades([dict(students[i], final=needed)], weights)[0]
+			assert graded["weighted_grade"] >= cutoff
+			# One hundredth less falls short before compute_weighted_grades rounds
+			assert plan.pre_final[i] + weights["final"] * (needed - 0.01) < cutoff
+			assert 0 < needed <= 100
+
+
+def test_secured_and_impossible_cells():
+	perfect = {"student_id": "1", "section": "A", "quiz1": 100, "quiz2": 100, "quiz3": 100, "quiz4": 100, "quiz5": 100,
+		"midterm": 100, "final": None, "attendance_percent": 100}
+	absent = dict(perfect, student_id="2", quiz1=None, quiz2=None, quiz3=None, quiz4=None, quiz5=None, midterm=10, attendance_percent=20)
+	weights = {"quizzes_total": 0.2, "midterm": 0.35, "final": 0.35, "attendance": 0.1}
+	plan = plan_final_scores([perfect, absent], weights, LETTERS)
+	# 65 points are in hand before the final: D is secured, A needs 25/0.35 -> 71.43
+	assert plan.status[0].tolist() == [NEEDED, NEEDED, NEEDED, SECURED]
+	assert plan.cell(0, 0) == 71.43
+	assert plan.status[1].tolist() == [IMPOSSIBLE] * 4
+	rows = plan.rows([perfect, absent])
+	assert rows[0]["final_for_C"] == 14.29 and rows[0]["final_for_D"] == "secured" and rows[1]["final_for_D"] == "impossible"
+	assert plan.counts()["D"] == {"secured": 1, "needed": 0, "impossible": 1}
+	assert np.isinf(plan_final_scores([absent], dict(weights, final=0.0), LETTERS).required).all()
@@ -0,0 +1,65 @@
+"""Tests for the batched least-squares final exam predictor.
+
+Authors:
+- John Christian Linaban
+"""
+
+import numpy as np
+import pytest
+
+from app.analytics.prediction import COURSE, FEATURE_KEYS, fit_final_model, predicted_at_risk
+from app.analytics.stats import compute_weighted_grades
+
+WEIGHTS = {"quizzes_total": 0.2, "midterm": 0.35, "final": 0.35, "attendance": 0.1}
+
+
+def _roster(seed=0):
+	rng = np.random.default_rng(seed)
+	rows = []
+	for sec, n in enumerate((60, 45, 30, 6)):
+		beta = rng.normal(0.12, 0.05, size=len(FEATURE_KEYS))
+		for i in range(n):
+			x = rng.normal(72, 10, size=len(FEATURE_KEYS))
+			row = {"student_id": f"{sec}-{i}", "section": f"S{sec}"}
+			row.update(zip(FEATURE_KEYS, x.tolist()))
+			row["final"] = float(x @ beta + 8 + rng.normal(0, 2)) if i % 5 else None
+			rows.append(row)
+	return rows
+
+
+def test_section_fits_match_lstsq():
+	rows = _roster()
+	model = fit_final_model(rows)
+	assert model.sections == ["S0", "S1", "S2", "S3", COURSE]
+	for g, name in enumerate(model.sections[:3]):
+		train = [r for r in rows if r["section"] == name and r["final"] is not None]
+		A = np.column_stack([[[r[k] for k in FEATURE_KEYS] for r in train], np.ones(len(train))])
+		y = np.array([r["final"] for r in train])
+		solution, sse = np.linalg.lstsq(A, y, rcond=None)[:2]
+		assert model.coef[g] == pytest.approx(solution[:-1], abs=1e-6)
+		assert model.intercept[g] == pytest.approx(solution[-1], abs=1e-4)
+		assert model.rmse[g] == pytest.approx(np.sqrt(sse[0] / len(train)))
+	# The 6-student section has too few finals and borrows the course-wide fit
+	quality = model.quality()
+	assert quality[3]["model"] == "course-wide" and quality[-1]["model"] == "course"
+	assert model.coef[3] == pytest.approx(model.coef[-1])
+
+
+def test_predictions_and_at_risk_for_missing_finals():
+	rows = _roster()
+	rows[1]["quiz2"] = None
+	model = fit_final_model(rows)
+	predicted = model.predict(rows)
+	assert predicted.shape == (len(rows),) and ((predicted >= 0) & (predicted <= 100)).all()
+	g = model.sections.index("S0")
+	x = np.array([rows[1][k] if rows[1][k] is not None else model.feature_means[g, i] for i, k in enumerate(FEATURE_KEYS)])
+	assert predicted[1] == pytest.approx(x @ model.coef[g] + model.intercept[g])
+
+	students = compute_weighted_grades(rows, WEIGHTS)
+	flagged = predicted_at_risk(students, model, WEIGHTS, 100.0, observed=rows)
+	assert len(flagged) == sum(r["final"] is None for r in rows)
+	grades = [r["predicted_grade"] for r in flagged]
+	assert grades == sorted(grades)
+	first = flagged[0]
+	i = next(i for i, s in enumerate(students) if s["student_id"] == first["student_id"])
+	assert first["predicted_grade"] == pytest.approx(students[i]["weighted_grade"] + 0.35 * predicted[i], abs=0.01)
@@ -0,0 +1,97 @@
+"""Tests for lazy queries with pushdown into the CSV reader.
+
+Authors:
+- John Christian Linaban
+"""
+
+import csv
+import os
+
+import numpy as np
+import pytest
+
+from app.analytics.query import Expr, col, count, scan
+from app.analytics.stats import compute_weighted_grades
+from app.core import load_config, read_csv_data
+
+CONFIG = load_config(os.path.join(os.path.dirname(__file__), "..", "config.json"))
+SOURCE = os.path.join(os.path.dirname(__file__), "..", "data", "input_bsit.csv")
+
+
+def _messy_copy(tmp_path):
+	with open(SOURCE, newline="") as f:
+		rows = list(csv.DictReader(f))
+	rows[0]["last_name"] = " "  # skipped: required field blank
+	rows[1]["final"] = ""  # missing final
+	rows[2]["midterm"] = "105"  # out of range
+	rows[3]["quiz2"] = "abc"  # not a number
+	path = tmp_path / "messy.csv"
+	with open(path, "w", newline="") as f:
+		writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+		writer.writeheader()
+		writer.writerows(rows)
+	return str(path)
+
+
+def test_filtered_scan_matches_read_csv_data(tmp_path):
+	path = _messy_copy(tmp_path)
+	raw = read_csv_data(path, CONFIG)
+	graded = compute_weighted_grades([dict(r) for r in raw], CONFIG["grade_weights"])
+	chosen = [i for i, r in enumerate(raw) if r["section"] == "BSIT 2-1"]
+	keys = ["student_id", "quiz2", "midterm", "final"]
+	result = scan(path, CONFIG, chunk_size=7).filter(col("section") == "BSIT 2-1").select(*keys, "weighted_grade").collect()
+	# Missing scores stay missing; weighted_grade still counts them as 0
+	assert result.to_rows() == [dict({k: raw[i][k] for k in keys}, weighted_grade=graded[i]["weighted_grade"]) for i in chosen]
+	assert result.stats["rows_skipped"] == 1
+	assert result.stats["rows_matched"] == len(chosen)
+
+
+def test_pushdown_plan_and_grouped_aggregates(tmp_path):
+	path = _messy_copy(tmp_path)
+	query = (
+		scan(path, CONFIG)
+		.filter(col("final").is_not_null() & (col("midterm") >= 60))
+		.group_by("section")
+		.agg(n=count(), avg_final=col("final").mean(), top=col("final").max())
+		.sort("avg_final", descending=True)
+	)
+	plan = query.explain()
+	assert "columns: [section, midterm, final] of 12 in file" in plan
+	assert "filter: (final.is_not_null() & (midterm >= 60))" in plan
+	result = query.collect()
+	# Only the three columns were parsed, the filter columns for every row
+	assert result.stats["cells_converted"] < 3 * result.stats["rows_scanned"]
+
+	rows = [r for r in read_csv_data(path, CONFIG) if r["final"] is not None and r["midterm"] is not None and r["midterm"] >= 60]
+	by_section = {}
+	for r in rows:
+		by_section.setdefault(r["section"], []).append(r["final"])
+	expected = sorted(by_section.items(), key=lambda kv: -np.mean(kv[1]))
+	assert list(result.column("section")) == [name for name, _ in expected]
+	assert list(result.column("n")) == [len(v) for _, v in expected]
+	assert result.column("avg_final") == pytest.approx([np.mean(v) for _, v in expected])
+	assert result.column("top") == pytest.approx([max(v) for _, v in expected])
+
+	with pytest.raises(ValueError):
+		scan(path, CONFIG).select("final").filter(col("midterm") > 50).collect()
+
+
+def test_filter_after_limit_sees_only_limited_rows():
+	with open(SOURCE, newline="") as f:
+		first = list(csv.DictReader(f))[:5]
+	query = scan(SOURCE, CONFIG).limit(5).filter(col("section") == "BSIT 2-1").select("student_id")
+	assert "FILTER (section == 'BSIT 2-1')" in query.explain()
+	expected = [r["student_id"] for r in first if r["section"] == "BSIT 2-1"]
+	assert list(query.collect().column("student_id")) == expected
+
+
+def test_expr_is_abstract():
+	with pytest.raises(TypeError):
+		Expr()
+
+	class Partial(Expr):
+		def columns(self):
+			return set()
+
+	with pytest.raises(TypeError):
+		Partial()
@@ -0,0 +1,34 @@
+"""Tests for precomputed rank columns.
+
+Authors:
+- John Christian Linaban
+"""
+
+import numpy as np
+
+from app.analytics.ranking import RANK_COLUMNS, assign_ranks, group_ranks
+from app.analytics.stats import compute_weighted_grades
+from tests.test_numpy_stats import _mock_students, _weights
+
+
+def test_ties_share_competition_and_dense_ranks():
+	grades = [90, 85, 85, 70, None, 95, 85]
+	codes = [0, 0, 0, 0, 0, 1, 1]
+	competition, dense, pct = group_ranks(grades, codes)
+	assert competition.tolist() == [1, 2, 2, 4, 5, 1, 2]
+	assert dense.tolist() == [1, 2, 2, 3, 4, 1, 2]
+	assert pct.tolist() == [100.0, 80.0, 80.0, 40.0, 20.0, 100.0, 50.0]
+
+
+def test_assign_ranks_matches_brute_force():
+	students = assign_ranks(compute_weighted_grades(_mock_students(), _weights()))
+	assert all(all(col in s for col in RANK_COLUMNS) for s in students)
+	grades = np.array([s["weighted_grade"] for s in students])
+	sections = np.array([s["section"] for s in students])
+	for i in range(0, len(students), 97):
+		s = students[i]
+		same = sections == sections[i]
+		assert s["rank"] == 1 + int((grades > grades[i]).sum())
+		assert s["rank_dense"] == 1 + len(set(grades[grades > grades[i]]))
+		assert s["section_rank"] == 1 + int((grades[same] > grades[i]).sum())
+		assert s["section_rank_pct"] == round(float((grades[same] <= grades[i]).mean() * 100), 2)
@@ -0,0 +1,60 @@
+"""Tests for Monte Carlo failure probabilities.
+
+Authors:
+- John Christian Linaban
+"""
+
+import numpy as np
+import pytest
+
+from app.analytics.risk import simulate_failure_risk
+from app.analytics.stats import compute_weighted_grades
+
+WEIGHTS = {"quizzes_total": 0.2, "midterm": 0.35, "final": 0.35, "attendance": 0.1}
+SCORES = ("quiz1", "quiz2", "quiz3", "quiz4", "quiz5", "midterm", "final", "attendance_percent")
+
+
+def _roster(n_sections, per_section, missing_final=0.3, seed=0):
+	rng = np.random.default_rng(seed)
+	rows = []
+	for sec in range(n_sections):
+		for i in range(per_section):
+			row = {"student_id": f"{sec}-{i}", "section": f"S{sec}"}
+			row.update({key: float(v) for key, v in zip(SCORES, rng.normal(72, 12, size=len(SCORES)).clip(0, 100).round(1))})
+			if rng.random() < missing_final:
+				row["final"] = None
+			rows.append(row)
+	return rows
+
+
+def test_missing_final_matches_section_distribution():
+	raw = _roster(2, 200)
+	students = compute_weighted_grades(raw, WEIGHTS)
+	result = simulate_failure_risk(students, WEIGHTS, 70.0, n_draws=20_000, observed=raw)
+	for i, (s, r) in enumerate(zip(students, raw)):
+		p = result.probabilities[i]
+		if r["final"] is not None:
+			assert p == float(s["weighted_grade"] < 70.0)
+			continue
+		# Only the final is drawn, so P(fail) is the share of section finals below what is needed
+		finals = np.array([x["final"] for x in raw if x["section"] == r["section"] and x["final"] is not None])
+		needed = (70.0 - s["weighted_grade"]) / WEIGHTS["final"]
+		assert p == pytest.approx((finals < needed).mean(), abs=0.02)
+		assert result.missing_labels(i) == "final"
+	ranked = result.ranked(students)
+	probs = [r["fail_probability"] for r in ranked]
+	assert probs == sorted(probs, reverse=True) and min(probs) > 0
+
+
+def test_seeded_and_independent_of_worker_count():
+	raw = _roster(40, 15, missing_final=0.5)
+	for r in raw[::7]:
+		r["midterm"] = None
+	students = compute_weighted_grades(raw, WEIGHTS)
+	serial = simulate_failure_risk(students, WEIGHTS, 70.0, n_draws=2000, observed=raw, max_workers=1)
+	pooled = simulate_failure_risk(students, WEIGHTS, 70.0, n_draws=2000, observed=raw, max_workers=2, min_sections=0)
+	assert np.array_equal(serial.probabilities, pooled.probabilities)
+	# Without the raw rows only missing quizzes are visible; zero-filled finals count as 0
+	graded_only = simulate_failure_risk(students, WEIGHTS, 70.0, n_draws=2000)
+	assert not graded_only.missing.any()
+	assert graded_only.probabilities.sum() >= serial.probabilities.sum()
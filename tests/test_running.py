@@ -0,0 +1,68 @@
+"""Tests for running statistics kept in sync across insert/edit/delete.
+
+Authors:
+- John Christian Linaban
+"""
+
+import statistics
+
+import pytest
+
+from app.core import delete_student, group_students_by_section, insert_student
+from app.analytics.running import RunningStats
+from app.analytics.stats import calculate_distribution, compute_weighted_grades, get_average_grade
+from app.analytics.insights import get_quiz_averages
+from tests.test_numpy_stats import _mock_students, _weights
+
+THRESHOLDS = {"A": 90, "B": 80, "C": 70, "D": 60}
+
+
+def _assert_matches_recompute(stats, students, sections):
+	grades = [s["weighted_grade"] for s in students]
+	assert stats.average_grade() == pytest.approx(get_average_grade(students))
+	assert stats.variance() == pytest.approx(statistics.pvariance(grades))
+	assert stats.std_dev(sample=True) == pytest.approx(statistics.stdev(grades))
+	assert stats.distribution() == calculate_distribution(students, THRESHOLDS)
+	for section, studs in sections.items():
+		assert stats.average_grade(section) == pytest.approx(get_average_grade(studs))
+		assert stats.distribution(section) == calculate_distribution(studs, THRESHOLDS)
+		avgs, counts, hardest, lowest = get_quiz_averages(studs)
+		r_avgs, r_counts, r_hardest, r_lowest = stats.quiz_averages(section)
+		assert r_avgs == pytest.approx(avgs)
+		assert r_counts == counts
+		assert (r_hardest, r_lowest) == (hardest, pytest.approx(lowest))
+
+
+def test_running_stats_follow_crud():
+	students = compute_weighted_grades(_mock_students(), _weights())
+	base, extra = students[:-50], students[-50:]
+	sections = group_students_by_section(base)
+	stats = RunningStats.from_students(base, THRESHOLDS)
+	_assert_matches_recompute(stats, base, sections)
+
+	for s in extra:
+		insert_student(sections, s, running=stats)
+	for s in base[:100]:
+		assert delete_student(sections, s["student_id"], running=stats)
+	current = base[100:] + extra
+
+	# Edit: replace one record with a re-graded copy
+	old = current[0]
+	new = compute_weighted_grades([dict(old, quiz1=10.0, final=20.0)], _weights())[0]
+	sec_list = sections[old["section"]]
+	sec_list[sec_list.index(old)] = new
+	stats.replace(old, new)
+	current[0] = new
+
+	_assert_matches_recompute(stats, current, sections)
+
+
+def test_running_stats_empty_after_removing_everyone():
+	students = compute_weighted_grades(_mock_students()[:5], _weights())
+	stats = RunningStats.from_students(students, THRESHOLDS)
+	for s in students:
+		stats.remove(s)
+	assert stats.average_grade() == 0.0
+	assert stats.variance() == 0.0
+	assert sum(stats.distribution().values()) == 0
+	assert stats.quiz_averages() == [{}, {}, "", 0.0]
@@ -0,0 +1,46 @@
+"""Tests for batched what-if weight scenarios.
+
+Authors:
+- John Christian Linaban
+"""
+
+import numpy as np
+import pytest
+
+from app.analytics.scenarios import run_scenarios
+from app.analytics.stats import calculate_distribution, compute_weighted_grades
+from tests.test_numpy_stats import _mock_students, _weights
+
+THRESHOLDS = {"A": 90, "B": 80, "C": 70, "D": 60}
+
+
+def test_each_scenario_matches_a_full_regrade():
+	students = _mock_students()
+	scenarios = {
+		"current": _weights(),
+		"midterm 30 / quizzes 25": {"quizzes_total": 0.25, "midterm": 0.30, "final": 0.35, "attendance": 0.10},
+		"final-heavy": {"quizzes_total": 0.15, "midterm": 0.30, "final": 0.45, "attendance": 0.10},
+	}
+	result = run_scenarios(students, scenarios, THRESHOLDS, 70.0)
+	assert result.grades.shape == (len(students), 3)
+	for name, weights in scenarios.items():
+		graded = compute_weighted_grades(students, weights)
+		expected = np.array([s["weighted_grade"] for s in graded])
+		assert result.grades[:, result.column(name)] == pytest.approx(expected, abs=0.011)
+		assert result.distributions[name] == calculate_distribution(graded, THRESHOLDS)
+		assert result.at_risk[name] == sum(g < 70.0 for g in expected)
+
+	# The baseline never moves; ranks follow competition ranking
+	assert not result.rank_shift[:, 0].any()
+	col = result.grades[:, 1]
+	i = int(np.argmax(col))
+	assert result.ranks[i, 1] == 1
+	assert result.ranks[:, 1].max() == len(students) - (col == col.min()).sum() + 1
+	moved = result.movement()
+	assert moved["current"] == {"up": 0, "down": 0, "max": 0}
+	assert moved["final-heavy"]["up"] + moved["final-heavy"]["down"] > 0
+
+
+def test_negative_weights_are_rejected():
+	with pytest.raises(ValueError):
+		run_scenarios(_mock_students(), {"bad": {"midterm": -0.1}}, THRESHOLDS, 70.0)
@@ -0,0 +1,80 @@
+"""Tests for the mergeable quantile sketch and its streaming/parallel helpers.
+
+Authors:
+- John Christian Linaban
+"""
+
+import csv
+
+import numpy as np
+
+from app.core import read_csv_data
+from app.analytics.sketch import QuantileSketch, sketch_csv_files, sketch_from_students
+from app.analytics.stats import calculate_percentiles, compute_weighted_grades
+from app.analytics.insights import find_outliers
+from tests.test_numpy_stats import _mock_students, _weights
+
+PCTS = (1, 10, 25, 50, 75, 90, 99)
+
+
+def _rank_error(sorted_values, estimate, p):
+	# Distance (as a fraction of N) between the estimate's rank and the target rank
+	n = sorted_values.size
+	lo = np.searchsorted(sorted_values, estimate, side="left")
+	hi = np.searchsorted(sorted_values, estimate, side="right")
+	target = p / 100 * n
+	return 0.0 if lo <= target <= hi else min(abs(lo - target), abs(hi - target)) / n
+
+
+def test_small_input_is_exact():
+	students = compute_weighted_grades(_mock_students()[:150], _weights())
+	sketch = sketch_from_students(students)
+	assert sketch.percentiles((0,) + PCTS + (100,)) == calculate_percentiles(students, (0,) + PCTS + (100,))
+
+
+def test_merged_sketches_stay_within_error_bound():
+	rng = np.random.default_rng(7)
+	values = rng.normal(75, 12, size=400_000)
+	parts = [QuantileSketch(seed=i) for i in range(4)]
+	for i, chunk in enumerate(np.array_split(values, 40)):
+		parts[i % 4].update(chunk)
+	merged = parts[0]
+	for part in parts[1:]:
+		merged.merge(part)
+
+	assert len(merged) == values.size
+	assert merged.retained < 4 * merged.k
+	sorted_values = np.sort(values)
+	estimates = merged.percentiles(PCTS)
+	for p in PCTS:
+		assert _rank_error(sorted_values, estimates[p], p) < 0.0165
+	assert merged.quantile(100) == values.max()
+
+
+def test_csv_files_sketched_in_parallel(tmp_path):
+	config = {
+		"columns": {"required": ["student_id", "section"], "numeric": ["quiz1", "quiz2", "quiz3", "quiz4", "quiz5"]},
+		"grade_weights": {"quizzes_total": 0.2, "midterm": 0.35, "final": 0.35, "attendance": 0.1},
+	}
+	students = _mock_students()
+	fields = list(students[0].keys())
+	paths = []
+	for i in range(3):
+		path = tmp_path / f"term{i}.csv"
+		with open(path, "w", newline="") as f:
+			writer = csv.DictWriter(f, fieldnames=fields)
+			writer.writeheader()
+			writer.writerows({k: ("" if v is None else v) for k, v in s.items()} for s in students[i::3])
+		paths.append(str(path))
+
+	sketch = sketch_csv_files(paths, config, chunk_size=100, k=64, seed=1, max_workers=2)
+	graded = [s for p in paths for s in compute_weighted_grades(read_csv_data(p, config), config["grade_weights"])]
+	assert len(sketch) == len(graded)
+	sorted_values = np.sort([s["weighted_grade"] for s in graded])
+	for p, estimate in sketch.percentiles(PCTS).items():
+		assert _rank_error(sorted_values, estimate, p) < 0.05
+
+	# Fences from the sketch, flags applied per chunk
+	exact_ids = {s["student_id"] for s in find_outliers(graded)}
+	approx_ids = {s["student_id"] for s in find_outliers(graded, sketch=sketch)}
+	assert len(exact_ids ^ approx_ids) <= max(2, len(exact_ids) // 5)
@@ -0,0 +1,89 @@
+"""Tests comparing the fused course summary against the per-function analytics.
+
+Authors:
+- John Christian Linaban
+"""
+
+import time
+
+import pytest
+
+from app.analytics.stats import (
+	calculate_distribution,
+	calculate_percentile,
+	compute_weighted_grades,
+	get_average_grade,
+)
+from app.analytics.insights import (
+	correlate_attendance_and_grades,
+	find_outliers,
+	get_at_risk_students,
+	get_quiz_averages,
+	track_midterm_to_final_improvement,
+)
+from app.analytics.summary import summarize
+from tests.test_numpy_stats import _mock_students, _weights
+
+
+def _config():
+	return {
+		"grade_weights": _weights(),
+		"thresholds": {
+			"at_risk_cutoff": 70.0,
+			"grade_letters": {"A": 90, "B": 80, "C": 70, "D": 60},
+		},
+	}
+
+
+def _ids(rows):
+	return [r["student_id"] for r in rows]
+
+
+def test_summary_matches_individual_functions():
+	config = _config()
+	students = compute_weighted_grades(_mock_students(), config["grade_weights"])
+
+	t0 = time.perf_counter()
+	quiz_avgs, quiz_counts, hardest, lowest = get_quiz_averages(students)
+	expected = {
+		"average": get_average_grade(students),
+		"distribution": calculate_distribution(students, config["thresholds"]["grade_letters"]),
+		"improvement": track_midterm_to_final_improvement(students),
+		"attendance": correlate_attendance_and_grades(students, 80.0),
+		"outliers": find_outliers(students),
+		"at_risk": get_at_risk_students(students, 70.0),
+		"percentiles": {p: calculate_percentile(students, p) for p in (25, 50, 75, 90)},
+	}
+	t1 = time.perf_counter()
+	summary = summarize(students, config)
+	t2 = time.perf_counter()
+
+	assert summary.total_students == len(students)
+	assert summary.average_grade == pytest.approx(expected["average"])
+	assert summary.distribution == expected["distribution"]
+	assert summary.quiz_averages == pytest.approx(quiz_avgs)
+	assert summary.quiz_counts == quiz_counts
+	assert (summary.hardest_quiz, summary.lowest_quiz_avg) == (hardest, pytest.approx(lowest))
+	for key in ("total_students", "counts", "percentages", "suggestions"):
+		assert summary.improvement[key] == expected["improvement"][key]
+	assert summary.improvement["avg_improvement"] == pytest.approx(expected["improvement"]["avg_improvement"])
+	assert summary.improvement["avg_decline"] == pytest.approx(expected["improvement"]["avg_decline"])
+	assert summary.attendance["insights"] == expected["attendance"]["insights"]
+	assert summary.attendance["low_avg_grade"] == pytest.approx(expected["attendance"]["low_avg_grade"])
+	assert summary.percentiles == expected["percentiles"]
+	assert _ids(summary.outliers) == _ids(expected["outliers"])
+	assert _ids(summary.at_risk) == _ids(expected["at_risk"])
+
+	py_time = t1 - t0
+	np_time = t2 - t1
+	ratio = py_time / np_time if np_time > 0 else float('inf')
+	print(f"Timing -> individual calls: {py_time:.6f}s | summarize: {np_time:.6f}s | speedup: {ratio:.2f}x")
+
+
+def test_summary_of_empty_roster():
+	summary = summarize([], _config())
+	assert summary.total_students == 0
+	assert summary.average_grade == 0.0
+	assert summary.improvement["total_students"] == 0
+	assert summary.percentiles[50] is None
+	assert summary.outliers == [] and summary.at_risk == []